@@ -0,0 +1,251 @@
+import os
+import json
+import math
+import argparse
+import torch
+import torch.multiprocessing as mp
+from torch import Tensor
+from typing import Dict, Iterator, List, Set, Tuple
+
+from benchmark.cnf.generator.generator import Generator
+from benchmark.cnf.random_cnf import RandomCNF
+from k_sat.execution_planner import ExecutionPlanner
+from k_sat.pytorch_solver.landscape import mix_batch
+
+# Generator of worker process
+_generator: Generator = None
+
+
+def _init_worker(generator: Generator) -> None:
+    global _generator
+    _generator = generator
+    # One thread per process, batches already evaluated in parallel
+    torch.set_num_threads(1)
+
+
+def evolve_instances(h: Tensor, gamma: Tensor, beta: Tensor) -> Tensor:
+    """Apply QAOA unitary with fixed parameters to batch of instances with same number of
+    variables, in place and without gradients.
+
+    Args:
+        h (Tensor): Unsatisfied clauses per bitstring of each instance, shape (B, 2^n).
+        gamma (Tensor): Cost unitary parameters, shape (p,).
+        beta (Tensor): Mixing unitary parameters, shape (p,).
+
+    Returns:
+        Tensor: Final states, shape (B, 2^n).
+    """
+    B, N = h.shape
+    state = torch.full((B, N), 1 / N**0.5, dtype=torch.cfloat)
+    tmp = torch.empty(B * N // 2, dtype=torch.cfloat)
+
+    with torch.no_grad():
+        for g, b in zip(gamma.tolist(), beta.tolist()):
+            state.mul_(torch.exp(1j * g * h))
+            mix_batch(state, math.cos(b), 1j * math.sin(b), tmp)
+
+    return state
+
+
+def _evaluate(task: Tuple) -> List[Dict]:
+    """Evaluate one batch of instances.
+
+    Args:
+        task (Tuple): Number of variables, variables per clause, file indices, cost and mixing parameters (as lists and tensors).
+
+    Returns:
+        List[Dict]: Result row per instance.
+    """
+    n, k, indices, params, gamma, beta = task
+    formulas = []
+    for index in indices:
+        # Unsat counts read if written with instance, computed otherwise
+        stored = os.path.exists(_generator.filename(n, k, index, "hdf5"))
+        formulas.append(_generator.from_file(n, k, stored, index))
+    h = torch.stack([torch.from_numpy(f.naive_counts) for f in formulas]).to(torch.float32)
+
+    state = evolve_instances(h, gamma, beta)
+    ps = state.real**2 + state.imag**2
+    p_succs = torch.sum(ps * (h == 0), dim=1, dtype=torch.float64)
+    energies = torch.sum(ps * h, dim=1, dtype=torch.float64)
+
+    return [
+        {
+            "n": n,
+            "k": k,
+            "index": index,
+            **params,
+            "p_succ": p_succ,
+            "energy": energy,
+            "expected_runtime": 1 / p_succ if p_succ > 0 else float("inf"),
+        }
+        for index, p_succ, energy in zip(indices, p_succs.tolist(), energies.tolist())
+    ]
+
+
+class BulkEvaluator:
+    def __init__(
+        self,
+        gamma: List[float],
+        beta: List[float],
+        generator: Generator,
+        k: int,
+        results: str,
+        processes: int = None,
+        memory_budget: int = 2**30,
+        max_batch: int = 64,
+    ) -> None:
+        """Evaluates fixed QAOA parameters on many instances previously written by generator,
+        recording success probability, expected unsatisfied clauses <H> and expected running
+        time per instance. Instances with the same number of variables are evolved together
+        in batches, batches are spread over a process pool, and each result (with the
+        parameters evaluated) is appended to a JSON lines file as soon as its batch
+        finishes, so an interrupted run with the same parameters resumes from where it
+        stopped.
+
+        Args:
+            gamma (List[float]): Cost unitary parameters.
+            beta (List[float]): Mixing unitary parameters.
+            generator (Generator): Generator instances were written by.
+            k (int): Variables per clause per instance.
+            results (str): JSON lines file results are appended to.
+            processes (int, optional): Worker processes, 0 to evaluate in this process. Defaults to number of CPUs.
+            memory_budget (int, optional): Bytes each process may use evolving a batch, bounding batch size (estimated by ExecutionPlanner). Defaults to 2**30.
+            max_batch (int, optional): Most instances per batch. Defaults to 64.
+        """
+        self.params = {"gamma": [float(g) for g in gamma], "beta": [float(b) for b in beta]}
+        self.gamma = torch.tensor(gamma, dtype=torch.float32)
+        self.beta = torch.tensor(beta, dtype=torch.float32)
+        self.generator = generator
+        self.k = k
+        self.results = results
+        self.processes = processes if processes is not None else mp.cpu_count()
+        self.memory_budget = memory_budget
+        self.max_batch = max_batch
+
+    def batch_size(self, n: int) -> int:
+        """Instances evolved together within memory budget.
+
+        Args:
+            n (int): Number of variables.
+
+        Returns:
+            int: Batch size.
+        """
+        plan = ExecutionPlanner(self.memory_budget).plan(
+            n, len(self.gamma), gradients=False, batch_size=self.max_batch
+        )
+        return plan.batch_size
+
+    def done(self) -> Set[Tuple[int, int, int]]:
+        """Instances already recorded in results file with evaluator's parameters.
+
+        Returns:
+            Set[Tuple[int, int, int]]: Number of variables, variables per clause and file index of each.
+        """
+        done = set()
+        if not os.path.exists(self.results):
+            return done
+        with open(self.results) as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    # Partially written line of interrupted run
+                    continue
+                if row.get("gamma") == self.params["gamma"] and row.get("beta") == self.params["beta"]:
+                    done.add((row["n"], row["k"], row["index"]))
+        return done
+
+    def tasks(self, ns: List[int], indices: List[int]) -> Iterator[Tuple]:
+        """Batches of instances not yet evaluated.
+
+        Args:
+            ns (List[int]): Numbers of variables.
+            indices (List[int]): File indices of instances for each number of variables.
+
+        Returns:
+            Iterator[Tuple]: Task per batch.
+        """
+        done = self.done()
+        for n in ns:
+            remaining = [i for i in indices if (n, self.k, i) not in done]
+            size = self.batch_size(n)
+            for start in range(0, len(remaining), size):
+                yield n, self.k, remaining[start : start + size], self.params, self.gamma, self.beta
+
+    def run(self, ns: List[int], indices: List[int]) -> int:
+        """Evaluate parameters on instances, skipping those already in results file.
+
+        Args:
+            ns (List[int]): Numbers of variables.
+            indices (List[int]): File indices of instances for each number of variables.
+
+        Returns:
+            int: Number of instances evaluated.
+        """
+        tasks = list(self.tasks(ns, indices))
+        print(f"Evaluating {sum(len(t[2]) for t in tasks)} instances in {len(tasks)} batches")
+
+        pool = None
+        if self.processes > 0 and len(tasks) > 1:
+            ctx = mp.get_context("spawn")
+            pool = ctx.Pool(min(self.processes, len(tasks)), _init_worker, (self.generator,))
+            outputs = pool.imap_unordered(_evaluate, tasks)
+        else:
+            _init_worker(self.generator)
+            outputs = map(_evaluate, tasks)
+
+        evaluated = 0
+        try:
+            with open(self.results, "a+b") as f:
+                # Terminate partially written line of interrupted run
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        f.write(b"\n")
+                for rows in outputs:
+                    for row in rows:
+                        f.write((json.dumps(row) + "\n").encode())
+                    f.flush()
+                    evaluated += len(rows)
+                    print(f"Evaluated {evaluated} instances")
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        return evaluated
+
+
+def main() -> None:
+    """Evaluate fixed parameters on instances in generator directories, e.g.
+    python -m benchmark.bulk_evaluation --n 10 12 --instances 1000 --gamma -0.5 --beta 0.3 --results results.jsonl
+    """
+    parser = argparse.ArgumentParser(description="Bulk evaluation of fixed QAOA parameters")
+    parser.add_argument("--type", default="ksat")
+    parser.add_argument("--n", type=int, nargs="+", required=True)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--instances", type=int, required=True)
+    parser.add_argument("--start", type=int, default=0)
+    parser.add_argument("--gamma", type=float, nargs="+", required=True)
+    parser.add_argument("--beta", type=float, nargs="+", required=True)
+    parser.add_argument("--results", required=True)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--memory-budget", type=int, default=2**30)
+    args = parser.parse_args()
+
+    evaluator = BulkEvaluator(
+        args.gamma,
+        args.beta,
+        RandomCNF(type=args.type).generator,
+        args.k,
+        args.results,
+        args.processes,
+        args.memory_budget,
+    )
+    evaluator.run(args.n, list(range(args.start, args.start + args.instances)))
+
+
+if __name__ == "__main__":
+    main()
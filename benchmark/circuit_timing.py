@@ -0,0 +1,56 @@
+import argparse
+import time
+import torch
+
+from k_sat.pytorch_solver.pytorch_circuit import PytorchCircuit
+
+
+def time_circuit(circuit: PytorchCircuit, h: torch.Tensor, hS: torch.Tensor, repeats: int) -> float:
+    """Average time of forward and backward pass through circuit.
+
+    Args:
+        circuit (PytorchCircuit): Circuit to time.
+        h (torch.Tensor): Tensor of unsatisfied clauses per bitstring.
+        hS (torch.Tensor): Indices of satisfying assignments.
+        repeats (int): Passes to average over.
+
+    Returns:
+        float: Seconds per pass.
+    """
+    start = time.time()
+    for _ in range(repeats):
+        circuit.zero_grad()
+        circuit(h, hS).backward()
+    return (time.time() - start) / repeats
+
+
+def main() -> None:
+    """Compare eager and compiled PytorchCircuit on random clause counts, e.g.
+    python -m benchmark.circuit_timing --min-n 12 --max-n 26 --layers 3
+    """
+    parser = argparse.ArgumentParser(description="Eager vs compiled PytorchCircuit timing")
+    parser.add_argument("--min-n", type=int, default=12)
+    parser.add_argument("--max-n", type=int, default=26)
+    parser.add_argument("--step", type=int, default=2)
+    parser.add_argument("--layers", type=int, default=3)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    print("n, eager (s), compiled (s), speedup, compile time (s)")
+    for n in range(args.min_n, args.max_n + 1, args.step):
+        h = torch.randint(0, 5, (2**n,)).float()
+        hS = torch.nonzero(h == 0).flatten()
+
+        eager = PytorchCircuit(n, args.layers)
+        compiled = PytorchCircuit(n, args.layers, compiled=True)
+
+        # First pass compiles
+        compile_time = time_circuit(compiled, h, hS, 1)
+
+        t_eager = time_circuit(eager, h, hS, args.repeats)
+        t_compiled = time_circuit(compiled, h, hS, args.repeats)
+        print(f"{n}, {t_eager:.4f}, {t_compiled:.4f}, {t_eager / t_compiled:.2f}, {compile_time:.1f}")
+
+
+if __name__ == "__main__":
+    main()
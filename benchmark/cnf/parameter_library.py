@@ -0,0 +1,189 @@
+import os
+import re
+import json
+import time
+import numpy as np
+from typing import Dict, List, Tuple
+
+from formula.formula import Formula
+from k_sat.parameter_store import ParameterStore
+from benchmark.cnf.generator.generator import Generator
+from benchmark.cnf.generator.knaesat_generator import KNAESATGenerator
+from benchmark.cnf.generator.ksat_generator import KSATGenerator
+
+
+class ParameterLibrary(ParameterStore):
+    def __init__(self, type: str = None, generator: Generator = None) -> None:
+        """On-disk library of trained QAOA parameters, stored alongside generator instances
+        and keyed by problem type (generator), k, n, layers and solver.
+
+        Args:
+            type (str, optional): Type of generator to use if one not provided. Defaults to None.
+            generator (Generator, optional): Generator whose instance tree parameters are stored in. Defaults to None.
+
+        Raises:
+            RuntimeError: Must either provide generator or generator type.
+            RuntimeError: Generator type not recognised.
+        """
+        if generator is None and type is None:
+            raise RuntimeError("Must either provide generator or generator type")
+
+        if generator is not None:
+            self.generator = generator
+        elif type == "ksat":
+            self.generator = KSATGenerator()
+        elif type == "knaesat":
+            self.generator = KNAESATGenerator()
+        else:
+            raise RuntimeError("Generator type not recognised")
+
+    def filename(self, n: int, k: int) -> str:
+        """Get filename of parameters for problem type.
+
+        Args:
+            n (int): Number of variables per instance.
+            k (int): Variables per clause per instance.
+
+        Returns:
+            str: Filename of parameters.
+        """
+        return f"{self.generator.directory(n, k)}/params.json"
+
+    def read(self, n: int, k: int) -> Dict:
+        """Read all parameters stored for problem type.
+
+        Args:
+            n (int): Number of variables per instance.
+            k (int): Variables per clause per instance.
+
+        Returns:
+            Dict: Entries keyed by solver then layers.
+        """
+        filename = self.filename(n, k)
+        if not os.path.exists(filename):
+            return {}
+        with open(filename, "r") as f:
+            return json.load(f)
+
+    def store(
+        self,
+        formula: Formula,
+        solver: str,
+        gamma: List[float],
+        beta: List[float],
+        p_succ: float,
+        provenance: Dict = None,
+    ) -> None:
+        """Store trained parameters.
+
+        Args:
+            formula (Formula): Formula (representative of family) parameters were trained for.
+            solver (str): Solver parameters are for (conventions differ between solvers).
+            gamma (List[float]): Cost unitary parameters.
+            beta (List[float]): Mixing unitary parameters.
+            p_succ (float): Training success probability.
+            provenance (Dict, optional): Details of how parameters were found. Defaults to None.
+        """
+        n, k = self.key(formula)
+        entries = self.read(n, k)
+
+        entry = {
+            "gamma": [float(g) for g in gamma],
+            "beta": [float(b) for b in beta],
+            "p_succ": float(p_succ),
+            "provenance": {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), **(provenance or {})},
+        }
+        entries.setdefault(solver, {}).setdefault(str(len(gamma)), []).append(entry)
+
+        # Write to temporary file first so library is never left half written
+        filename = self.filename(n, k)
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(f"{filename}.tmp", "w") as f:
+            json.dump(entries, f, indent=1)
+        os.replace(f"{filename}.tmp", filename)
+
+    def best(self, n: int, k: int, p: int, solver: str) -> Dict:
+        """Stored entry with highest training success probability.
+
+        Args:
+            n (int): Number of variables per instance.
+            k (int): Variables per clause per instance.
+            p (int): Number of layers.
+            solver (str): Solver parameters are for.
+
+        Returns:
+            Dict: Entry, None if no parameters stored.
+        """
+        entries = self.read(n, k).get(solver, {}).get(str(p), [])
+        if not entries:
+            return None
+        return max(entries, key=lambda e: e["p_succ"])
+
+    def available(self, k: int, p: int, solver: str) -> List[int]:
+        """Problem sizes with stored parameters.
+
+        Args:
+            k (int): Variables per clause per instance.
+            p (int): Number of layers.
+            solver (str): Solver parameters are for.
+
+        Returns:
+            List[int]: Sorted values of n parameters stored for.
+        """
+        # Sibling directories of instance tree are other values of n
+        parent_dir = os.path.dirname(self.generator.directory(0, k))
+        if not os.path.isdir(parent_dir):
+            return []
+        ns = []
+        for d in os.listdir(parent_dir):
+            match = re.fullmatch(r"n_(\d+)", d)
+            if match and self.best(int(match[1]), k, p, solver) is not None:
+                ns.append(int(match[1]))
+        return sorted(ns)
+
+    def nearest(
+        self, n: int, k: int, p: int, solver: str
+    ) -> Tuple[List[float], List[float]]:
+        """Parameters for problem type, interpolated linearly in n between nearest stored
+        sizes (or taken from the nearest size if n is out of range).
+
+        Args:
+            n (int): Number of variables per instance.
+            k (int): Variables per clause per instance.
+            p (int): Number of layers.
+            solver (str): Solver parameters are for.
+
+        Returns:
+            Tuple[List[float], List[float]]: Cost and mixing unitary parameters, None if none stored.
+        """
+        ns = self.available(k, p, solver)
+        if not ns:
+            return None
+
+        lower = [m for m in ns if m <= n]
+        upper = [m for m in ns if m >= n]
+        n_lo = lower[-1] if lower else upper[0]
+        n_hi = upper[0] if upper else lower[-1]
+
+        lo = self.best(n_lo, k, p, solver)
+        hi = self.best(n_hi, k, p, solver)
+        t = 0.0 if n_hi == n_lo else (n - n_lo) / (n_hi - n_lo)
+        gamma = (1 - t) * np.array(lo["gamma"]) + t * np.array(hi["gamma"])
+        beta = (1 - t) * np.array(lo["beta"]) + t * np.array(hi["beta"])
+        return gamma.tolist(), beta.tolist()
+
+    def lookup(
+        self, formula: Formula, p: int, solver: str
+    ) -> Tuple[List[float], List[float]]:
+        """Parameters for formula's problem family.
+
+        Args:
+            formula (Formula): Formula to find parameters for.
+            p (int): Number of layers.
+            solver (str): Solver parameters are for.
+
+        Returns:
+            Tuple[List[float], List[float]]: Cost and mixing unitary parameters, None if none stored.
+        """
+        n, k = self.key(formula)
+        return self.nearest(n, k, p, solver)
@@ -0,0 +1,34 @@
+import argparse
+import time
+
+from benchmark.cnf.random_cnf import RandomCNF
+from k_sat.qiskit_solver.pauli_encoder import PauliEncoder
+
+
+def main() -> None:
+    """Compare gate counts and encoding time of PauliEncoder with and without merged
+    Z-Pauli terms on random formulas at satisfiability ratio, e.g.
+    python -m benchmark.encoder_gates --n 12 --k 3 5 8
+    """
+    parser = argparse.ArgumentParser(description="PauliEncoder gate counts, per clause vs merged terms")
+    parser.add_argument("--n", type=int, default=12)
+    parser.add_argument("--k", type=int, nargs="+", default=[3, 5, 8])
+    parser.add_argument("--layers", type=int, default=1)
+    args = parser.parse_args()
+
+    print("k, clauses, encoding, cx, rz, depth, encode time (s)")
+    for k in args.k:
+        formula = RandomCNF(type="ksat").from_poisson(args.n, k, satisfiable=False)[0]
+        for merge in [False, True]:
+            start = time.time()
+            circuit = PauliEncoder(merge).encode_formula(formula, args.layers)
+            elapsed = time.time() - start
+            ops = circuit.count_ops()
+            print(
+                f"{k}, {len(formula.clauses)}, {'merged' if merge else 'per clause'}, "
+                f"{ops.get('cx', 0)}, {ops.get('rz', 0)}, {circuit.depth()}, {elapsed:.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
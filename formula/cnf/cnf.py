@@ -1,6 +1,4 @@
 from typing import Iterable, List
-import pathos
-import os
 import numpy as np
 import random
 
@@ -9,6 +7,9 @@ from formula.cnf.disjunctive_clause import DisjunctiveClause
 from formula.variable import Variable
 from pysat.formula import CNF as PySATCNF
 
+# Bitstrings counted at once by naive_counts
+COUNTS_BLOCK = 2**20
+
 
 class CNF(Formula):
     def __init__(self, clauses: List[DisjunctiveClause] = None) -> None:
@@ -172,14 +173,43 @@ class CNF(Formula):
             Iterable[int]: Number of unsatisfied clauses in bistring order.
         """
         if self.counts is None:
-            n = self.num_vars
-            N = 2**n
-            bs = [bin(i)[2:].zfill(n) for i in range(N)]
-            with pathos.multiprocessing.Pool(os.cpu_count() - 1) as executor:
-                counts = list(executor.map(self.assignment_weight, bs))
-                self.counts = np.array(counts, dtype=np.float32)
+            N = 2**self.num_vars
+            # Vectorised over blocks, bounding memory beyond counts themselves
+            counts = np.empty(N, dtype=np.float32)
+            for start in range(0, N, COUNTS_BLOCK):
+                stop = min(start + COUNTS_BLOCK, N)
+                counts[start:stop] = self.counts_range(start, stop)
+            self.counts = counts
         return self.counts
 
+    def counts_at(self, indices: Iterable[int]) -> np.ndarray:
+        """Vectorised number of unsatisfied clauses for given bitstring indices.
+
+        Args:
+            indices (Iterable[int]): Bitstring indices (in bitstring order).
+
+        Returns:
+            np.ndarray: Number of unsatisfied clauses per index.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        counts = np.zeros(indices.shape, dtype=np.float32)
+        for clause in self.clauses:
+            counts += clause.unsatisfied_indices(indices, self.num_vars)
+        return counts
+
+    def counts_range(self, start: int, stop: int) -> np.ndarray:
+        """Number of unsatisfied clauses for contiguous block of bitstrings, without
+        evaluating naive counts over all 2^n bitstrings.
+
+        Args:
+            start (int): First bitstring index in block.
+            stop (int): Bitstring index block ends before.
+
+        Returns:
+            np.ndarray: Number of unsatisfied clauses in bitstring order.
+        """
+        return self.counts_at(np.arange(start, stop, dtype=np.int64))
+
     def random_assignment(self) -> str:
         """Make a random assignment to formula.
 
@@ -1,4 +1,5 @@
-from typing import List
+from typing import List, Tuple
+import numpy as np
 from formula.clause import Clause
 from formula.variable import Variable
 from functools import reduce
@@ -81,6 +82,40 @@ class DisjunctiveClause(Clause):
         """
         return all([v.is_satisfied(assignment) for v in self.variables]) or all([not v.is_satisfied(assignment) for v in self.variables])
 
+    def masks(self, n: int) -> Tuple[int, int]:
+        """Bit masks of positive and negated literals over bitstring indices.
+
+        Args:
+            n (int): Number of variables in formula (x_i corresponds to bit n - 1 - i of index).
+
+        Returns:
+            Tuple[int, int]: Masks of positive and negated literals.
+        """
+        pos = 0
+        neg = 0
+        for v in self.variables:
+            if v.is_negation:
+                neg |= 1 << (n - 1 - v.id)
+            else:
+                pos |= 1 << (n - 1 - v.id)
+        return pos, neg
+
+    def unsatisfied_indices(self, indices: np.ndarray, n: int) -> np.ndarray:
+        """Vectorised check of which bitstring indices leave clause unsatisfied.
+
+        Args:
+            indices (np.ndarray): Bitstring indices (in bitstring order).
+            n (int): Number of variables in formula.
+
+        Returns:
+            np.ndarray: True iff clause unsatisfied by bitstring at index.
+        """
+        if self.always_sat:
+            return np.zeros(indices.shape, dtype=bool)
+        pos, neg = self.masks(n)
+        # All literals false
+        return ((indices & pos) == 0) & ((indices & neg) == neg)
+
     def parity(self, vars: List[Variable] = None) -> int:
         """Parity of clause (as defined in notebook.)
 
@@ -1,6 +1,7 @@
 from formula.cnf.cnf import CNF
 from formula.cnf.disjunctive_clause import DisjunctiveClause
-from typing import List, Tuple
+from typing import Iterable, List, Tuple
+import numpy as np
 from pysat.formula import WCNF as PySATWCNF
 
 
@@ -51,6 +52,21 @@ class WCNF(CNF):
             [w * (not c.is_satisfied(assignment)) for (c, w) in self.weighted_clauses]
         )
 
+    def counts_at(self, indices: Iterable[int]) -> np.ndarray:
+        """Vectorised weight of unsatisfied clauses for given bitstring indices.
+
+        Args:
+            indices (Iterable[int]): Bitstring indices (in bitstring order).
+
+        Returns:
+            np.ndarray: Weight of unsatisfied clauses per index.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        counts = np.zeros(indices.shape, dtype=np.float32)
+        for (c, w) in self.weighted_clauses:
+            counts += w * c.unsatisfied_indices(indices, self.num_vars)
+        return counts
+
     def to_pysat(self) -> PySATWCNF:
         """Convert to PySAT representation of formula.
 
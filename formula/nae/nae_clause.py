@@ -1,4 +1,5 @@
 from typing import List
+import numpy as np
 
 from formula.cnf.disjunctive_clause import DisjunctiveClause
 from formula.variable import Variable
@@ -25,4 +26,22 @@ class NAEClause(DisjunctiveClause):
 		"""
 
 		# NAE clause satisfied iff at least one literal true and not all literals assigned to same truth value
-		return super().is_satisfied(assignment) and not super().all_same(assignment)
\ No newline at end of file
+		return super().is_satisfied(assignment) and not super().all_same(assignment)
+
+	def unsatisfied_indices(self, indices: np.ndarray, n: int) -> np.ndarray:
+		"""Vectorised check of which bitstring indices leave clause unsatisfied.
+
+		Args:
+			indices (np.ndarray): Bitstring indices (in bitstring order).
+			n (int): Number of variables in formula.
+
+		Returns:
+			np.ndarray: True iff clause unsatisfied by bitstring at index.
+		"""
+		if self.always_sat:
+			return np.zeros(indices.shape, dtype=bool)
+		pos, neg = self.masks(n)
+		# All literals false or all literals true
+		all_false = ((indices & pos) == 0) & ((indices & neg) == neg)
+		all_true = ((indices & pos) == pos) & ((indices & neg) == 0)
+		return all_false | all_true
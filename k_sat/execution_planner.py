@@ -0,0 +1,306 @@
+import math
+import os
+from typing import Dict, List, Union
+
+from formula.formula import Formula
+
+# Bytes per complex64 amplitude
+AMPLITUDE = 8
+
+# Peak memory in multiples of 2^n * AMPLITUDE, measured on PytorchCircuit / NumpyCircuit
+GRAD_PER_LAYER_QUBIT = 2  # autograd saves ~2 states per qubit mixed, per layer
+GRAD_PER_LAYER = 3  # and ~3 for cost phase
+NO_GRAD = 7
+CHUNKED = 3.5
+
+# Seconds per (layer, qubit, amplitude) on a single core, forward (and backward if gradients)
+SECONDS_GRAD = 5e-8
+SECONDS_NO_GRAD = 1.5e-8
+SECONDS_CHUNKED = 1e-8
+
+STRATEGIES = ["in_memory", "chunked", "sharded", "memmap"]
+
+
+def available_memory() -> int:
+    """Physical memory available to process.
+
+    Returns:
+        int: Available bytes.
+    """
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return 2**32
+
+
+class Plan:
+    def __init__(
+        self,
+        strategy: str,
+        n: int,
+        layers: int,
+        gradients: bool,
+        batch_size: int,
+        peak_bytes: float,
+        disk_bytes: float,
+        runtime: float,
+        fits: bool,
+        breakdown: Dict[str, float],
+    ) -> None:
+        """Execution strategy for evaluating or training a QAOA circuit, with its estimated cost.
+
+        Args:
+            strategy (str): "in_memory" (PytorchCircuit), "chunked" (NumpyCircuit), "sharded" (DistributedCircuit) or "memmap" (OutOfCoreCircuit).
+            n (int): Number of variables.
+            layers (int): QAOA circuit layers.
+            gradients (bool): Whether gradients are computed.
+            batch_size (int): Formulas evaluated together (per optimiser step).
+            peak_bytes (float): Estimated peak memory (per process if sharded).
+            disk_bytes (float): Estimated disk usage.
+            runtime (float): Estimated seconds per evaluation of batch.
+            fits (bool): Whether peak memory is within budget.
+            breakdown (Dict[str, float]): Estimated bytes per component.
+        """
+        self.strategy = strategy
+        self.n = n
+        self.layers = layers
+        self.gradients = gradients
+        self.batch_size = batch_size
+        self.peak_bytes = peak_bytes
+        self.disk_bytes = disk_bytes
+        self.runtime = runtime
+        self.fits = fits
+        self.breakdown = breakdown
+
+    def __str__(self) -> str:
+        components = ", ".join(
+            f"{name} {value / 2**30:.2f} GiB" for name, value in self.breakdown.items()
+        )
+        return (
+            f"{self.strategy}: peak {self.peak_bytes / 2**30:.2f} GiB "
+            f"({components}), disk {self.disk_bytes / 2**30:.2f} GiB, "
+            f"batch {self.batch_size}, ~{self.runtime:.2g} s, "
+            f"{'fits' if self.fits else 'exceeds budget'}"
+        )
+
+
+class ExecutionPlanner:
+    def __init__(
+        self,
+        memory_budget: int = None,
+        disk_budget: int = None,
+        processes: int = 1,
+        block_qubits: int = 20,
+        group_qubits: int = 3,
+        disk_bandwidth: float = 5e8,
+    ) -> None:
+        """Estimates peak memory and runtime of running a QAOA circuit before running it, and
+        picks the execution strategy and batch size that fit within a memory budget.
+
+        Args:
+            memory_budget (int, optional): Bytes of memory available (per process). Defaults to 80% of available memory.
+            disk_budget (int, optional): Bytes of disk available for memory-mapped state. Defaults to unlimited.
+            processes (int, optional): Processes available to shard state over. Defaults to 1.
+            block_qubits (int, optional): Qubits per block of memory-mapped state. Defaults to 20.
+            group_qubits (int, optional): High qubits mixed per pass of memory-mapped state. Defaults to 3.
+            disk_bandwidth (float, optional): Bytes per second read from or written to disk. Defaults to 5e8.
+        """
+        if memory_budget is None:
+            memory_budget = int(0.8 * available_memory())
+        self.memory_budget = memory_budget
+        self.disk_budget = disk_budget
+        self.processes = processes
+        self.block_qubits = block_qubits
+        self.group_qubits = group_qubits
+        self.disk_bandwidth = disk_bandwidth
+
+    def counts_bytes(self, n: int) -> float:
+        """Peak memory of computing unsatisfied clause counts (CNF.naive_counts).
+
+        Args:
+            n (int): Number of variables.
+
+        Returns:
+            float: Estimated bytes.
+        """
+        N = 2**n
+        # float32 counts, plus int64 indices, bool and float32 temporaries per chunk
+        return 4 * N + 24 * min(N, 2**20)
+
+    def estimate(
+        self,
+        strategy: str,
+        n: int,
+        layers: int,
+        gradients: bool = True,
+        batch_size: int = 1,
+        formulas: int = None,
+    ) -> Plan:
+        """Estimated cost of strategy.
+
+        Args:
+            strategy (str): Execution strategy.
+            n (int): Number of variables.
+            layers (int): QAOA circuit layers.
+            gradients (bool, optional): Whether gradients are computed. Defaults to True.
+            batch_size (int, optional): Formulas evaluated together. Defaults to 1.
+            formulas (int, optional): Formulas whose counts are held in memory. Defaults to batch_size.
+
+        Raises:
+            RuntimeError: Strategy not recognised.
+
+        Returns:
+            Plan: Strategy with estimated cost.
+        """
+        if strategy not in STRATEGIES:
+            raise RuntimeError(f"Execution strategy {strategy} not recognised")
+
+        N = 2**n
+        state = AMPLITUDE * N
+        formulas = batch_size if formulas is None else formulas
+        disk = 0.0
+        qubit_layers = layers * n
+
+        if strategy == "in_memory":
+            if gradients:
+                evolution = batch_size * layers * (GRAD_PER_LAYER_QUBIT * n + GRAD_PER_LAYER) * state
+                runtime = batch_size * SECONDS_GRAD * qubit_layers * N
+            else:
+                evolution = batch_size * NO_GRAD * state
+                runtime = batch_size * SECONDS_NO_GRAD * qubit_layers * N
+            breakdown = {"counts": 4 * N * formulas, "evolution": evolution}
+        elif strategy == "chunked":
+            breakdown = {"counts": 4 * N * formulas, "evolution": CHUNKED * state}
+            runtime = batch_size * SECONDS_CHUNKED * qubit_layers * N
+        elif strategy == "sharded":
+            R = self.processes
+            if gradients:
+                evolution = batch_size * layers * (GRAD_PER_LAYER_QUBIT * n + GRAD_PER_LAYER) * state / R
+                seconds = SECONDS_GRAD
+            else:
+                evolution = NO_GRAD * state / R
+                seconds = SECONDS_NO_GRAD
+            # Received shard from peer while mixing partition qubits
+            breakdown = {
+                "counts": 4 * N * formulas / R,
+                "evolution": evolution,
+                "exchange": 2 * state / R,
+            }
+            runtime = batch_size * seconds * qubit_layers * N / R
+        else:
+            b = min(self.block_qubits, n)
+            B = 2**b
+            group = min(2**self.group_qubits, N // B)
+            breakdown = {
+                "counts": 4 * B,
+                "blocks": (group + 2) * AMPLITUDE * B,
+            }
+            passes = 1 + math.ceil((n - b) / self.group_qubits)
+            # State, counts and float64 cumulative distribution sampled from
+            disk = (AMPLITUDE + 4 + 8) * N * formulas
+            runtime = batch_size * layers * (
+                passes * 2 * state / self.disk_bandwidth + SECONDS_CHUNKED * n * N
+            )
+
+        peak = sum(breakdown.values())
+        fits = peak <= self.memory_budget
+        if strategy == "memmap" and self.disk_budget is not None:
+            fits = fits and disk <= self.disk_budget
+
+        return Plan(strategy, n, layers, gradients, batch_size, peak, disk, runtime, fits, breakdown)
+
+    def candidates(self, backend: str, gradients: bool) -> List[str]:
+        """Strategies able to run backend, in order of preference.
+
+        Args:
+            backend (str): "pytorch" or "numpy".
+            gradients (bool): Whether gradients are computed.
+
+        Raises:
+            RuntimeError: Backend not recognised.
+
+        Returns:
+            List[str]: Strategies.
+        """
+        if backend == "pytorch":
+            strategies = ["in_memory", "sharded"]
+        elif backend == "numpy":
+            strategies = ["chunked", "memmap"]
+        else:
+            raise RuntimeError(f"Backend {backend} not recognised")
+
+        if gradients and backend == "numpy":
+            raise RuntimeError("NumPy backend does not compute gradients")
+        if self.processes <= 1 and "sharded" in strategies:
+            strategies.remove("sharded")
+        return strategies
+
+    def plan(
+        self,
+        formula: Union[Formula, int],
+        layers: int,
+        backend: str = "pytorch",
+        gradients: bool = True,
+        batch_size: int = 1,
+        formulas: int = None,
+    ) -> Plan:
+        """Cheapest strategy (and largest batch size up to batch_size) that fits in memory budget.
+
+        Args:
+            formula (Union[Formula, int]): Formula to plan for, or its number of variables.
+            layers (int): QAOA circuit layers.
+            backend (str, optional): "pytorch" or "numpy". Defaults to "pytorch".
+            gradients (bool, optional): Whether gradients are computed. Defaults to True.
+            batch_size (int, optional): Formulas to evaluate together. Defaults to 1.
+            formulas (int, optional): Formulas whose counts are held in memory. Defaults to batch_size.
+
+        Returns:
+            Plan: Chosen strategy, or strategy with least peak memory (and fits False) if none fits.
+        """
+        n = formula if isinstance(formula, int) else formula.num_vars
+        plans = []
+        for strategy in self.candidates(backend, gradients):
+            # Halve batch until strategy fits
+            size = batch_size
+            plan = self.estimate(strategy, n, layers, gradients, size, formulas)
+            while not plan.fits and size > 1:
+                size = (size + 1) // 2
+                plan = self.estimate(strategy, n, layers, gradients, size, formulas)
+            if plan.fits:
+                return plan
+            plans.append(plan)
+        return min(plans, key=lambda plan: plan.peak_bytes)
+
+    def report(
+        self,
+        formula: Union[Formula, int],
+        layers: int,
+        gradients: bool = True,
+        batch_size: int = 1,
+        formulas: int = None,
+    ) -> str:
+        """Dry run: estimated cost of every strategy, for capacity planning.
+
+        Args:
+            formula (Union[Formula, int]): Formula to plan for, or its number of variables.
+            layers (int): QAOA circuit layers.
+            gradients (bool, optional): Whether gradients are computed. Defaults to True.
+            batch_size (int, optional): Formulas to evaluate together. Defaults to 1.
+            formulas (int, optional): Formulas whose counts are held in memory. Defaults to batch_size.
+
+        Returns:
+            str: Report, one line per strategy.
+        """
+        n = formula if isinstance(formula, int) else formula.num_vars
+        lines = [
+            f"n = {n}, p = {layers}, gradients = {gradients}, batch = {batch_size}, "
+            f"budget {self.memory_budget / 2**30:.2f} GiB",
+            f"counts: {self.counts_bytes(n) / 2**30:.2f} GiB",
+        ]
+        for strategy in STRATEGIES:
+            if gradients and strategy in ["chunked", "memmap"]:
+                continue
+            if strategy == "sharded" and self.processes <= 1:
+                continue
+            lines.append(str(self.estimate(strategy, n, layers, gradients, batch_size, formulas)))
+        return "\n".join(lines)
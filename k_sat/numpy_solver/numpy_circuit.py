@@ -0,0 +1,229 @@
+import os
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Tuple
+
+
+class NumpyCircuit:
+    def __init__(
+        self,
+        num_vars: int,
+        layers: int = 1,
+        init_gamma: np.ndarray = None,
+        init_beta: np.ndarray = None,
+        threads: int = None,
+        block_size: int = 2**16,
+    ) -> None:
+        """NumPy implementation of QAOA circuit for satisfiability, with the same interface
+        as PytorchCircuit but no torch dependency. For evaluation with known parameters,
+        state is updated in place, split into blocks handled by a thread pool (NumPy
+        releases the GIL inside array operations).
+
+        Args:
+            num_vars (int): Number of variables in satisfiability problem.
+            layers (int, optional): QAOA circuit layers. Defaults to 1.
+            init_gamma (np.ndarray, optional): Cost unitary parameter values. Defaults to all -0.01.
+            init_beta (np.ndarray, optional): Mixing unitary parameter values. Defaults to all 0.01.
+            threads (int, optional): Threads to split state over. Defaults to number of CPUs.
+            block_size (int, optional): Minimum amplitudes per block handed to a thread. Defaults to 2^16.
+        """
+        if init_gamma is None:
+            init_gamma = np.full(layers, -0.01)
+        if init_beta is None:
+            init_beta = np.full(layers, 0.01)
+
+        self.gamma = np.asarray(init_gamma, dtype=np.float64)
+        self.beta = np.asarray(init_beta, dtype=np.float64)
+        self.layers = layers
+
+        self.n = num_vars
+        self.N = 2**num_vars
+
+        self.threads = threads if threads is not None else os.cpu_count() or 1
+        self.block_size = block_size
+        self.pool = None
+
+        self.initial = self.initial_state()
+
+    def initial_state(self) -> np.ndarray:
+        """Equal superposition over all bitstrings.
+
+        Returns:
+            np.ndarray: Initial state.
+        """
+        return np.full(self.N, 1 / np.sqrt(self.N), dtype=np.complex64)
+
+    def angles(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Cost and mixing unitary parameters of each layer.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Cost and mixing unitary parameters.
+        """
+        return self.gamma, self.beta
+
+    def blocks(self, length: int) -> List[slice]:
+        """Split range into contiguous blocks, at most one per thread and one per block_size amplitudes of state.
+
+        Args:
+            length (int): Length of range to split.
+
+        Returns:
+            List[slice]: Blocks covering range.
+        """
+        count = max(1, min(self.threads, self.N // self.block_size, length))
+        bounds = np.linspace(0, length, count + 1, dtype=np.int64)
+        return [slice(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:])]
+
+    def run(self, f: Callable[[slice], None], length: int) -> None:
+        """Apply f to each block of range, in parallel if more than one block.
+
+        Args:
+            f (Callable[[slice], None]): Function updating block of state in place.
+            length (int): Length of range to split.
+        """
+        blocks = self.blocks(length)
+        if len(blocks) == 1:
+            f(blocks[0])
+            return
+        if self.pool is None:
+            self.pool = ThreadPoolExecutor(self.threads)
+        # Consume results to propagate exceptions
+        list(self.pool.map(f, blocks))
+
+    def cost(self, circuit: np.ndarray, gamma: float, h: np.ndarray) -> np.ndarray:
+        """Apply cost unitary to state (in place).
+
+        Args:
+            circuit (np.ndarray): State cost unitary is being applied to.
+            gamma (float): Parameter parameterising cost unitary.
+            h (np.ndarray): Unsatisfied clauses per bitstring.
+
+        Returns:
+            np.ndarray: Costed state.
+        """
+
+        def block(s: slice) -> None:
+            circuit[s] *= np.exp(1j * gamma * h[s]).astype(circuit.dtype)
+
+        self.run(block, self.N)
+        return circuit
+
+    def mix(self, circuit: np.ndarray, beta: float) -> np.ndarray:
+        """Apply mixing unitary e^{i beta X} on each qubit to state (in place), as a
+        butterfly over amplitude pairs differing in that qubit.
+
+        Args:
+            circuit (np.ndarray): State mixing unitary is being applied to.
+            beta (float): Parameter parameterising mixing unitary.
+
+        Returns:
+            np.ndarray: Mixed state.
+        """
+        c = circuit.real.dtype.type(np.cos(beta))
+        s = circuit.dtype.type(1j * np.sin(beta))
+
+        for i in range(self.n):
+            # x_i is bit n - 1 - i of index
+            view = circuit.reshape((2**i, 2, 2 ** (self.n - i - 1)))
+            outer = view.shape[0] >= view.shape[2]
+
+            def block(sl: slice) -> None:
+                part = view[sl] if outer else view[:, :, sl]
+                a = part[:, 0, :]
+                b = part[:, 1, :]
+                t = a.copy()
+                a *= c
+                a += s * b
+                b *= c
+                b += s * t
+
+            self.run(block, view.shape[0] if outer else view.shape[2])
+
+        return circuit
+
+    def succ_prob(self, circuit: np.ndarray, hS: np.ndarray) -> float:
+        """Success probability on output state.
+
+        Args:
+            circuit (np.ndarray): Output state.
+            hS (np.ndarray): Indices of satisfying assignments.
+
+        Returns:
+            float: Success probability.
+        """
+        ps = circuit[hS]
+        return float(np.sum(ps.real**2 + ps.imag**2))
+
+    def energy(self, circuit: np.ndarray, h: np.ndarray) -> float:
+        """Expected number of unsatisfied clauses <H> on output state.
+
+        Args:
+            circuit (np.ndarray): Output state.
+            h (np.ndarray): Unsatisfied clauses per bitstring.
+
+        Returns:
+            float: Expected energy.
+        """
+        ps = circuit.real**2 + circuit.imag**2
+        return float(np.dot(ps, h))
+
+    def evolve(self, h: np.ndarray) -> np.ndarray:
+        """Apply QAOA unitary to initial state.
+
+        Args:
+            h (np.ndarray): Unsatisfied clauses per bitstring.
+
+        Returns:
+            np.ndarray: Final state.
+        """
+        circuit = self.initial.copy()
+        gamma, beta = self.angles()
+        h = np.asarray(h, dtype=circuit.real.dtype)
+
+        # QAOA unitary application
+        for i in range(self.layers):
+            circuit = self.cost(circuit, gamma[i], h)
+            circuit = self.mix(circuit, beta[i])
+
+        return circuit
+
+    def probabilities(self, h: np.ndarray) -> np.ndarray:
+        """Output distribution of circuit.
+
+        Args:
+            h (np.ndarray): Unsatisfied clauses per bitstring.
+
+        Returns:
+            np.ndarray: Probability of each bitstring (in bitstring order).
+        """
+        circuit = self.evolve(h)
+        return circuit.real**2 + circuit.imag**2
+
+    def sample(self, ps: np.ndarray, shots: int) -> np.ndarray:
+        """Draw bitstring indices from output distribution.
+
+        Args:
+            ps (np.ndarray): Probability of each bitstring.
+            shots (int): Number of samples to draw.
+
+        Returns:
+            np.ndarray: Indices of sampled bitstrings.
+        """
+        cdf = np.cumsum(ps, dtype=np.float64)
+        indices = np.searchsorted(cdf / cdf[-1], np.random.random(shots), side="right")
+        return np.minimum(indices, self.N - 1)
+
+    def forward(self, h: np.ndarray, hS: np.ndarray) -> float:
+        """Application of QAOA circuit to calculate success probability.
+
+        Args:
+            h (np.ndarray): Unsatisfied clauses per bitstring.
+            hS (np.ndarray): Indices of satisfying assignments.
+
+        Returns:
+            float: Success probability of evolved initial state with inputs.
+        """
+        return self.succ_prob(self.evolve(h), hS)
+
+    def __call__(self, h: np.ndarray, hS: np.ndarray) -> float:
+        return self.forward(h, hS)
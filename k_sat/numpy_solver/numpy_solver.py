@@ -0,0 +1,216 @@
+import numpy as np
+from typing import Callable, List, Tuple
+
+from k_sat.solver import Solver
+from k_sat.running_time import RunningTime, sample_until_sat
+from k_sat.execution_planner import ExecutionPlanner
+from k_sat.numpy_solver.numpy_circuit import NumpyCircuit
+from k_sat.numpy_solver.out_of_core_circuit import OutOfCoreCircuit
+from formula.cnf.cnf import CNF
+from k_sat.parameter_store import ParameterStore
+
+
+class NumpySolver(Solver):
+    def __init__(
+        self,
+        gamma: List[float] = None,
+        beta: List[float] = None,
+        parameter_library: ParameterStore = None,
+        solver: str = "pytorch",
+        layers: int = 1,
+        analytic: bool = False,
+        threads: int = None,
+        batch_size: int = 4096,
+        memory_budget: int = None,
+        directory: str = None,
+    ) -> None:
+        """NumPy implementation of QAOA for satisfiability with known (pretrained) parameters,
+        for inference without torch.
+
+        Args:
+            gamma (List[float], optional): Cost unitary parameters. Defaults to parameters from library.
+            beta (List[float], optional): Mixing unitary parameters. Defaults to parameters from library.
+            parameter_library (ParameterStore, optional): Library to read parameters from if not given. Defaults to None.
+            solver (str, optional): Solver whose library parameters are used. Defaults to "pytorch".
+            layers (int, optional): Layers in QAOA circuit, if parameters read from library. Defaults to 1.
+            analytic (bool, optional): Draw running times from exact (geometric) running time distribution instead of sampling shots. Defaults to False.
+            threads (int, optional): Threads to evolve state with. Defaults to number of CPUs.
+            batch_size (int, optional): Shots drawn per batch when sampling. Defaults to 4096.
+            memory_budget (int, optional): Bytes available, state kept in memory-mapped files if in-memory evaluation would not fit. Defaults to None (in memory).
+            directory (str, optional): Directory for memory-mapped files. Defaults to new temporary directory.
+
+        Raises:
+            RuntimeError: Neither parameters nor library provided.
+        """
+        if (gamma is None or beta is None) and parameter_library is None:
+            raise RuntimeError("NumpySolver requires parameters or a parameter library")
+
+        self.gamma = gamma
+        self.beta = beta
+        self.parameter_library = parameter_library
+        self.solver = solver
+        self.layers = layers if gamma is None else len(gamma)
+        self.analytic = analytic
+        self.threads = threads
+        self.batch_size = batch_size
+        self.memory_budget = memory_budget
+        self.directory = directory
+
+    def params(self, formula: CNF) -> Tuple[List[float], List[float]]:
+        """Known parameters for formula.
+
+        Args:
+            formula (CNF): Formula to find parameters for.
+
+        Raises:
+            RuntimeError: No parameters for formula in library.
+
+        Returns:
+            Tuple[List[float], List[float]]: Cost and mixing unitary parameters.
+        """
+        if self.gamma is not None and self.beta is not None:
+            return self.gamma, self.beta
+
+        params = self.parameter_library.lookup(formula, self.layers, self.solver)
+        if params is None:
+            raise RuntimeError("No parameters in library for formula")
+        return params
+
+    def circuit(self, formula: CNF) -> NumpyCircuit:
+        """Circuit for formula with known parameters.
+
+        Args:
+            formula (CNF): Formula to build circuit for.
+
+        Returns:
+            NumpyCircuit: QAOA circuit.
+        """
+        gamma, beta = self.params(formula)
+        return NumpyCircuit(formula.num_vars, self.layers, gamma, beta, self.threads)
+
+    def final_probabilities(self, formula: CNF) -> np.ndarray:
+        """Find output distribution for formula.
+
+        Args:
+            formula (CNF): Formula to find output distribution for.
+
+        Returns:
+            np.ndarray: Probability of each bitstring (in bitstring order).
+        """
+        return self.circuit(formula).probabilities(formula.naive_counts)
+
+    def sat(self, formula: CNF, timeout: int = None) -> Tuple[str, int]:
+        """Finds statisfying assignment of formula.
+
+        Args:
+            formula (CNF): Formula to find satisfying assignment for.
+            timeout (int, optional): Timeout for algorithm if no satisfying assignment found yet. Defaults to None (keep going until solution found).
+
+        Raises:
+            RuntimeError: No satisfying assignments and no timeout (sampling would not terminate).
+
+        Returns:
+            Tuple[str, int]: Tuple of satisfying assignment and runtime to find it. String set to "-1" formula unsatisfiable/solver timed out.
+        """
+        if self.strategy(formula) == "memmap":
+            return self.sat_out_of_core(formula, timeout)
+
+        circuit = self.circuit(formula)
+        ps = circuit.probabilities(formula.naive_counts)
+        sats = formula.naive_sats
+
+        if self.analytic:
+            # Store for later analysis
+            self.running_time = RunningTime(ps, sats, formula.num_vars)
+            return self.running_time.sat(timeout)
+
+        is_sat = np.zeros(circuit.N, dtype=bool)
+        is_sat[sats] = True
+        return self.sample_until_sat(
+            lambda shots: circuit.sample(ps, shots),
+            lambda indices: is_sat[indices],
+            len(sats) > 0,
+            formula.num_vars,
+            timeout,
+        )
+
+    def strategy(self, formula: CNF) -> str:
+        """Execution strategy fitting in memory budget.
+
+        Args:
+            formula (CNF): Formula being solved.
+
+        Returns:
+            str: "chunked" (in memory) or "memmap".
+        """
+        if self.memory_budget is None:
+            return "chunked"
+        plan = ExecutionPlanner(self.memory_budget).plan(
+            formula, self.layers, backend="numpy", gradients=False
+        )
+        print(f"Execution plan {plan}")
+        return plan.strategy
+
+    def sat_out_of_core(self, formula: CNF, timeout: int = None) -> Tuple[str, int]:
+        """Finds statisfying assignment of formula, keeping state in memory-mapped files.
+        Shots are always sampled, as exact running times need the full distribution.
+
+        Args:
+            formula (CNF): Formula to find satisfying assignment for.
+            timeout (int, optional): Timeout for algorithm if no satisfying assignment found yet. Defaults to None (keep going until solution found).
+
+        Returns:
+            Tuple[str, int]: Tuple of satisfying assignment and runtime to find it. String set to "-1" formula unsatisfiable/solver timed out.
+        """
+        gamma, beta = self.params(formula)
+        circuit = OutOfCoreCircuit(
+            formula.num_vars, self.layers, gamma, beta, self.directory, threads=self.threads
+        )
+        try:
+            h = circuit.counts(formula)
+            cdf = circuit.cdf(circuit.evolve(h))
+            sats = circuit.sats(h)
+
+            def is_sat(indices: np.ndarray) -> np.ndarray:
+                # Satisfying assignments found in index order, so sorted
+                if len(sats) == 0:
+                    return np.zeros(len(indices), dtype=bool)
+                found = np.minimum(np.searchsorted(sats, indices), len(sats) - 1)
+                return sats[found] == indices
+
+            return self.sample_until_sat(
+                lambda shots: circuit.sample(cdf, shots),
+                is_sat,
+                len(sats) > 0,
+                formula.num_vars,
+                timeout,
+            )
+        finally:
+            # Remove 2^n sized files unless kept in given directory
+            circuit.close()
+
+    def sample_until_sat(
+        self,
+        draw: Callable[[int], np.ndarray],
+        is_sat: Callable[[np.ndarray], np.ndarray],
+        satisfiable: bool,
+        n: int,
+        timeout: int = None,
+    ) -> Tuple[str, int]:
+        """Sample in batches until satisfying assignment found or timeout reached.
+
+        Args:
+            draw (Callable[[int], np.ndarray]): Draws given number of bitstring indices.
+            is_sat (Callable[[np.ndarray], np.ndarray]): Whether each bitstring index is satisfying.
+            satisfiable (bool): Whether any satisfying assignment exists.
+            n (int): Number of variables.
+            timeout (int, optional): Timeout if no satisfying assignment found yet. Defaults to None.
+
+        Raises:
+            RuntimeError: No satisfying assignments and no timeout (sampling would not terminate).
+
+        Returns:
+            Tuple[str, int]: Tuple of satisfying assignment and runtime to find it. String set to "-1" if timed out.
+        """
+        index, runtime = sample_until_sat(draw, is_sat, satisfiable, timeout, self.batch_size)
+        return ("-1" if index < 0 else bin(index)[2:].zfill(n)), runtime
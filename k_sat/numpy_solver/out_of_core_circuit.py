@@ -0,0 +1,302 @@
+import os
+import itertools
+import tempfile
+import numpy as np
+from typing import Iterable, List, Tuple
+
+from formula.formula import Formula
+from k_sat.numpy_solver.numpy_circuit import NumpyCircuit
+
+
+class OutOfCoreCircuit:
+    def __init__(
+        self,
+        num_vars: int,
+        layers: int = 1,
+        init_gamma: np.ndarray = None,
+        init_beta: np.ndarray = None,
+        directory: str = None,
+        block_qubits: int = 20,
+        group_qubits: int = 3,
+        threads: int = None,
+    ) -> None:
+        """QAOA circuit for satisfiability with state and unsatisfied clause counts kept in
+        memory-mapped files, for instances whose state does not fit in memory. State is
+        processed in blocks of 2^block_qubits amplitudes:
+            - cost and mixing on low qubits (within a block) in one pass over blocks,
+            - mixing on high qubits (across blocks) group_qubits at a time, loading the
+              2^group_qubits blocks coupled by them together.
+        Each layer takes 1 + ceil((n - block_qubits) / group_qubits) passes over the state.
+
+        Args:
+            num_vars (int): Number of variables in satisfiability problem.
+            layers (int, optional): QAOA circuit layers. Defaults to 1.
+            init_gamma (np.ndarray, optional): Cost unitary parameter values. Defaults to all -0.01.
+            init_beta (np.ndarray, optional): Mixing unitary parameter values. Defaults to all 0.01.
+            directory (str, optional): Directory for state and counts files. Defaults to new temporary directory, removed by close.
+            block_qubits (int, optional): Qubits per block held in memory. Defaults to 20.
+            group_qubits (int, optional): High qubits mixed per pass. Defaults to 3.
+            threads (int, optional): Threads to process each block with. Defaults to number of CPUs.
+        """
+        if init_gamma is None:
+            init_gamma = np.full(layers, -0.01)
+        if init_beta is None:
+            init_beta = np.full(layers, 0.01)
+
+        self.gamma = np.asarray(init_gamma, dtype=np.float64)
+        self.beta = np.asarray(init_beta, dtype=np.float64)
+        self.layers = layers
+
+        self.n = num_vars
+        self.N = 2**num_vars
+        self.b = min(block_qubits, num_vars)
+        self.B = 2**self.b
+        self.blocks = self.N // self.B
+        self.group_qubits = max(1, group_qubits)
+
+        # Temporary directory (and files in it) removed by close
+        self.tmp = None
+        if directory is None:
+            self.tmp = tempfile.TemporaryDirectory()
+            directory = self.tmp.name
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+
+        # Applies cost and mixer on low qubits of a block
+        self.block_circuit = NumpyCircuit(self.b, threads=threads)
+
+        # Passes over state files, for I/O accounting
+        self.passes = 0
+
+    def close(self) -> None:
+        """Remove temporary directory created for state and counts files, if any. Memory-mapped
+        arrays returned by circuit must not be used afterwards."""
+        if self.tmp is not None:
+            self.tmp.cleanup()
+            self.tmp = None
+
+    def angles(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Cost and mixing unitary parameters of each layer.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Cost and mixing unitary parameters.
+        """
+        return self.gamma, self.beta
+
+    def block(self, k: int) -> slice:
+        """Indices of block.
+
+        Args:
+            k (int): Block index.
+
+        Returns:
+            slice: Indices of amplitudes in block.
+        """
+        return slice(k * self.B, (k + 1) * self.B)
+
+    def counts(self, formula: Formula) -> np.memmap:
+        """Write unsatisfied clauses per bitstring to file, a block at a time.
+
+        Args:
+            formula (Formula): Formula to count unsatisfied clauses of.
+
+        Returns:
+            np.memmap: Unsatisfied clauses per bitstring.
+        """
+        h = np.memmap(
+            f"{self.directory}/counts.dat", dtype=np.float32, mode="w+", shape=(self.N,)
+        )
+        for k in range(self.blocks):
+            s = self.block(k)
+            h[s] = formula.counts_range(s.start, s.stop)
+        h.flush()
+        return h
+
+    def initial_state(self) -> np.memmap:
+        """Equal superposition over all bitstrings, written to file.
+
+        Returns:
+            np.memmap: Initial state.
+        """
+        circuit = np.memmap(
+            f"{self.directory}/state.dat", dtype=np.complex64, mode="w+", shape=(self.N,)
+        )
+        for k in range(self.blocks):
+            circuit[self.block(k)] = 1 / np.sqrt(self.N)
+        circuit.flush()
+        return circuit
+
+    def cost_mix_low(
+        self, circuit: np.memmap, h: np.ndarray, gamma: float, beta: float
+    ) -> None:
+        """Apply cost unitary, then mixing unitary on qubits within blocks, in one pass.
+
+        Args:
+            circuit (np.memmap): State.
+            h (np.ndarray): Unsatisfied clauses per bitstring.
+            gamma (float): Parameter parameterising cost unitary.
+            beta (float): Parameter parameterising mixing unitary.
+        """
+        for k in range(self.blocks):
+            s = self.block(k)
+            block = np.array(circuit[s])
+            block = self.block_circuit.cost(block, gamma, np.asarray(h[s]))
+            block = self.block_circuit.mix(block, beta)
+            circuit[s] = block
+        circuit.flush()
+        self.passes += 1
+
+    def high_groups(self) -> List[List[int]]:
+        """Groups of block index bits (high qubits) mixed together in one pass.
+
+        Returns:
+            List[List[int]]: Bit positions of block index per group.
+        """
+        bits = list(range(self.n - self.b))
+        return [
+            bits[i : i + self.group_qubits]
+            for i in range(0, len(bits), self.group_qubits)
+        ]
+
+    def mix_high(self, circuit: np.memmap, beta: float) -> None:
+        """Apply mixing unitary on qubits spanning blocks, loading blocks coupled by a group
+        of qubits together and applying the group's butterflies in memory.
+
+        Args:
+            circuit (np.memmap): State.
+            beta (float): Parameter parameterising mixing unitary.
+        """
+        c = np.float32(np.cos(beta))
+        s = np.complex64(1j * np.sin(beta))
+
+        for group in self.high_groups():
+            mask = sum(1 << bit for bit in group)
+            offsets = [
+                sum(1 << bit for bit, on in zip(group, bits) if on)
+                for bits in itertools.product([0, 1], repeat=len(group))
+            ]
+            for base in range(self.blocks):
+                if base & mask:
+                    continue
+                ks = [base + offset for offset in offsets]
+                blocks = np.stack([np.array(circuit[self.block(k)]) for k in ks])
+
+                # Butterfly on each bit, blocks stacked so last bit varies fastest
+                g = len(group)
+                for j in range(g):
+                    view = blocks.reshape((2**j, 2, 2 ** (g - j - 1) * self.B))
+                    a = view[:, 0]
+                    b = view[:, 1]
+                    t = a.copy()
+                    a *= c
+                    a += s * b
+                    b *= c
+                    b += s * t
+
+                for k, block in zip(ks, blocks):
+                    circuit[self.block(k)] = block
+            circuit.flush()
+            self.passes += 1
+
+    def evolve(self, h: np.ndarray) -> np.memmap:
+        """Apply QAOA unitary to initial state.
+
+        Args:
+            h (np.ndarray): Unsatisfied clauses per bitstring (e.g. memory-mapped from counts).
+
+        Returns:
+            np.memmap: Final state.
+        """
+        circuit = self.initial_state()
+        gamma, beta = self.angles()
+
+        for i in range(self.layers):
+            self.cost_mix_low(circuit, h, gamma[i], beta[i])
+            self.mix_high(circuit, beta[i])
+
+        return circuit
+
+    def succ_prob(self, circuit: np.memmap, hS: Iterable[int]) -> float:
+        """Success probability on output state, reading only satisfying assignments.
+
+        Args:
+            circuit (np.memmap): Output state.
+            hS (Iterable[int]): Indices of satisfying assignments.
+
+        Returns:
+            float: Success probability.
+        """
+        # Sorted for sequential reads
+        ps = circuit[np.sort(np.asarray(hS, dtype=np.int64))]
+        return float(np.sum(ps.real**2 + ps.imag**2))
+
+    def cdf(self, circuit: np.memmap) -> np.memmap:
+        """Cumulative output distribution, written to file in one pass over state so shots
+        are then drawn without further passes.
+
+        Args:
+            circuit (np.memmap): Output state.
+
+        Returns:
+            np.memmap: Cumulative probability up to and including each bitstring.
+        """
+        cdf = np.memmap(
+            f"{self.directory}/cdf.dat", dtype=np.float64, mode="w+", shape=(self.N,)
+        )
+        total = 0.0
+        for k in range(self.blocks):
+            s = self.block(k)
+            block = np.asarray(circuit[s])
+            cdf[s] = total + np.cumsum(block.real**2 + block.imag**2, dtype=np.float64)
+            total = cdf[s.stop - 1]
+        cdf.flush()
+        self.passes += 1
+        return cdf
+
+    def sample(self, cdf: np.memmap, shots: int) -> np.ndarray:
+        """Draw bitstring indices from output distribution by binary search on its cumulative
+        distribution, reading O(shots * n) entries of file rather than the state.
+
+        Args:
+            cdf (np.memmap): Cumulative output distribution, from cdf.
+            shots (int): Number of samples to draw.
+
+        Returns:
+            np.ndarray: Indices of sampled bitstrings.
+        """
+        # Sorted so successive searches read nearby pages
+        draws = np.sort(np.random.random(shots)) * cdf[-1]
+        indices = np.minimum(np.searchsorted(cdf, draws, side="right"), self.N - 1)
+        return np.random.permutation(indices)
+
+    def sats(self, h: np.ndarray) -> np.ndarray:
+        """Indices of satisfying assignments, streaming over counts.
+
+        Args:
+            h (np.ndarray): Unsatisfied clauses per bitstring.
+
+        Returns:
+            np.ndarray: Indices of satisfying assignments.
+        """
+        return np.concatenate(
+            [
+                np.flatnonzero(np.asarray(h[self.block(k)]) == 0) + k * self.B
+                for k in range(self.blocks)
+            ]
+        )
+
+    def forward(self, formula: Formula) -> float:
+        """Application of QAOA circuit to calculate success probability.
+
+        Args:
+            formula (Formula): Formula to evaluate success probability on.
+
+        Returns:
+            float: Success probability of evolved initial state.
+        """
+        h = self.counts(formula)
+        circuit = self.evolve(h)
+        return self.succ_prob(circuit, self.sats(h))
+
+    def __call__(self, formula: Formula) -> float:
+        return self.forward(formula)
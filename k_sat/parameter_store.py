@@ -0,0 +1,79 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Tuple
+
+from formula.formula import Formula
+
+
+class ParameterStore(ABC):
+    def __init__(self):
+        """Abstract store of trained QAOA parameters that solvers warm start from and store
+        into, to be extended (e.g. by benchmark's on-disk ParameterLibrary)."""
+        pass
+
+    @abstractmethod
+    def lookup(
+        self, formula: Formula, p: int, solver: str
+    ) -> Tuple[List[float], List[float]]:
+        """Parameters for formula's problem family.
+
+        Args:
+            formula (Formula): Formula to find parameters for.
+            p (int): Number of layers.
+            solver (str): Solver parameters are for.
+
+        Returns:
+            Tuple[List[float], List[float]]: Cost and mixing unitary parameters, None if none stored.
+        """
+        pass
+
+    @abstractmethod
+    def store(
+        self,
+        formula: Formula,
+        solver: str,
+        gamma: List[float],
+        beta: List[float],
+        p_succ: float,
+        provenance: Dict = None,
+    ) -> None:
+        """Store trained parameters.
+
+        Args:
+            formula (Formula): Formula (representative of family) parameters were trained for.
+            solver (str): Solver parameters are for (conventions differ between solvers).
+            gamma (List[float]): Cost unitary parameters.
+            beta (List[float]): Mixing unitary parameters.
+            p_succ (float): Training success probability.
+            provenance (Dict, optional): Details of how parameters were found. Defaults to None.
+        """
+        pass
+
+    def key(self, formula: Formula) -> Tuple[int, int]:
+        """Problem size and clause length of formula.
+
+        Args:
+            formula (Formula): Formula.
+
+        Returns:
+            Tuple[int, int]: Number of variables and variables per clause.
+        """
+        k = max([c.num_vars for c in formula.clauses], default=0)
+        return formula.num_vars, k
+
+    def family(self, formulas: List[Formula]) -> Formula:
+        """Representative of problem family parameters trained on formulas are looked up
+        and stored under.
+
+        Args:
+            formulas (List[Formula]): Formulas parameters are trained on.
+
+        Raises:
+            RuntimeError: Formulas from different problem families.
+
+        Returns:
+            Formula: Representative formula.
+        """
+        keys = sorted({self.key(f) for f in formulas})
+        if len(keys) > 1:
+            raise RuntimeError(f"Training formulas from different problem families (n, k) {keys}")
+        return formulas[0]
@@ -0,0 +1,120 @@
+import torch
+from torch import Tensor
+from typing import Iterable, Tuple
+
+from k_sat.running_time import sample_until_sat
+
+
+class BatchSampler:
+    def __init__(
+        self, ps: Tensor, sats: Iterable[int], batch_size: int = 4096
+    ) -> None:
+        """Draws bitstrings from output distribution of circuit in batches, using
+        inverse transform sampling (binary search over cumulative probabilities).
+
+        Args:
+            ps (Tensor): Probability of each bitstring (normalised if not already, as Categorical).
+            sats (Iterable[int]): Indices of satisfying assignments.
+            batch_size (int, optional): Samples drawn per batch. Defaults to 4096.
+        """
+        # Double precision to resolve small probabilities for large n
+        cdf = torch.cumsum(ps.detach().to(torch.float64), dim=0)
+        self.cdf = cdf / cdf[-1]
+        self.N = len(ps)
+
+        # Lookup table of satisfying assignments
+        self.is_sat = torch.zeros(self.N, dtype=torch.bool)
+        self.is_sat[torch.as_tensor(sats, dtype=torch.long)] = True
+
+        self.batch_size = batch_size
+
+    def sample(self, shots: int) -> Tensor:
+        """Draw bitstring indices from distribution.
+
+        Args:
+            shots (int): Number of samples to draw.
+
+        Returns:
+            Tensor: Indices of sampled bitstrings.
+        """
+        u = torch.rand(shots, dtype=torch.float64)
+        indices = torch.searchsorted(self.cdf, u, right=True)
+        return torch.clamp(indices, max=self.N - 1)
+
+    def running_times(
+        self, trials: int, timeout: int = None
+    ) -> Tuple[Tensor, Tensor]:
+        """Independent running times (samples drawn until satisfying assignment found).
+
+        Args:
+            trials (int): Number of independent trials.
+            timeout (int, optional): Timeout for trial if no satisfying assignment found yet. Defaults to None.
+
+        Raises:
+            RuntimeError: No satisfying assignment to sample (would never terminate).
+
+        Returns:
+            Tuple[Tensor, Tensor]: Satisfying assignment index (-1 if timed out) and running time per trial.
+        """
+        if timeout is None and not self.is_sat.any():
+            raise RuntimeError("No satisfying assignments, sampling would not terminate")
+
+        indices = torch.full((trials,), -1, dtype=torch.long)
+        runtimes = torch.zeros(trials, dtype=torch.long)
+
+        # Trials are consecutive segments of a single stream of draws
+        t = 0
+        runtime = 0
+        while t < trials:
+            draws = self.sample(self.batch_size)
+            hits = torch.nonzero(self.is_sat[draws]).flatten().tolist()
+
+            pos = 0
+            h = 0
+            while t < trials and pos < self.batch_size:
+                # Next satisfying draw in rest of batch
+                while h < len(hits) and hits[h] < pos:
+                    h += 1
+                remaining = None if timeout is None else timeout + 1 - runtime
+
+                if h < len(hits) and (
+                    remaining is None or hits[h] - pos + 1 <= remaining
+                ):
+                    # Satisfying assignment found
+                    runtimes[t] = runtime + hits[h] - pos + 1
+                    indices[t] = draws[hits[h]]
+                    pos = hits[h] + 1
+                elif remaining is not None and self.batch_size - pos >= remaining:
+                    # Timed out
+                    runtimes[t] = timeout + 1
+                    pos += remaining
+                else:
+                    # Trial continues into next batch
+                    runtime += self.batch_size - pos
+                    pos = self.batch_size
+                    continue
+
+                t += 1
+                runtime = 0
+
+        return indices, runtimes
+
+    def running_time(self, timeout: int = None) -> Tuple[int, int]:
+        """Running time of a single trial.
+
+        Args:
+            timeout (int, optional): Timeout if no satisfying assignment found yet. Defaults to None.
+
+        Raises:
+            RuntimeError: No satisfying assignment to sample (would never terminate).
+
+        Returns:
+            Tuple[int, int]: Satisfying assignment index (-1 if timed out) and running time.
+        """
+        return sample_until_sat(
+            self.sample,
+            lambda indices: self.is_sat[indices].numpy(),
+            bool(self.is_sat.any()),
+            timeout,
+            self.batch_size,
+        )
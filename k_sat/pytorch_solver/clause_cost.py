@@ -0,0 +1,98 @@
+import torch
+from torch import Tensor
+from typing import Iterator, Tuple
+
+from formula.cnf.cnf import CNF
+
+
+class CostPhase(torch.autograd.Function):
+    """Cost unitary e^{i gamma h} applied block by block, recomputing unsatisfied clause
+    counts of each block in backward instead of saving them."""
+
+    @staticmethod
+    def forward(ctx, circuit: Tensor, gamma: Tensor, cost: "ClauseCost") -> Tensor:
+        out = torch.empty_like(circuit)
+        for start, stop in cost.blocks():
+            h = cost.counts(start, stop)
+            out[start:stop] = circuit[start:stop] * torch.exp(1j * gamma * h)
+        ctx.cost = cost
+        ctx.save_for_backward(gamma, out)
+        return out
+
+    @staticmethod
+    def backward(ctx, grad: Tensor):
+        gamma, out = ctx.saved_tensors
+        cost = ctx.cost
+        grad_circuit = torch.empty_like(grad)
+        grad_gamma = torch.zeros((), dtype=torch.float64)
+        for start, stop in cost.blocks():
+            h = cost.counts(start, stop)
+            g = grad[start:stop]
+            grad_circuit[start:stop] = g * torch.exp(-1j * gamma * h)
+            # d out / d gamma = i h out
+            grad_gamma += torch.sum(
+                h * (g.conj() * 1j * out[start:stop]).real, dtype=torch.float64
+            )
+        return grad_circuit, grad_gamma.to(gamma.dtype), None
+
+
+class ClauseCost:
+    def __init__(self, formula: CNF, block_size: int = 2**18) -> None:
+        """Matrix-free cost operator: unsatisfied clause counts (or weights) of a block of
+        bitstrings are computed with the formula's own vectorised clause checks when the
+        cost unitary is applied, so h is never stored.
+
+        Args:
+            formula (CNF): Formula whose unsatisfied clauses are counted (e.g. CNF, WCNF or NAEFormula).
+            block_size (int, optional): Bitstrings per block. Defaults to 2**18.
+        """
+        self.formula = formula
+        self.n = formula.num_vars
+        self.N = 2**self.n
+        self.block_size = min(block_size, self.N)
+
+    def blocks(self) -> Iterator[Tuple[int, int]]:
+        """Index ranges of blocks.
+
+        Returns:
+            Iterator[Tuple[int, int]]: First index and index after last of each block.
+        """
+        for start in range(0, self.N, self.block_size):
+            yield start, min(start + self.block_size, self.N)
+
+    def counts(self, start: int, stop: int) -> Tensor:
+        """Unsatisfied clauses for contiguous block of bitstrings.
+
+        Args:
+            start (int): First bitstring index in block.
+            stop (int): Bitstring index block ends before.
+
+        Returns:
+            Tensor: Number (or weight) of unsatisfied clauses in bitstring order.
+        """
+        return torch.from_numpy(self.formula.counts_range(start, stop))
+
+    def sats(self) -> Tensor:
+        """Indices of satisfying assignments, a block at a time.
+
+        Returns:
+            Tensor: Indices of satisfying assignments.
+        """
+        return torch.cat(
+            [
+                torch.nonzero(self.counts(start, stop) == 0).flatten() + start
+                for start, stop in self.blocks()
+            ]
+        )
+
+    def apply(self, circuit: Tensor, gamma: Tensor) -> Tensor:
+        """Apply cost unitary to state.
+
+        Args:
+            circuit (Tensor): State cost unitary is being applied to.
+            gamma (Tensor): Parameter parameterising cost unitary.
+
+        Returns:
+            Tensor: Costed state.
+        """
+        return CostPhase.apply(circuit, gamma, self)
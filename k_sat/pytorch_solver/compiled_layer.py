@@ -0,0 +1,56 @@
+import torch
+from torch import Tensor
+from typing import Callable, Dict, Tuple
+
+
+def fused_layer(
+    re: Tensor, im: Tensor, h: Tensor, gamma: Tensor, beta: Tensor, n: int
+) -> Tuple[Tensor, Tensor]:
+    """Single QAOA layer (cost then mix) applied to state stored as separate real and
+    imaginary parts, so compiler can fuse cost phase and each single qubit mix into one
+    pass over state.
+
+    Args:
+        re (Tensor): Real part of state.
+        im (Tensor): Imaginary part of state.
+        h (Tensor): Tensor of unsatisfied clauses per bitstring.
+        gamma (Tensor): Parameter parameterising cost unitary.
+        beta (Tensor): Parameter parameterising mixing unitary.
+        n (int): Number of variables (qubits).
+
+    Returns:
+        Tuple[Tensor, Tensor]: Real and imaginary parts of state after layer.
+    """
+    # Cost: multiply by e^{i gamma h}
+    c = torch.cos(gamma * h)
+    s = torch.sin(gamma * h)
+    re, im = re * c - im * s, re * s + im * c
+
+    # Mix: e^{i beta X} on each qubit, x_i is bit n - 1 - i of index
+    cb = torch.cos(beta)
+    sb = torch.sin(beta)
+    for i in range(n):
+        shape = (2**i, 2, 2 ** (n - i - 1))
+        re_flip = re.reshape(shape).flip(1).reshape(-1)
+        im_flip = im.reshape(shape).flip(1).reshape(-1)
+        re, im = cb * re - sb * im_flip, cb * im + sb * re_flip
+
+    return re, im
+
+
+# Compiled layers per number of variables, shared by circuits of every depth
+_compiled: Dict[int, Callable] = {}
+
+
+def compiled_layer(n: int) -> Callable:
+    """Compiled fused_layer for given number of variables, compiling on first use.
+
+    Args:
+        n (int): Number of variables (qubits).
+
+    Returns:
+        Callable: Compiled function with signature of fused_layer.
+    """
+    if n not in _compiled:
+        _compiled[n] = torch.compile(fused_layer, dynamic=False)
+    return _compiled[n]
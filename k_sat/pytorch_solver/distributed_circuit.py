@@ -0,0 +1,198 @@
+import numpy as np
+import torch
+import torch.distributed as dist
+from torch import Tensor
+
+from formula.cnf.cnf import CNF
+from k_sat.pytorch_solver.pytorch_circuit import PytorchCircuit
+
+
+def exchange(tensor: Tensor, peer: int) -> Tensor:
+    """Swap tensor with peer process (both processes send and receive).
+
+    Args:
+        tensor (Tensor): Local tensor to send.
+        peer (int): Rank of process to swap with.
+
+    Returns:
+        Tensor: Tensor received from peer.
+    """
+    # Send real view as not all backends (e.g. gloo) support complex tensors
+    send = torch.view_as_real(tensor) if tensor.is_complex() else tensor
+    send = send.contiguous()
+    recv = torch.empty_like(send)
+    ops = [
+        dist.P2POp(dist.isend, send, peer),
+        dist.P2POp(dist.irecv, recv, peer),
+    ]
+    for req in dist.batch_isend_irecv(ops):
+        req.wait()
+    return torch.view_as_complex(recv) if tensor.is_complex() else recv
+
+
+class PairwiseExchange(torch.autograd.Function):
+    """Differentiable swap of local shards between pair of processes."""
+
+    @staticmethod
+    def forward(ctx, tensor: Tensor, peer: int) -> Tensor:
+        ctx.peer = peer
+        return exchange(tensor, peer)
+
+    @staticmethod
+    def backward(ctx, grad: Tensor):
+        # Swap is its own transpose, so gradients are swapped back
+        return exchange(grad, ctx.peer), None
+
+
+class AllReduceSum(torch.autograd.Function):
+    """Sum of local values over all processes."""
+
+    @staticmethod
+    def forward(ctx, tensor: Tensor) -> Tensor:
+        total = tensor.clone()
+        dist.all_reduce(total)
+        return total
+
+    @staticmethod
+    def backward(ctx, grad: Tensor):
+        # Each process backpropagates through its local part only, parameter
+        # gradients are summed over processes by hooks on the parameters
+        return grad
+
+
+class DistributedCircuit(PytorchCircuit):
+    def __init__(
+        self,
+        num_vars: int,
+        layers: int = 1,
+        init_gamma: Tensor = None,
+        init_beta: Tensor = None,
+    ) -> None:
+        """QAOA circuit with state vector sharded over processes. Process r holds
+        amplitudes of bitstrings whose top log2(R) index bits (variables x_0...) equal r.
+        Process group must be initialised (e.g. gloo) before construction, each process
+        constructs circuit with same initial parameters.
+
+        Args:
+            num_vars (int): Number of variables in satisfiability problem.
+            layers (int, optional): QAOA circuit layers. Defaults to 1.
+            init_gamma (Tensor, optional): Initial cost unitary parameter values. Defaults to all -0.01.
+            init_beta (Tensor, optional): Initial mixing unitary parameter values. Defaults to all 0.01.
+
+        Raises:
+            RuntimeError: Process group not initialised.
+            RuntimeError: Number of processes not a power of 2 or too large for problem.
+        """
+        if not dist.is_initialized():
+            raise RuntimeError("Process group must be initialised before creating circuit")
+
+        rank = dist.get_rank()
+        world_size = dist.get_world_size()
+        r = world_size.bit_length() - 1
+        if 2**r != world_size or r > num_vars:
+            raise RuntimeError(
+                f"Number of processes must be a power of 2 no greater than 2^{num_vars}, received {world_size}"
+            )
+
+        # Shard of state held by this process
+        self.rank = rank
+        self.world_size = world_size
+        self.r = r
+        self.local_N = 2 ** (num_vars - r)
+        self.offset = rank * self.local_N
+
+        super(DistributedCircuit, self).__init__(
+            num_vars, layers, init_gamma, init_beta
+        )
+
+        # Sum parameter gradients over processes
+        for param in self.parameters():
+            param.register_hook(self.reduce_gradient)
+
+    def reduce_gradient(self, grad: Tensor) -> Tensor:
+        """Sum gradient contributions of all processes.
+
+        Args:
+            grad (Tensor): Local gradient contribution.
+
+        Returns:
+            Tensor: Total gradient.
+        """
+        grad = grad.clone()
+        dist.all_reduce(grad)
+        return grad
+
+    def initial_state(self) -> Tensor:
+        """Local shard of equal superposition over all bitstrings.
+
+        Returns:
+            Tensor: Initial local state.
+        """
+        circuit = torch.full((self.local_N,), self.N, dtype=torch.cfloat)
+        circuit = torch.sqrt(circuit)
+        circuit = torch.reciprocal(circuit)
+        return circuit
+
+    def local_counts(self, formula: CNF) -> Tensor:
+        """Unsatisfied clauses for bitstrings in local shard (without evaluating all 2^n).
+
+        Args:
+            formula (CNF): Formula being solved.
+
+        Returns:
+            Tensor: Tensor of unsatisfied clauses per local bitstring.
+        """
+        counts = formula.counts_range(self.offset, self.offset + self.local_N)
+        return torch.from_numpy(counts)
+
+    def local_sats(self, h: Tensor) -> Tensor:
+        """Local indices of satisfying assignments in shard.
+
+        Args:
+            h (Tensor): Tensor of unsatisfied clauses per local bitstring.
+
+        Returns:
+            Tensor: Local indices of satisfying assignments.
+        """
+        return torch.from_numpy(np.where(h.numpy() == 0.0)[0])
+
+    def mix(self, circuit: Tensor, beta: Tensor) -> Tensor:
+        """Apply mixing unitary to local shard, exchanging shards with peers for
+        partition qubits.
+
+        Args:
+            circuit (Tensor): Local state mixing unitary is being applied to.
+            beta (Tensor): Parameter parameterising mixing unitary.
+
+        Returns:
+            Tensor: Mixed local state.
+        """
+        cg = torch.complex(torch.cos(beta), torch.tensor(0.0))
+        sg = torch.complex(torch.tensor(0.0), torch.sin(beta))
+
+        for i in range(self.n):
+            if i < self.r:
+                # Partition qubit, flipped amplitudes held by peer
+                peer = self.rank ^ (1 << (self.r - 1 - i))
+                flipped = PairwiseExchange.apply(circuit, peer)
+            else:
+                # Local qubit, swap halves within shard
+                flipped = circuit.reshape((2 ** (i - self.r), 2, -1))
+                flipped = flipped.flip(1).reshape(self.local_N)
+
+            circuit = cg * circuit + sg * flipped
+
+        return circuit
+
+    def succ_prob(self, circuit: Tensor, hS: Tensor) -> Tensor:
+        """Success probability on output state (reduced over all processes).
+
+        Args:
+            circuit (Tensor): Local output state.
+            hS (Tensor): Local indices of satisfying assignments.
+
+        Returns:
+            Tensor: Success probability.
+        """
+        local = super().succ_prob(circuit, hS)
+        return AllReduceSum.apply(local)
@@ -0,0 +1,58 @@
+import math
+import torch
+from torch import Tensor
+from typing import Tuple
+
+from k_sat.pytorch_solver.pytorch_circuit import PytorchCircuit
+
+
+class FourierCircuit(PytorchCircuit):
+    def __init__(
+        self,
+        num_vars: int,
+        layers: int = 1,
+        init_u: Tensor = None,
+        init_v: Tensor = None,
+        compiled: bool = False,
+    ) -> None:
+        """QAOA circuit parameterised by frequency components of its parameters (FOURIER
+        strategy of [arXiv:1812.01041]):
+            gamma_i = sum_k u_k sin((k - 1/2)(i - 1/2) pi / p)
+            beta_i = sum_k v_k cos((k - 1/2)(i - 1/2) pi / p)
+
+        Args:
+            num_vars (int): Number of variables in satisfiability problem.
+            layers (int, optional): QAOA circuit layers. Defaults to 1.
+            init_u (Tensor, optional): Initial cost frequency components, q <= layers of them. Defaults to -0.01 in lowest frequency.
+            init_v (Tensor, optional): Initial mixing frequency components, q <= layers of them. Defaults to 0.01 in lowest frequency.
+            compiled (bool, optional): Evolve with compiled fused layers. Defaults to False.
+        """
+        super(FourierCircuit, self).__init__(num_vars, layers, compiled=compiled)
+
+        # Optimise over frequency components instead
+        del self.gamma
+        del self.beta
+
+        if init_u is None:
+            init_u = torch.full(size=(1,), fill_value=-0.01)
+        if init_v is None:
+            init_v = torch.full(size=(1,), fill_value=0.01)
+
+        self.u = torch.nn.Parameter(init_u)
+        self.v = torch.nn.Parameter(init_v)
+
+        # Sine and cosine bases, indexed by (layer, frequency)
+        q = len(init_u)
+        i = torch.arange(layers, dtype=torch.float32) + 0.5
+        k = torch.arange(q, dtype=torch.float32) + 0.5
+        phase = torch.outer(i, k) * math.pi / layers
+        self.sin_basis = torch.sin(phase)
+        self.cos_basis = torch.cos(phase)
+
+    def angles(self) -> Tuple[Tensor, Tensor]:
+        """Cost and mixing unitary parameters of each layer.
+
+        Returns:
+            Tuple[Tensor, Tensor]: Cost and mixing unitary parameters.
+        """
+        return self.sin_basis @ self.u, self.cos_basis @ self.v
@@ -0,0 +1,158 @@
+import math
+import torch
+from torch import Tensor
+from typing import Tuple, Union
+
+from k_sat.pytorch_solver.pytorch_circuit import PytorchCircuit
+
+
+class GroverCircuit(PytorchCircuit):
+    def __init__(
+        self,
+        num_vars: int,
+        layers: int = 1,
+        init_gamma: Tensor = None,
+        init_beta: Tensor = None,
+    ) -> None:
+        """QAOA circuit with Grover mixer e^{i beta |s><s|} (phase on uniform superposition |s>)
+        instead of transverse field mixer. Amplitudes then depend only on the number of
+        unsatisfied clauses of a bitstring, so the circuit is simulated on the levels of h
+        weighted by their degeneracies (density of states), at a cost independent of 2^n
+        once the histogram of h is known (computed once per formula by prepare).
+
+        Args:
+            num_vars (int): Number of variables in satisfiability problem.
+            layers (int, optional): QAOA circuit layers. Defaults to 1.
+            init_gamma (Tensor, optional): Initial cost unitary parameter values. Defaults to all -0.01.
+            init_beta (Tensor, optional): Initial mixing unitary parameter values. Defaults to all 0.01.
+        """
+        super(GroverCircuit, self).__init__(num_vars, layers, init_gamma, init_beta)
+
+    def initial_state(self) -> Tensor:
+        """Amplitude of every bitstring in equal superposition.
+
+        Returns:
+            Tensor: Initial amplitude.
+        """
+        return torch.tensor(1 / math.sqrt(self.N), dtype=torch.cdouble)
+
+    def histogram(self, h: Tensor) -> Tuple[Tensor, Tensor, Tensor]:
+        """Levels of h and their degeneracies.
+
+        Args:
+            h (Tensor): Tensor of unsatisfied clauses per bitstring.
+
+        Returns:
+            Tuple[Tensor, Tensor, Tensor]: Distinct levels, number of bitstrings on each level and level of each bitstring.
+        """
+        levels, inverse, degeneracies = torch.unique(
+            torch.as_tensor(h), return_inverse=True, return_counts=True
+        )
+        return levels.to(torch.float64), degeneracies.to(torch.float64), inverse
+
+    def prepare(self, h: Tensor) -> Tuple[Tensor, Tensor, Tensor]:
+        """Histogram of h, computed once per formula before training rather than every epoch.
+
+        Args:
+            h (Tensor): Tensor of unsatisfied clauses per bitstring.
+
+        Returns:
+            Tuple[Tensor, Tensor, Tensor]: Distinct levels, number of bitstrings on each level and level of each bitstring.
+        """
+        return self.histogram(h)
+
+    def evolve_levels(self, levels: Tensor, degeneracies: Tensor) -> Tensor:
+        """Apply QAOA unitary to initial state on level space.
+
+        Args:
+            levels (Tensor): Distinct numbers of unsatisfied clauses.
+            degeneracies (Tensor): Number of bitstrings on each level.
+
+        Returns:
+            Tensor: Final amplitude of bitstrings on each level.
+        """
+        gamma, beta = self.angles()
+        sqrt_N = math.sqrt(self.N)
+        amplitudes = self.initial.expand(len(levels))
+
+        for i in range(self.layers):
+            # Cost
+            amplitudes = amplitudes * torch.exp(1j * gamma[i].double() * levels)
+
+            # Mix: psi + (e^{i beta} - 1) <s|psi> |s>
+            overlap = torch.sum(degeneracies * amplitudes) / sqrt_N
+            amplitudes = amplitudes + (torch.exp(1j * beta[i].double()) - 1) * overlap / sqrt_N
+
+        return amplitudes
+
+    def level_probabilities(self, levels: Tensor, degeneracies: Tensor) -> Tensor:
+        """Probability of measuring a bitstring on each level.
+
+        Args:
+            levels (Tensor): Distinct numbers of unsatisfied clauses.
+            degeneracies (Tensor): Number of bitstrings on each level.
+
+        Returns:
+            Tensor: Probability per level.
+        """
+        amplitudes = self.evolve_levels(levels, degeneracies)
+        return degeneracies * (amplitudes.real**2 + amplitudes.imag**2)
+
+    def level_succ_prob(self, levels: Tensor, degeneracies: Tensor) -> Tensor:
+        """Success probability from histogram of h alone.
+
+        Args:
+            levels (Tensor): Distinct numbers of unsatisfied clauses.
+            degeneracies (Tensor): Number of bitstrings on each level.
+
+        Returns:
+            Tensor: Success probability.
+        """
+        ps = self.level_probabilities(levels, degeneracies)
+        return torch.sum(ps[levels == 0]).to(torch.float32)
+
+    def evolve(
+        self, h: Union[Tensor, Tuple[Tensor, Tensor, Tensor]], initial: Tensor = None
+    ) -> Tensor:
+        """Apply QAOA unitary to initial state.
+
+        Args:
+            h (Union[Tensor, Tuple[Tensor, Tensor, Tensor]]): Tensor of unsatisfied clauses per bitstring, or its histogram.
+            initial (Tensor, optional): Not supported, state must be equal superposition.
+
+        Raises:
+            RuntimeError: Initial state given.
+
+        Returns:
+            Tensor: Final state.
+        """
+        if initial is not None:
+            raise RuntimeError("Grover mixer circuit must start from equal superposition")
+        levels, degeneracies, inverse = h if isinstance(h, tuple) else self.histogram(h)
+        amplitudes = self.evolve_levels(levels, degeneracies)
+        return amplitudes.to(torch.cfloat)[inverse]
+
+    def forward(
+        self,
+        h: Union[Tensor, Tuple[Tensor, Tensor, Tensor]],
+        hS: Tensor,
+        initial: Tensor = None,
+    ) -> Tensor:
+        """Application of QAOA circuit to calculate success probability. Satisfying
+        assignments are the bitstrings with no unsatisfied clauses.
+
+        Args:
+            h (Union[Tensor, Tuple[Tensor, Tensor, Tensor]]): Tensor of unsatisfied clauses per bitstring, or its histogram.
+            hS (Tensor): Indices of satisfying assignments (unused).
+            initial (Tensor, optional): Not supported, state must be equal superposition.
+
+        Raises:
+            RuntimeError: Initial state given.
+
+        Returns:
+            Tensor: Success probability of evolved initial state with inputs.
+        """
+        if initial is not None:
+            raise RuntimeError("Grover mixer circuit must start from equal superposition")
+        levels, degeneracies, _ = h if isinstance(h, tuple) else self.histogram(h)
+        return self.level_succ_prob(levels, degeneracies)
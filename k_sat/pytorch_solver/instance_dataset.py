@@ -0,0 +1,70 @@
+import torch
+from torch import Tensor
+from torch.utils.data import Dataset, DataLoader
+from typing import Callable, List, Tuple
+
+from formula.formula import Formula
+
+
+class InstanceDataset(Dataset):
+    def __init__(self, load: Callable[[int], Formula], indices: List[int]) -> None:
+        """Problem instances read from disk on access so only instances currently in use
+        are held in memory.
+
+        Args:
+            load (Callable[[int], Formula]): Reads instance with given file index, e.g.
+                functools.partial(generator.from_file, n, k, True). Must be picklable if
+                loaded by worker processes.
+            indices (List[int]): File indices of instances.
+        """
+        self.load = load
+        self.indices = indices
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __getitem__(self, i: int) -> Tuple[Tensor, Tensor]:
+        """Unsatisfied clause counts and satisfying assignments of instance.
+
+        Args:
+            i (int): Position of instance in dataset.
+
+        Returns:
+            Tuple[Tensor, Tensor]: Unsatisfied clauses per bitstring and indices of satisfying assignments.
+        """
+        formula = self.load(self.indices[i])
+        return torch.from_numpy(formula.naive_counts), torch.from_numpy(
+            formula.naive_sats
+        )
+
+
+def instance_loader(
+    dataset: InstanceDataset,
+    batch_size: int = 8,
+    shuffle: bool = True,
+    num_workers: int = 0,
+    prefetch_factor: int = 2,
+) -> DataLoader:
+    """Mini-batches of instances streamed from disk. At most num_workers * prefetch_factor
+    batches are loaded ahead of the batch in use, bounding memory.
+
+    Args:
+        dataset (InstanceDataset): Instances to stream.
+        batch_size (int, optional): Instances per mini-batch. Defaults to 8.
+        shuffle (bool, optional): Reshuffle instances every epoch. Defaults to True.
+        num_workers (int, optional): Worker processes reading instances in background. Defaults to 0 (read in main process).
+        prefetch_factor (int, optional): Batches loaded in advance per worker. Defaults to 2.
+
+    Returns:
+        DataLoader: Loader yielding lists of (counts, sats) pairs.
+    """
+    return DataLoader(
+        dataset,
+        batch_size=batch_size,
+        shuffle=shuffle,
+        num_workers=num_workers,
+        prefetch_factor=prefetch_factor if num_workers > 0 else None,
+        persistent_workers=num_workers > 0,
+        # Instances have different numbers of satisfying assignments, so keep as list
+        collate_fn=list,
+    )
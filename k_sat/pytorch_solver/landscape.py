@@ -0,0 +1,199 @@
+import torch
+from torch import Tensor
+from typing import Tuple
+
+
+def popcount(x: Tensor) -> Tensor:
+    """Number of set bits of each (non-negative, < 2^32) integer.
+
+    Args:
+        x (Tensor): Integers.
+
+    Returns:
+        Tensor: Set bits per integer.
+    """
+    table = torch.tensor([bin(i).count("1") for i in range(256)], dtype=torch.long)
+    count = torch.zeros_like(x)
+    for shift in range(0, 32, 8):
+        count += table[(x >> shift) & 0xFF]
+    return count
+
+
+def mix_batch(state: Tensor, c: Tensor, s: Tensor, tmp: Tensor) -> Tensor:
+    """Apply mixing unitary e^{i beta X} on each qubit to batch of states in place, as a
+    butterfly over amplitude pairs differing in that qubit (x_i is bit n - 1 - i of index).
+
+    Args:
+        state (Tensor): States, shape (B, 2^n).
+        c (Tensor): cos(beta), scalar or per state with shape (B, 1, 1).
+        s (Tensor): i sin(beta), scalar or per state with shape (B, 1, 1).
+        tmp (Tensor): Scratch space of B * 2^n / 2 complex amplitudes.
+
+    Returns:
+        Tensor: Mixed states.
+    """
+    B, N = state.shape
+    for i in range(N.bit_length() - 1):
+        view = state.view(B, 2**i, 2, -1)
+        a = view[:, :, 0]
+        b = view[:, :, 1]
+        t = tmp.view(a.shape)
+        t.copy_(a)
+        a.mul_(c).add_(b * s)
+        b.mul_(c).add_(t * s)
+    return state
+
+
+class Landscape:
+    def __init__(self, h: Tensor, hS: Tensor, max_bytes: int = 2**30) -> None:
+        """Evaluates QAOA circuits for many parameter sets on one formula at once, evolving
+        a (G, 2^n) batch of states. Cost phases are looked up from a table over the distinct
+        unsatisfied clause counts (level sets of h) rather than exponentiated per amplitude.
+
+        Args:
+            h (Tensor): Tensor of unsatisfied clauses per bitstring.
+            hS (Tensor): Indices of satisfying assignments.
+            max_bytes (int, optional): Approximate memory budget for batch of states, batch is evaluated in chunks to fit. Defaults to 1 GiB.
+        """
+        h = torch.as_tensor(h)
+        self.N = len(h)
+        self.n = self.N.bit_length() - 1
+        self.h = h.to(torch.float32)
+        self.hS = torch.as_tensor(hS, dtype=torch.long)
+
+        # Level sets: h = levels[inverse]
+        self.levels, self.inverse = torch.unique(self.h, return_inverse=True)
+
+        # State, phases and temporaries, complex64 amplitudes
+        self.max_bytes = max_bytes
+        self.chunk_size = max(1, max_bytes // (4 * 8 * self.N))
+
+        # Depth 1 tables for satisfying assignments, built on first use
+        self.distance_tables = None
+
+    def evolve(self, gamma: Tensor, beta: Tensor) -> Tensor:
+        """Apply QAOA unitaries for batch of parameter sets to initial state.
+
+        Args:
+            gamma (Tensor): Cost unitary parameters, shape (G, p).
+            beta (Tensor): Mixing unitary parameters, shape (G, p).
+
+        Returns:
+            Tensor: Final states, shape (G, 2^n).
+        """
+        G, p = gamma.shape
+        state = torch.full((G, self.N), 1 / self.N**0.5, dtype=torch.cfloat)
+        tmp = torch.empty(G * self.N // 2, dtype=torch.cfloat)
+
+        for l in range(p):
+            # Cost: phase per level, gathered onto bitstrings
+            phases = torch.exp(1j * torch.outer(gamma[:, l], self.levels))
+            state.mul_(phases[:, self.inverse])
+
+            # Mix: e^{i beta X} on each qubit in place
+            c = torch.cos(beta[:, l]).to(torch.cfloat).reshape(G, 1, 1)
+            s = (1j * torch.sin(beta[:, l])).to(torch.cfloat).reshape(G, 1, 1)
+            mix_batch(state, c, s, tmp)
+
+        return state
+
+    def evaluate(self, gamma: Tensor, beta: Tensor) -> Tuple[Tensor, Tensor]:
+        """Success probability and expected unsatisfied clauses <H> for each parameter set.
+
+        Args:
+            gamma (Tensor): Cost unitary parameters, shape (G, p).
+            beta (Tensor): Mixing unitary parameters, shape (G, p).
+
+        Returns:
+            Tuple[Tensor, Tensor]: Success probabilities and energies, shape (G,).
+        """
+        gamma = torch.as_tensor(gamma, dtype=torch.float32)
+        beta = torch.as_tensor(beta, dtype=torch.float32)
+
+        p_succs = []
+        energies = []
+        with torch.no_grad():
+            for start in range(0, len(gamma), self.chunk_size):
+                stop = start + self.chunk_size
+                state = self.evolve(gamma[start:stop], beta[start:stop])
+                ps = state.real**2 + state.imag**2
+                p_succs.append(ps[:, self.hS].sum(dim=1))
+                energies.append(ps @ self.h)
+
+        return torch.cat(p_succs), torch.cat(energies)
+
+    def grid(self, gammas: Tensor, betas: Tensor) -> Tuple[Tensor, Tensor]:
+        """Depth 1 landscape over grid of cost and mixing parameters.
+
+        Args:
+            gammas (Tensor): Cost unitary parameter values.
+            betas (Tensor): Mixing unitary parameter values.
+
+        Returns:
+            Tuple[Tensor, Tensor]: Success probability and energy grids, indexed by (gamma, beta).
+        """
+        gammas = torch.as_tensor(gammas, dtype=torch.float32)
+        betas = torch.as_tensor(betas, dtype=torch.float32)
+        gamma, beta = torch.meshgrid(gammas, betas, indexing="ij")
+        shape = gamma.shape
+
+        p_succ, energy = self.evaluate(gamma.reshape(-1, 1), beta.reshape(-1, 1))
+        return p_succ.reshape(shape), energy.reshape(shape)
+
+    def build_distance_tables(self) -> Tensor:
+        """Counts K_x[d, l] of bitstrings at Hamming distance d from each satisfying
+        assignment x with l unsatisfied clauses. At depth 1,
+            <x|U|psi> = 1/sqrt(N) sum_{d, l} cos^{n - d}(beta) (i sin(beta))^d e^{i gamma l} K_x[d, l]
+        so amplitudes of satisfying assignments need no evolution once tables are built.
+
+        Returns:
+            Tensor: Tables, shape (|S|, n + 1, levels).
+        """
+        L = len(self.levels)
+        y = torch.arange(self.N, dtype=torch.long)
+
+        # Process satisfying assignments in chunks to bound memory
+        chunk = max(1, self.max_bytes // (3 * 8 * self.N))
+        tables = []
+        for start in range(0, len(self.hS), chunk):
+            x = self.hS[start : start + chunk]
+            d = popcount(x[:, None] ^ y[None, :])
+            keys = (torch.arange(len(x))[:, None] * (self.n + 1) + d) * L + self.inverse
+            counts = torch.bincount(keys.flatten(), minlength=len(x) * (self.n + 1) * L)
+            tables.append(counts.reshape(len(x), self.n + 1, L))
+
+        if not tables:
+            return torch.zeros((0, self.n + 1, L))
+        return torch.cat(tables).to(torch.float32)
+
+    def succ_grid(self, gammas: Tensor, betas: Tensor) -> Tensor:
+        """Depth 1 success probability landscape without evolving states, using distance
+        tables of satisfying assignments (built once, O(|S| 2^n)). Exact, and much faster
+        than grid for dense grids.
+
+        Args:
+            gammas (Tensor): Cost unitary parameter values.
+            betas (Tensor): Mixing unitary parameter values.
+
+        Returns:
+            Tensor: Success probability grid, indexed by (gamma, beta).
+        """
+        if self.distance_tables is None:
+            self.distance_tables = self.build_distance_tables()
+        K = self.distance_tables.to(torch.cfloat)
+
+        gammas = torch.as_tensor(gammas, dtype=torch.float32)
+        betas = torch.as_tensor(betas, dtype=torch.float32)
+
+        # Cost phase per (gamma, level), mixing weight per (beta, distance)
+        phases = torch.exp(1j * torch.outer(gammas, self.levels))
+        d = torch.arange(self.n + 1)
+        i_pow = torch.tensor([1, 1j, -1, -1j], dtype=torch.cfloat)[d % 4]
+        weights = (
+            torch.cos(betas)[:, None] ** (self.n - d) * torch.sin(betas)[:, None] ** d
+        ) * i_pow
+
+        # Amplitudes of satisfying assignments, indexed by (gamma, beta, assignment)
+        partial = torch.einsum("gl,sdl->gsd", phases, K)
+        amplitudes = torch.einsum("bd,gsd->gbs", weights, partial) / self.N**0.5
+        return (amplitudes.real**2 + amplitudes.imag**2).sum(dim=2)
@@ -0,0 +1,233 @@
+import tempfile
+import numpy as np
+import torch
+from torch import Tensor
+from typing import List, Tuple
+
+from formula.formula import Formula
+from k_sat.pytorch_solver.pytorch_circuit import PytorchCircuit
+from k_sat.pytorch_solver.fourier_circuit import FourierCircuit
+from k_sat.pytorch_solver.pytorch_optimiser import PytorchOptimiser, formula_counts
+
+
+def interp(gamma: Tensor, beta: Tensor) -> Tuple[Tensor, Tensor]:
+    """INTERP initialisation of depth p + 1 parameters from optimal depth p parameters
+    [arXiv:1812.01041], linearly interpolating parameter curves onto p + 1 points.
+
+    Args:
+        gamma (Tensor): Optimal cost unitary parameters at depth p.
+        beta (Tensor): Optimal mixing unitary parameters at depth p.
+
+    Returns:
+        Tuple[Tensor, Tensor]: Initial cost and mixing unitary parameters at depth p + 1.
+    """
+
+    def extend(params: Tensor) -> Tensor:
+        p = len(params)
+        # Pad with zeros so [params]_0 = [params]_{p+1} = 0
+        padded = torch.cat((torch.zeros(1), params.detach(), torch.zeros(1)))
+        i = torch.arange(1, p + 2, dtype=params.dtype)
+        return (i - 1) / p * padded[:-1] + (p - i + 1) / p * padded[1:]
+
+    return extend(gamma), extend(beta)
+
+
+class LayerwiseOptimiser:
+    def __init__(
+        self,
+        num_vars: int,
+        layers: int,
+        strategy: str = "interp",
+        epochs: int = 250,
+        fourier_terms: int = None,
+        fine_tune: int = 0,
+        cache_dir: str = None,
+        batch_size: int = None,
+        compiled: bool = False,
+    ) -> None:
+        """Trains QAOA circuits of increasing depth p = 1, ..., layers, initialising each
+        depth from the optimum of the previous one. The "greedy" strategy instead freezes
+        earlier layers and trains only the new one, starting from cached states after the
+        frozen layers.
+
+        Args:
+            num_vars (int): Number of variables in satisfiability problem.
+            layers (int): Final number of QAOA circuit layers.
+            strategy (str, optional): Initialisation strategy, "interp", "fourier" or "greedy". Defaults to "interp".
+            epochs (int, optional): Epochs to train for at each depth. Defaults to 250.
+            fourier_terms (int, optional): Frequency components for "fourier" strategy. Defaults to depth of circuit.
+            fine_tune (int, optional): Epochs to train all layers jointly after "greedy" training. Defaults to 0.
+            cache_dir (str, optional): Directory to memory-map cached states in for "greedy" strategy, in a temporary subdirectory removed after training. Defaults to None (in memory).
+            batch_size (int, optional): Formulas evolved per backward pass (gradients accumulated over batches). Defaults to all formulas.
+            compiled (bool, optional): Evolve circuits at every depth with compiled fused layers. Defaults to False.
+
+        Raises:
+            RuntimeError: Strategy not recognised.
+        """
+        if strategy not in ["interp", "fourier", "greedy"]:
+            raise RuntimeError(f"Layerwise strategy {strategy} not recognised")
+
+        self.num_vars = num_vars
+        self.layers = layers
+        self.strategy = strategy
+        self.epochs = epochs
+        self.fourier_terms = fourier_terms
+        self.fine_tune = fine_tune
+        self.cache_dir = cache_dir
+        self.batch_size = batch_size
+        self.compiled = compiled
+        self.circuit = None
+
+    def next_circuit(self, circuit: PytorchCircuit) -> PytorchCircuit:
+        """Circuit one layer deeper, initialised from (trained) circuit.
+
+        Args:
+            circuit (PytorchCircuit): Trained circuit, None to start from depth 1.
+
+        Returns:
+            PytorchCircuit: Initialised circuit.
+        """
+        p = 0 if circuit is None else circuit.layers
+
+        if self.strategy == "interp":
+            if circuit is None:
+                return PytorchCircuit(self.num_vars, 1, compiled=self.compiled)
+            init_gamma, init_beta = interp(*circuit.angles())
+            return PytorchCircuit(self.num_vars, p + 1, init_gamma, init_beta, compiled=self.compiled)
+
+        if circuit is None:
+            return FourierCircuit(self.num_vars, 1, compiled=self.compiled)
+        u = circuit.u.detach()
+        v = circuit.v.detach()
+        if self.fourier_terms is None or len(u) < self.fourier_terms:
+            # Add next (initially unused) frequency component
+            u = torch.cat((u, torch.zeros(1)))
+            v = torch.cat((v, torch.zeros(1)))
+        return FourierCircuit(self.num_vars, p + 1, u, v, compiled=self.compiled)
+
+    def find_optimal_params(self, formulas: List[Formula], matrix_free: bool = False) -> float:
+        """Finds optimal parameters of circuit at each depth by maximising success probability over provided formulas.
+
+        Args:
+            formulas (List[Formula]): Formulas to maximise success probability over.
+            matrix_free (bool, optional): Train on matrix-free cost, never computing formulas' counts. Defaults to False.
+
+        Returns:
+            float: Average success probability over formulas at final depth.
+        """
+        if self.strategy == "greedy":
+            return self.find_greedy_params(formulas, matrix_free)
+
+        circuit = None
+        for p in range(1, self.layers + 1):
+            circuit = self.next_circuit(circuit)
+            print(f"Training depth {p}")
+            optimiser = PytorchOptimiser(circuit, epochs=self.epochs, batch_size=self.batch_size)
+            p_succ = optimiser.find_optimal_params(formulas, matrix_free)
+
+        self.circuit = circuit
+        return p_succ
+
+    def cache(self, directory: str, name: str, state: Tensor) -> Tensor:
+        """Store state after frozen layers, memory-mapped if cache directory set.
+
+        Args:
+            directory (str): Directory to memory-map state in, None to keep in memory.
+            name (str): Name of file state is written to.
+            state (Tensor): State of one formula.
+
+        Returns:
+            Tensor: Cached state.
+        """
+        if directory is None:
+            return state
+
+        mm = np.memmap(
+            f"{directory}/{name}.dat", dtype=np.complex64, mode="w+", shape=(len(state),)
+        )
+        mm[:] = state.numpy()
+        mm.flush()
+        return torch.from_numpy(mm)
+
+    def find_greedy_params(self, formulas: List[Formula], matrix_free: bool = False) -> float:
+        """Trains one new layer at a time from cached states after the frozen earlier layers,
+        so each epoch costs one layer regardless of depth, then optionally fine tunes all
+        layers jointly.
+
+        Args:
+            formulas (List[Formula]): Formulas to maximise success probability over.
+            matrix_free (bool, optional): Train on matrix-free cost, never computing formulas' counts. Defaults to False.
+
+        Returns:
+            float: Average success probability over formulas at final depth.
+        """
+        # Cached states written to files in temporary directory, removed after training
+        tmp = None
+        if self.cache_dir is not None:
+            tmp = tempfile.TemporaryDirectory(dir=self.cache_dir)
+        try:
+            return self.train_greedy(formulas, matrix_free, None if tmp is None else tmp.name)
+        finally:
+            if tmp is not None:
+                tmp.cleanup()
+
+    def train_greedy(
+        self, formulas: List[Formula], matrix_free: bool, directory: str
+    ) -> float:
+        """Greedy layer by layer training, caching states in directory.
+
+        Args:
+            formulas (List[Formula]): Formulas to maximise success probability over.
+            matrix_free (bool): Train on matrix-free cost, never computing formulas' counts.
+            directory (str): Directory to memory-map cached states in, None to keep in memory.
+
+        Returns:
+            float: Average success probability over formulas at final depth.
+        """
+        counts = formula_counts(formulas, matrix_free)
+
+        gammas = []
+        betas = []
+        states = None
+        for p in range(1, self.layers + 1):
+            # New layer initialised from previous one
+            if p == 1:
+                layer = PytorchCircuit(self.num_vars, 1, compiled=self.compiled)
+            else:
+                layer = PytorchCircuit(
+                    self.num_vars, 1, gammas[-1].clone(), betas[-1].clone(), compiled=self.compiled
+                )
+
+            print(f"Training layer {p}")
+            optimiser = PytorchOptimiser(layer, epochs=self.epochs, batch_size=self.batch_size)
+            if states is None:
+                batch = counts
+            else:
+                batch = [(h, hS, state) for (h, hS), state in zip(counts, states)]
+            p_succ = optimiser.train(lambda: optimiser.step(batch), self.epochs)
+
+            gammas.append(layer.gamma.detach())
+            betas.append(layer.beta.detach())
+
+            # Freeze layer, advancing cached states past it one formula at a time (files
+            # alternate between layers so states being read are not overwritten)
+            with torch.no_grad():
+                states = [
+                    self.cache(
+                        directory,
+                        f"prefix_{i}_{p % 2}",
+                        layer.evolve(h, None if states is None else states[i]),
+                    )
+                    for i, (h, _) in enumerate(counts)
+                ]
+
+        circuit = PytorchCircuit(
+            self.num_vars, self.layers, torch.cat(gammas), torch.cat(betas), compiled=self.compiled
+        )
+        if self.fine_tune > 0:
+            print("Fine tuning all layers")
+            optimiser = PytorchOptimiser(circuit, epochs=self.fine_tune, batch_size=self.batch_size)
+            p_succ = optimiser.train(lambda: optimiser.step(counts), self.fine_tune)
+
+        self.circuit = circuit
+        return p_succ
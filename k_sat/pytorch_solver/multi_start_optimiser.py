@@ -0,0 +1,213 @@
+import math
+import torch
+import torch.multiprocessing as mp
+from torch import Tensor
+from typing import Dict, List, Tuple
+
+from formula.formula import Formula
+from k_sat.pytorch_solver.pytorch_circuit import PytorchCircuit
+from k_sat.pytorch_solver.pytorch_optimiser import PytorchOptimiser, formula_counts
+
+# Formula tensors of worker process, shared with parent
+_counts: List[Tuple[Tensor, Tensor]] = None
+
+
+def _init_worker(counts: List[Tuple[Tensor, Tensor]]) -> None:
+    global _counts
+    _counts = counts
+    # One thread per process, restarts already run in parallel
+    torch.set_num_threads(1)
+
+
+def _train(task: Tuple) -> Tuple:
+    """Continue training one restart for a round.
+
+    Args:
+        task (Tuple): Restart index, number of variables, cost and mixing parameters, optimiser state, epochs, learning rate and batch size.
+
+    Returns:
+        Tuple: Restart index, success probability, cost and mixing parameters and optimiser state after round.
+    """
+    index, n, gamma, beta, state, epochs, lr, batch_size = task
+    circuit = PytorchCircuit(n, len(gamma), gamma, beta)
+    optimiser = torch.optim.Adam(circuit.parameters(), lr=lr, maximize=True)
+    if state is not None:
+        optimiser.load_state_dict(state)
+
+    trainer = PytorchOptimiser(circuit, optimiser, batch_size=batch_size)
+    p_succ = trainer.train(lambda: trainer.step(_counts), epochs - 1)
+    return index, p_succ, circuit.gamma.detach(), circuit.beta.detach(), optimiser.state_dict()
+
+
+class MultiStartOptimiser:
+    def __init__(
+        self,
+        num_vars: int,
+        layers: int,
+        restarts: int = 8,
+        processes: int = None,
+        epochs: int = 250,
+        rounds: int = 3,
+        keep: float = 0.5,
+        init: str = "random",
+        lr: float = 0.01,
+        seed: int = None,
+        batch_size: int = None,
+    ) -> None:
+        """Trains QAOA circuit from several initial points in parallel, pruning restarts that
+        fall behind between rounds (successive halving) and keeping the best.
+
+        Args:
+            num_vars (int): Number of variables in satisfiability problem.
+            layers (int): QAOA circuit layers.
+            restarts (int, optional): Number of initial points. Defaults to 8.
+            processes (int, optional): Worker processes, 0 to train in this process. Defaults to number of CPUs.
+            epochs (int, optional): Epochs to train surviving restarts for in total. Defaults to 250.
+            rounds (int, optional): Rounds epochs are split into, restarts are pruned after each but last. Defaults to 3.
+            keep (float, optional): Fraction of restarts kept after each round. Defaults to 0.5.
+            init (str, optional): Initial points, "random" (uniform) or "ramp" (linear annealing-like schedules of random duration). Defaults to "random".
+            lr (float, optional): Adam learning rate. Defaults to 0.01.
+            seed (int, optional): Seed for initial points. Defaults to None.
+            batch_size (int, optional): Formulas evolved per backward pass (gradients accumulated over batches). Defaults to all formulas.
+
+        Raises:
+            RuntimeError: Initialisation not recognised.
+        """
+        if init not in ["random", "ramp"]:
+            raise RuntimeError(f"Multi-start initialisation {init} not recognised")
+
+        self.num_vars = num_vars
+        self.layers = layers
+        self.restarts = restarts
+        self.processes = processes if processes is not None else mp.cpu_count()
+        self.epochs = epochs
+        self.rounds = rounds
+        self.keep = keep
+        self.init = init
+        self.lr = lr
+        self.batch_size = batch_size
+        self.generator = torch.Generator()
+        if seed is not None:
+            self.generator.manual_seed(seed)
+
+        self.circuit = None
+        self.results = None
+        self.summary = None
+
+    def initial_points(self) -> List[Tuple[Tensor, Tensor]]:
+        """Initial cost and mixing parameters of each restart.
+
+        Returns:
+            List[Tuple[Tensor, Tensor]]: Cost and mixing parameters per restart.
+        """
+        p = self.layers
+        points = []
+        for _ in range(self.restarts):
+            if self.init == "random":
+                gamma = -torch.rand(p, generator=self.generator)
+                beta = torch.rand(p, generator=self.generator)
+            else:
+                # Cost ramps up while mixing ramps down over random total time
+                dt = 0.2 + 0.8 * torch.rand(1, generator=self.generator)
+                i = torch.arange(p, dtype=torch.float32) + 0.5
+                gamma = -i / p * dt
+                beta = (1 - i / p) * dt
+            points.append((gamma, beta))
+        return points
+
+    def find_optimal_params(self, formulas: List[Formula], matrix_free: bool = False) -> float:
+        """Finds optimal parameters of circuit over restarts by maximising success probability over provided formulas.
+
+        Args:
+            formulas (List[Formula]): Formulas to maximise success probability over.
+            matrix_free (bool, optional): Train on matrix-free cost, never computing formulas' counts. Defaults to False.
+
+        Returns:
+            float: Average success probability over formulas of best restart.
+        """
+        # Shared read-only with workers rather than copied (cost operators are recomputed)
+        counts = [
+            (h.share_memory_() if isinstance(h, Tensor) else h, hS.share_memory_())
+            for (h, hS) in formula_counts(formulas, matrix_free)
+        ]
+
+        results = {
+            i: {"gamma": gamma, "beta": beta, "state": None, "p_succ": None, "rounds": 0}
+            for i, (gamma, beta) in enumerate(self.initial_points())
+        }
+        alive = list(results)
+        epochs = max(1, math.ceil(self.epochs / self.rounds))
+
+        global _counts
+        pool = None
+        if self.processes > 0 and len(alive) > 1:
+            ctx = mp.get_context("spawn")
+            pool = ctx.Pool(min(self.processes, len(alive)), _init_worker, (counts,))
+        else:
+            # Trained in this process, keeping caller's thread count
+            _counts = counts
+
+        try:
+            for r in range(self.rounds):
+                tasks = [
+                    (
+                        i, self.num_vars, results[i]["gamma"], results[i]["beta"], results[i]["state"],
+                        epochs, self.lr, self.batch_size,
+                    )
+                    for i in alive
+                ]
+                outputs = pool.map(_train, tasks) if pool is not None else map(_train, tasks)
+                for i, p_succ, gamma, beta, state in outputs:
+                    results[i].update(
+                        {"gamma": gamma, "beta": beta, "state": state, "p_succ": p_succ, "rounds": r + 1}
+                    )
+                print(f"Round {r}, best p_succ: {max(results[i]['p_succ'] for i in alive)}")
+
+                # Successive halving, keep restarts at or above running quantile
+                if r < self.rounds - 1 and len(alive) > 1:
+                    p_succs = torch.tensor([results[i]["p_succ"] for i in alive])
+                    cutoff = torch.quantile(p_succs, 1 - self.keep).item()
+                    survivors = [i for i in alive if results[i]["p_succ"] >= cutoff]
+                    alive = survivors if survivors else [max(alive, key=lambda i: results[i]["p_succ"])]
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+            _counts = None
+
+        best = max(alive, key=lambda i: results[i]["p_succ"])
+        self.circuit = PytorchCircuit(
+            self.num_vars, self.layers, results[best]["gamma"], results[best]["beta"]
+        )
+
+        self.results = [
+            {
+                "restart": i,
+                "p_succ": res["p_succ"],
+                "gamma": res["gamma"].tolist(),
+                "beta": res["beta"].tolist(),
+                "rounds": res["rounds"],
+            }
+            for i, res in results.items()
+        ]
+        finals = torch.tensor([results[i]["p_succ"] for i in alive])
+        self.summary = self.spread(finals)
+        self.summary["best_restart"] = best
+
+        return results[best]["p_succ"]
+
+    def spread(self, p_succs: Tensor) -> Dict[str, float]:
+        """Spread of optima found by restarts trained to completion.
+
+        Args:
+            p_succs (Tensor): Final success probabilities.
+
+        Returns:
+            Dict[str, float]: Minimum, median, maximum and standard deviation.
+        """
+        return {
+            "min": p_succs.min().item(),
+            "median": p_succs.median().item(),
+            "max": p_succs.max().item(),
+            "std": p_succs.std().item() if len(p_succs) > 1 else 0.0,
+        }
@@ -1,5 +1,9 @@
 import torch
 from torch import Tensor
+from typing import Tuple, Union
+
+from k_sat.pytorch_solver.clause_cost import ClauseCost
+from k_sat.pytorch_solver.compiled_layer import compiled_layer
 
 
 class PytorchCircuit(torch.nn.Module):
@@ -9,6 +13,7 @@ class PytorchCircuit(torch.nn.Module):
         layers: int = 1,
         init_gamma: Tensor = None,
         init_beta: Tensor = None,
+        compiled: bool = False,
     ) -> None:
         """Pytorch implementation of QAOA circuit for satisfiability solving.
 
@@ -17,6 +22,7 @@ class PytorchCircuit(torch.nn.Module):
             layers (int, optional): QAOA circuit layers. Defaults to 1.
             init_gamma (Tensor, optional): Initial cost unitary parameter values. Defaults to all -0.01.
             init_beta (Tensor, optional): Initial mixing unitary parameter values. Defaults to all 0.01.
+            compiled (bool, optional): Evolve with compiled fused layers (compiled once per number of variables). Defaults to False.
         """
         super(PytorchCircuit, self).__init__()
 
@@ -32,26 +38,58 @@ class PytorchCircuit(torch.nn.Module):
         self.beta = beta
 
         self.layers = layers
+        self.compiled = compiled
 
         # Initial state equal superposition
         self.n = num_vars
         self.N = 2**num_vars
+        self.initial = self.initial_state()
+
+    def initial_state(self) -> Tensor:
+        """Equal superposition over all bitstrings.
+
+        Returns:
+            Tensor: Initial state.
+        """
         circuit = torch.full((self.N,), self.N, dtype=torch.cfloat)
         circuit = torch.sqrt(circuit)
         circuit = torch.reciprocal(circuit)
-        self.initial = circuit
+        return circuit
+
+    def angles(self) -> Tuple[Tensor, Tensor]:
+        """Cost and mixing unitary parameters of each layer.
+
+        Returns:
+            Tuple[Tensor, Tensor]: Cost and mixing unitary parameters.
+        """
+        return self.gamma, self.beta
+
+    def prepare(self, h: Union[Tensor, ClauseCost]) -> Union[Tensor, ClauseCost]:
+        """Cost representation circuit is evolved with, computed once per formula before
+        training rather than every epoch.
+
+        Args:
+            h (Union[Tensor, ClauseCost]): Tensor of unsatisfied clauses per bitstring, or matrix-free cost operator.
+
+        Returns:
+            Union[Tensor, ClauseCost]: Cost representation, h itself.
+        """
+        return h
 
-    def cost(self, circuit: Tensor, gamma: Tensor, h: Tensor) -> Tensor:
+    def cost(self, circuit: Tensor, gamma: Tensor, h: Union[Tensor, ClauseCost]) -> Tensor:
         """Apply cost unitary to state.
 
         Args:
             circuit (Tensor): State cost unitary is being applied to.
             gamma (Tensor): Parameter parameterising cost unitary.
-            h (Tensor): Tensor of unsatisfied clauses per bitstring.
+            h (Union[Tensor, ClauseCost]): Tensor of unsatisfied clauses per bitstring, or matrix-free cost operator.
 
         Returns:
             Tensor: Costed state.
         """
+        if isinstance(h, ClauseCost):
+            return h.apply(circuit, gamma)
+
         hg = torch.complex(torch.tensor(0.0), h * gamma)
         hg_exp = torch.exp(hg)
         circuit = hg_exp * circuit
@@ -103,38 +141,69 @@ class PytorchCircuit(torch.nn.Module):
         ps = (ps * ps.conj()).real
         return torch.sum(ps)
 
-    def evolve(self, h: Tensor) -> Tensor:
+    def evolve(self, h: Union[Tensor, ClauseCost], initial: Tensor = None) -> Tensor:
         """Apply QAOA unitary to initial state.
 
         Args:
-            h (Tensor): Tensor of unsatisfied clauses per bitstring.
+            h (Union[Tensor, ClauseCost]): Tensor of unsatisfied clauses per bitstring, or matrix-free cost operator (evolved uncompiled).
+            initial (Tensor, optional): State to start from, e.g. output of earlier layers. Defaults to equal superposition.
 
         Returns:
             Tensor: Final state.
         """
 
-        circuit = self.initial
+        circuit = self.initial if initial is None else initial
+        gamma, beta = self.angles()
+        if not isinstance(h, ClauseCost):
+            h = torch.as_tensor(h)
+
+        if self.compiled and not isinstance(h, ClauseCost):
+            return self.evolve_compiled(circuit, gamma, beta, h)
 
         # QAOA unitary application
         for i in range(self.layers):
-            circuit = self.cost(circuit, self.gamma[i], torch.tensor(h))
-            circuit = self.mix(circuit, self.beta[i])
+            circuit = self.cost(circuit, gamma[i], h)
+            circuit = self.mix(circuit, beta[i])
 
         return circuit
 
-    def forward(self, h: Tensor, hS: Tensor) -> Tensor:
-        """Application of QAOA circuit to calculate success probability.
+    def evolve_compiled(
+        self, circuit: Tensor, gamma: Tensor, beta: Tensor, h: Tensor
+    ) -> Tensor:
+        """Apply QAOA unitary to state using compiled fused layers.
 
         Args:
+            circuit (Tensor): State unitary is being applied to.
+            gamma (Tensor): Cost unitary parameters.
+            beta (Tensor): Mixing unitary parameters.
             h (Tensor): Tensor of unsatisfied clauses per bitstring.
+
+        Returns:
+            Tensor: Final state.
+        """
+        layer = compiled_layer(self.n)
+        re, im = circuit.real, circuit.imag
+        h = h.to(re.dtype)
+        for i in range(self.layers):
+            re, im = layer(re, im, h, gamma[i], beta[i], self.n)
+        return torch.complex(re, im)
+
+    def forward(
+        self, h: Union[Tensor, ClauseCost], hS: Tensor, initial: Tensor = None
+    ) -> Tensor:
+        """Application of QAOA circuit to calculate success probability.
+
+        Args:
+            h (Union[Tensor, ClauseCost]): Tensor of unsatisfied clauses per bitstring, or matrix-free cost operator.
             hS (Tensor): 1 iff bitstring satisfies problem (in bitstring order).
+            initial (Tensor, optional): State to start from. Defaults to equal superposition.
 
         Returns:
             Tensor: Success probability of evolved initial state with inputs.
         """
 
         # Evolve
-        circuit = self.evolve(h)
+        circuit = self.evolve(h, initial)
 
         # Success probability
         return self.succ_prob(circuit, hS)
@@ -1,21 +1,58 @@
+import time
 import torch
+from torch import Tensor
 from torch.optim import Optimizer
-from typing import List
+from typing import Callable, Iterable, List, Tuple, Union
 
 from formula.formula import Formula
 from k_sat.pytorch_solver.pytorch_circuit import PytorchCircuit
+from k_sat.pytorch_solver.clause_cost import ClauseCost
+
+
+def formula_counts(
+    formulas: List[Formula], matrix_free: bool = False
+) -> List[Tuple[Union[Tensor, ClauseCost], Tensor]]:
+    """Unsatisfied clause counts and satisfying assignments of each formula.
+
+    Args:
+        formulas (List[Formula]): Formulas to train on.
+        matrix_free (bool, optional): Use matrix-free cost operators, never computing counts. Defaults to False.
+
+    Returns:
+        List[Tuple[Union[Tensor, ClauseCost], Tensor]]: Counts (or cost operator) and satisfying assignments per formula.
+    """
+    if matrix_free:
+        costs = [ClauseCost(f) for f in formulas]
+        return [(cost, cost.sats()) for cost in costs]
+    return [
+        (torch.from_numpy(f.naive_counts), torch.from_numpy(f.naive_sats))
+        for f in formulas
+    ]
 
 
 class PytorchOptimiser:
     def __init__(
-        self, circuit: PytorchCircuit, optimiser: Optimizer = None, epochs: int = 250
+        self,
+        circuit: PytorchCircuit,
+        optimiser: Optimizer = None,
+        epochs: int = 250,
+        tol: float = None,
+        grad_tol: float = None,
+        patience: int = 10,
+        scheduler: Callable[[Optimizer], object] = None,
+        batch_size: int = None,
     ) -> None:
         """Pytorch implementation of optimiser for QAOA circuit parameters.
 
         Args:
             circuit (PytorchCircuit): Pytorch circuit being optimised over.
-            optimiser (Optimizer, optional): Classical optimiser to use for circuit parameters. Defaults to Adam, lr = 0.01
-            epochs (int, optional): Epochs to train for. Defaults to 250.
+            optimiser (Optimizer, optional): Classical optimiser to use for circuit parameters, closure based optimisers (e.g. LBFGS) supported. Defaults to Adam, lr = 0.01
+            epochs (int, optional): Maximum epochs to train for after the first, so at most epochs + 1 passes over the formulas (optimiser steps). Defaults to 250.
+            tol (float, optional): Stop once success probability changes by less than tol for patience consecutive epochs. Defaults to None.
+            grad_tol (float, optional): Stop once gradient norm falls below grad_tol. Defaults to None.
+            patience (int, optional): Consecutive epochs within tol required to stop. Defaults to 10.
+            scheduler (Callable[[Optimizer], object], optional): Creates learning rate scheduler for optimiser, stepped every epoch. ReduceLROnPlateau is stepped with -p_succ, so should be created in its default "min" mode. Defaults to None.
+            batch_size (int, optional): Formulas evolved per backward pass, gradients accumulated over batches so only one batch's autograd graph is held. Defaults to all formulas.
         """
         self.circuit = circuit
 
@@ -24,26 +61,152 @@ class PytorchOptimiser:
         self.optimiser = optimiser
 
         self.epochs = epochs
+        self.tol = tol
+        self.grad_tol = grad_tol
+        self.patience = patience
+        self.scheduler = scheduler(optimiser) if scheduler is not None else None
+        self.batch_size = batch_size
+
+        self.evaluations = 0
+        self.summary = None
+
+    def grad_norm(self) -> float:
+        """Norm of current gradient of circuit parameters.
+
+        Returns:
+            float: Gradient norm.
+        """
+        grads = [p.grad.flatten() for p in self.circuit.parameters() if p.grad is not None]
+        if not grads:
+            return 0.0
+        return torch.linalg.norm(torch.cat(grads)).item()
+
+    def step(self, counts: List[Tuple[Tensor, Tensor]]) -> float:
+        """Single optimiser step maximising average success probability over counts.
+
+        Args:
+            counts (List[Tuple[Tensor, Tensor]]): Unsatisfied clause counts and satisfying assignments per formula, optionally followed by initial state.
+
+        Returns:
+            float: Average success probability over counts at last evaluation.
+        """
+        # Optimisers without maximize option (e.g. LBFGS) minimise -p_succ
+        maximize = self.optimiser.defaults.get("maximize", False)
+        p_succ = None
+
+        size = len(counts) if self.batch_size is None else self.batch_size
+
+        def closure() -> Tensor:
+            nonlocal p_succ
+            self.evaluations += 1
+            self.optimiser.zero_grad()
+            p_succ = 0.0
+            for i in range(0, len(counts), size):
+                # Batch's share of mean, graph freed after backward
+                p_succs = torch.stack([self.circuit(*c) for c in counts[i : i + size]])
+                p_batch = torch.sum(p_succs) / len(counts)
+                (p_batch if maximize else -p_batch).backward()
+                p_succ += p_batch.item()
+            return torch.tensor(p_succ if maximize else -p_succ)
+
+        self.optimiser.step(closure)
+        return p_succ
+
+    def step_scheduler(self, p_succ: float) -> None:
+        """Steps learning rate scheduler, if any, at end of epoch. ReduceLROnPlateau is
+        given -p_succ as the metric, as it minimises by default while p_succ is maximised.
+
+        Args:
+            p_succ (float): Success probability at end of epoch.
+        """
+        if self.scheduler is None:
+            return
+        if isinstance(self.scheduler, torch.optim.lr_scheduler.ReduceLROnPlateau):
+            self.scheduler.step(-p_succ)
+        else:
+            self.scheduler.step()
 
-    def find_optimal_params(self, formulas: List[Formula]) -> None:
+    def find_optimal_params(self, formulas: List[Formula], matrix_free: bool = False) -> float:
         """Finds optimal parameters of circuit by maximising success probability over provided formulas.
 
         Args:
             formulas (List[Formula]): Formulas to maximise success probability over.
+            matrix_free (bool, optional): Train on matrix-free cost, never computing formulas' counts. Defaults to False.
+
+        Returns:
+            float: Average success probability over formulas at final epoch.
         """
 
-        # extract clause counts
-        counts = [
-            (torch.from_numpy(f.naive_counts), torch.from_numpy(f.naive_sats))
-            for f in formulas
-        ]
+        # extract clause counts, in circuit's representation
+        counts = [(self.circuit.prepare(h), hS) for (h, hS) in formula_counts(formulas, matrix_free)]
+
+        return self.train(lambda: self.step(counts), self.epochs)
+
+    def find_optimal_params_stream(
+        self, loader: Iterable[List[Tuple[Tensor, Tensor]]], epochs: int = 10
+    ) -> float:
+        """Finds optimal parameters of circuit by stochastic optimisation over mini-batches
+        of formulas, so only the current mini-batches need be held in memory. One epoch is
+        one pass over loader, taking one optimiser step per mini-batch.
+
+        Args:
+            loader (Iterable[List[Tuple[Tensor, Tensor]]]): Mini-batches of unsatisfied clause counts and satisfying assignments, e.g. from instance_loader.
+            epochs (int, optional): Maximum epochs after the first, so at most epochs + 1 passes over loader (as for find_optimal_params). Defaults to 10.
+
+        Returns:
+            float: Average success probability over mini-batches of final epoch.
+        """
+
+        def epoch() -> float:
+            p_succs = [self.step(batch) for batch in loader]
+            return sum(p_succs) / len(p_succs)
+
+        return self.train(epoch, epochs)
+
+    def train(self, epoch: Callable[[], float], epochs: int) -> float:
+        """Runs epochs until convergence or epoch limit, recording summary.
+
+        Args:
+            epoch (Callable[[], float]): Runs single epoch, returning success probability.
+            epochs (int): Maximum epochs after the first (epoch 0), so at most epochs + 1 are run.
+
+        Returns:
+            float: Success probability at final epoch.
+        """
+        self.evaluations = 0
+        start = time.time()
+        converged = False
+        stalled = 0
+        prev = None
+        for i in range(epochs + 1):
+            curr = epoch()
+            grad_norm = self.grad_norm()
+            self.step_scheduler(curr)
 
-        # optimise
-        for i in range(self.epochs + 1):
-            self.optimiser.zero_grad()
-            p_succs = torch.stack([self.circuit(h, hS) for (h, hS) in counts])
-            p_succ = torch.mean(p_succs)
-            p_succ.backward()
-            self.optimiser.step()
             if i % 10 == 0:
-                print(f"Epoch {i}, p_succ: {p_succ.item()}")
+                print(f"Epoch {i}, p_succ: {curr}")
+
+            # Convergence tests
+            if self.grad_tol is not None and grad_norm < self.grad_tol:
+                converged = True
+            if self.tol is not None and prev is not None and abs(curr - prev) < self.tol:
+                stalled += 1
+                converged = converged or stalled >= self.patience
+            else:
+                stalled = 0
+            prev = curr
+
+            if converged:
+                print(f"Converged at epoch {i}, p_succ: {curr}")
+                break
+
+        self.summary = {
+            "steps": i + 1,
+            "evaluations": self.evaluations,
+            "time": time.time() - start,
+            "p_succ": curr,
+            "grad_norm": grad_norm,
+            "converged": converged,
+        }
+
+        return curr
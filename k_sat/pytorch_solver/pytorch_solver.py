@@ -1,24 +1,386 @@
-from torch.distributions.categorical import Categorical
-from typing import List, Tuple
+import json
+import torch
+import torch.multiprocessing as mp
+from torch import Tensor
+from typing import Dict, List, Tuple
 
 from k_sat.solver import Solver
+from k_sat.running_time import RunningTime
+from k_sat.execution_planner import ExecutionPlanner
 from k_sat.pytorch_solver.pytorch_circuit import PytorchCircuit
+from k_sat.pytorch_solver.grover_circuit import GroverCircuit
 from k_sat.pytorch_solver.pytorch_optimiser import PytorchOptimiser
+from k_sat.pytorch_solver.layerwise_optimiser import LayerwiseOptimiser
+from k_sat.pytorch_solver.multi_start_optimiser import MultiStartOptimiser
+from k_sat.pytorch_solver.sharded_optimiser import ShardedOptimiser
+from k_sat.pytorch_solver.batch_sampler import BatchSampler
+from k_sat.pytorch_solver.readout import Readout
+from k_sat.pytorch_solver.clause_cost import ClauseCost
 from formula.cnf.cnf import CNF
+from k_sat.parameter_store import ParameterStore
 
 
 class PytorchSolver(Solver):
     def __init__(
-        self, training_formulas: List[CNF] = None, layers: int = 1
+        self,
+        training_formulas: List[CNF] = None,
+        layers: int = 1,
+        analytic: bool = False,
+        parameter_library: ParameterStore = None,
+        retrain: bool = True,
+        schedule: str = None,
+        compiled: bool = False,
+        readout: Readout = None,
+        restarts: int = 1,
+        mixer: str = "x",
+        memory_budget: int = None,
+        matrix_free: bool = False,
+        processes: int = 1,
     ) -> None:
         """Pytorch implementation of QAOA for satisfiability.
 
         Args:
             training_formulas (List[Formula], optional): Formulas to train parameters on. Defaults to formula being solved for.
             layers (int, optional): Layers in QAOA circuit. Defaults to 1.
+            analytic (bool, optional): Draw running times from exact (geometric) running time distribution instead of sampling shots. Defaults to False.
+            parameter_library (ParameterStore, optional): Library to warm start training from and store trained parameters in. Defaults to None.
+            retrain (bool, optional): Train parameters even if found in library (warm started from them). Defaults to True.
+            schedule (str, optional): Grow circuit one layer at a time, initialising each depth from previous optimum ("interp" or "fourier") or training only the new layer ("greedy"), transverse field mixer only. Defaults to None (train all layers from scratch).
+            compiled (bool, optional): Evolve circuit with compiled fused layers, worthwhile for large formulas or long training. Defaults to False.
+            readout (Readout, optional): Observables to compute from final state, stored in observables. Defaults to None.
+            restarts (int, optional): Train from this many random initial points in parallel, keeping the best (transverse field mixer only). Defaults to 1.
+            mixer (str, optional): Mixing unitary, "x" (transverse field) or "grover" (simulated on levels of formula). Defaults to "x".
+            memory_budget (int, optional): Bytes available for training, checked before training starts. Gradients are accumulated over batches of training formulas, fewer restarts trained in parallel and (solving without training formulas) cost made matrix-free as needed to fit. Defaults to None (unchecked).
+            matrix_free (bool, optional): Evolve formula being solved with cost computed block by block from its clauses, never storing its unsatisfied clause counts (transverse field mixer only). Defaults to False.
+            processes (int, optional): Processes (a power of 2) training may shard state over when planned to fit memory budget (without schedule or restarts), readout then evolving trained circuit in this process. Defaults to 1.
+
+        Raises:
+            RuntimeError: Mixer not recognised.
+            RuntimeError: Schedule or restarts given with Grover mixer.
+            RuntimeError: Processes not a power of 2.
         """
+        if mixer not in ["x", "grover"]:
+            raise RuntimeError(f"Mixer {mixer} not recognised")
+        if mixer == "grover" and (schedule is not None or restarts > 1):
+            raise RuntimeError("Schedules and restarts only supported with transverse field mixer")
+        if processes < 1 or processes & (processes - 1):
+            raise RuntimeError(f"Number of processes must be a power of 2, received {processes}")
+
         self.training_formulas = training_formulas
         self.layers = layers
+        self.analytic = analytic
+        self.parameter_library = parameter_library
+        self.retrain = retrain
+        self.schedule = schedule
+        self.compiled = compiled
+        self.readout = readout
+        self.restarts = restarts
+        self.mixer = mixer
+        self.memory_budget = memory_budget
+        self.matrix_free = matrix_free
+        self.processes = processes
+        self.plan = None
+
+        # Formula being solved evolved matrix-free to fit memory budget
+        self.budget_matrix_free = False
+
+        # Circuits trained on fixed training formulas, by number of variables
+        self.trained: Dict[int, PytorchCircuit] = {}
+
+        # Optimal parameters differ between mixers
+        self.library_key = "pytorch" if mixer == "x" else f"pytorch_{mixer}"
+
+    @property
+    def training_formulas(self) -> List[CNF]:
+        """Formulas parameters are trained on (None to train on each formula solved)."""
+        return self._training_formulas
+
+    @training_formulas.setter
+    def training_formulas(self, formulas: List[CNF]) -> None:
+        # Copied so parameters trained on them stay valid until formulas are reassigned
+        self._training_formulas = None if formulas is None else list(formulas)
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Discard circuits trained on training formulas, done whenever they are reassigned."""
+        self.trained = {}
+
+    def save_params(self, path: str) -> None:
+        """Persist parameters trained on training formulas.
+
+        Args:
+            path (str): JSON file to write parameters to.
+        """
+        params = {}
+        for n, circuit in self.trained.items():
+            gamma, beta = circuit.angles()
+            params[str(n)] = {"gamma": gamma.tolist(), "beta": beta.tolist()}
+        with open(path, "w") as f:
+            json.dump({"mixer": self.mixer, "layers": self.layers, "params": params}, f)
+
+    def load_params(self, path: str) -> None:
+        """Load parameters trained on training formulas, used instead of training.
+
+        Args:
+            path (str): JSON file written by save_params.
+
+        Raises:
+            RuntimeError: Parameters for different mixer or number of layers.
+        """
+        with open(path) as f:
+            saved = json.load(f)
+        if saved["mixer"] != self.mixer or saved["layers"] != self.layers:
+            raise RuntimeError(
+                f"Saved parameters are for {saved['mixer']} mixer with {saved['layers']} layers"
+            )
+        for n, params in saved["params"].items():
+            self.trained[int(n)] = self.circuit(
+                int(n), torch.tensor(params["gamma"]), torch.tensor(params["beta"])
+            )
+
+    def circuit(self, n: int, init_gamma: Tensor = None, init_beta: Tensor = None) -> PytorchCircuit:
+        """Untrained circuit with solver's mixer.
+
+        Args:
+            n (int): Number of variables.
+            init_gamma (Tensor, optional): Initial cost unitary parameters. Defaults to circuit default.
+            init_beta (Tensor, optional): Initial mixing unitary parameters. Defaults to circuit default.
+
+        Returns:
+            PytorchCircuit: QAOA circuit.
+        """
+        if self.mixer == "grover":
+            return GroverCircuit(n, self.layers, init_gamma, init_beta)
+        return PytorchCircuit(n, self.layers, init_gamma, init_beta, compiled=self.compiled)
+
+    def trained_circuit(self, formula: CNF) -> PytorchCircuit:
+        """Circuit with parameters trained for formula. Circuits trained on fixed training
+        formulas are kept and reused for every formula with the same number of variables.
+
+        Args:
+            formula (CNF): Formula to train circuit for.
+
+        Returns:
+            PytorchCircuit: Trained QAOA circuit.
+        """
+        if self.training_formulas is None:
+            return self.train(formula)
+
+        if formula.num_vars not in self.trained:
+            self.trained[formula.num_vars] = self.train(formula)
+        else:
+            print("Using trained params")
+        return self.trained[formula.num_vars]
+
+    def train(self, formula: CNF) -> PytorchCircuit:
+        """Train circuit for formula on training formulas (or formula itself if none).
+
+        Args:
+            formula (CNF): Formula to train circuit for.
+
+        Returns:
+            PytorchCircuit: Trained QAOA circuit.
+        """
+
+        # Train on formula itself if no training formulas specified
+        formulas = (
+            [formula] if self.training_formulas is None else self.training_formulas
+        )
+
+        # Parameters for problem family of training formulas from library
+        params = None
+        if self.parameter_library is not None:
+            family = self.parameter_library.family(formulas)
+            params = self.parameter_library.lookup(family, self.layers, self.library_key)
+
+        # Formula being solved trained on without computing its counts
+        self.budget_matrix_free = False
+        matrix_free = self.training_formulas is None and self.is_matrix_free(formula)
+
+        # Fit training in memory, failing before any work if it cannot
+        batch_size, processes = None, None
+        if self.memory_budget is not None and self.mixer == "x":
+            # Restarts trained in parallel each hold their own autograd graph, only plain
+            # training can be sharded
+            layerwise = params is None and self.schedule is not None
+            restarts = params is None and not layerwise and self.restarts > 1
+            workers = min(self.restarts, mp.cpu_count()) if restarts else 1
+            shards = 1 if layerwise or restarts else self.processes
+            batch_size, processes, matrix_free = self.plan_training(
+                formula, formulas, matrix_free, workers, shards
+            )
+            self.budget_matrix_free = matrix_free
+
+        # QAOA circuit
+        print("Initialising network")
+        if params is None and self.schedule is not None and self.mixer == "x":
+            optimiser = LayerwiseOptimiser(
+                formula.num_vars,
+                self.layers,
+                self.schedule,
+                batch_size=batch_size,
+                compiled=self.compiled,
+            )
+            print("Finding optimal params layer by layer")
+            p_succ = optimiser.find_optimal_params(formulas, matrix_free)
+            circuit = optimiser.circuit
+        elif params is None and self.restarts > 1 and self.mixer == "x":
+            optimiser = MultiStartOptimiser(
+                formula.num_vars, self.layers, self.restarts, processes, batch_size=batch_size
+            )
+            print(f"Finding optimal params from {self.restarts} restarts")
+            p_succ = optimiser.find_optimal_params(formulas, matrix_free)
+            circuit = optimiser.circuit
+        else:
+            init_gamma, init_beta = None, None
+            if params is not None:
+                init_gamma, init_beta = torch.tensor(params[0]), torch.tensor(params[1])
+
+            circuit = self.circuit(formula.num_vars, init_gamma, init_beta)
+
+            if params is not None and not self.retrain:
+                print("Using library params")
+            elif self.plan is not None and self.plan.strategy == "sharded":
+                optimiser = ShardedOptimiser(
+                    formula.num_vars, self.layers, self.processes, init_gamma, init_beta,
+                    batch_size=batch_size,
+                )
+                print(f"Finding optimal params sharded over {self.processes} processes")
+                p_succ = optimiser.find_optimal_params(formulas)
+                gamma, beta = optimiser.circuit.angles()
+                circuit = self.circuit(formula.num_vars, gamma.detach(), beta.detach())
+            else:
+                optimiser = PytorchOptimiser(circuit, batch_size=batch_size)
+                print("Finding optimal params")
+                p_succ = optimiser.find_optimal_params(formulas, matrix_free)
+
+        if self.parameter_library is not None and (params is None or self.retrain):
+            gamma, beta = circuit.angles()
+            provenance = {
+                "solver": "PytorchSolver",
+                "training_formulas": len(formulas),
+                "epochs": optimiser.epochs,
+                "warm_start": params is not None,
+                "schedule": self.schedule if params is None else None,
+            }
+            self.parameter_library.store(
+                family, self.library_key, gamma.tolist(), beta.tolist(), p_succ, provenance
+            )
+
+        return circuit
+
+    def plan_training(
+        self,
+        formula: CNF,
+        formulas: List[CNF],
+        matrix_free: bool,
+        workers: int = 1,
+        shards: int = 1,
+    ) -> Tuple[int, int, bool]:
+        """Execution plan fitting training in memory budget, whichever optimiser trains.
+        Gradients are accumulated over smaller batches of formulas first, then state
+        sharded over processes (stored in plan's strategy), then restarts trained on fewer
+        processes, then cost made matrix-free if training on formula being solved.
+
+        Args:
+            formula (CNF): Formula being solved.
+            formulas (List[CNF]): Formulas trained on.
+            matrix_free (bool): Whether training is already matrix-free.
+            workers (int, optional): Processes training concurrently. Defaults to 1.
+            shards (int, optional): Processes state may be sharded over. Defaults to 1.
+
+        Raises:
+            RuntimeError: Training does not fit in memory budget however run.
+
+        Returns:
+            Tuple[int, int, bool]: Formulas per backward pass, restart processes and whether training is matrix-free.
+        """
+        free = [matrix_free]
+        if not matrix_free and self.training_formulas is None and formula.counts is None:
+            free.append(True)
+
+        for mf in free:
+            processes = workers
+            while True:
+                # Counts shared between restart processes, but budgeted per process
+                planner = ExecutionPlanner(self.memory_budget // processes, processes=shards)
+                self.plan = planner.plan(
+                    formula, self.layers, batch_size=len(formulas), formulas=0 if mf else len(formulas)
+                )
+                if self.plan.fits or processes == 1:
+                    break
+                processes = (processes + 1) // 2
+            if self.plan.fits:
+                print(f"Execution plan {self.plan}" + (", matrix-free" if mf else ""))
+                return self.plan.batch_size, processes, mf
+
+        raise RuntimeError(
+            "Training does not fit in memory budget:\n"
+            + ExecutionPlanner(self.memory_budget, processes=shards).report(
+                formula, self.layers, formulas=len(formulas)
+            )
+        )
+
+    def final_probabilities(self, formula: CNF) -> Tensor:
+        """Train circuit and find output distribution for formula.
+
+        Args:
+            formula (CNF): Formula to find output distribution for.
+
+        Returns:
+            Tensor: Probability of each bitstring (in bitstring order).
+        """
+        circuit = self.trained_circuit(formula)
+        h = ClauseCost(formula) if self.is_matrix_free(formula) else formula.naive_counts
+
+        # Output distribution
+        with torch.no_grad():
+            final_state = circuit.evolve(h)
+            ps = (final_state * final_state.conj()).real
+
+            # Store for later analysis
+            if self.readout is not None:
+                self.observables = self.readout(final_state, h)
+
+        return ps
+
+    def is_matrix_free(self, formula: CNF) -> bool:
+        """Whether formula is evolved with matrix-free cost (requested, or needed to fit memory
+        budget), i.e. its unsatisfied clause counts have not been computed (for training or previously).
+
+        Args:
+            formula (CNF): Formula being solved.
+
+        Returns:
+            bool: Whether cost is computed block by block.
+        """
+        matrix_free = self.matrix_free or self.budget_matrix_free
+        return matrix_free and self.mixer == "x" and formula.counts is None
+
+    def satisfying(self, formula: CNF) -> Tensor:
+        """Satisfying assignments of formula, found block by block if matrix-free.
+
+        Args:
+            formula (CNF): Formula being solved.
+
+        Returns:
+            Tensor: Indices of satisfying assignments.
+        """
+        if self.is_matrix_free(formula):
+            return ClauseCost(formula).sats()
+        return torch.from_numpy(formula.naive_sats)
+
+    def analytic_running_time(self, formula: CNF) -> RunningTime:
+        """Exact running time distribution for formula (expectation, variance, quantiles, sampling).
+
+        Args:
+            formula (CNF): Formula to find running time distribution for.
+
+        Returns:
+            RunningTime: Running time distribution.
+        """
+        ps = self.final_probabilities(formula)
+        return RunningTime(ps.numpy(), self.satisfying(formula).numpy(), formula.num_vars)
 
     def sat(self, formula: CNF, timeout: int = None) -> Tuple[str, int]:
         """Finds statisfying assignment of formula.
@@ -31,41 +393,22 @@ class PytorchSolver(Solver):
             Tuple[str, int]: Tuple of satisfying assignment and runtime to find it. String set to "-1" formula unsatisfiable/solver timed out.
         """
 
-        # QAOA circuit
-        print("Initialising network")
-        circuit = PytorchCircuit(formula.num_vars, self.layers)
+        if self.analytic:
+            # Store for later analysis
+            self.running_time = self.analytic_running_time(formula)
+            return self.running_time.sat(timeout)
 
-        optimiser = PytorchOptimiser(circuit)
-        # find optimal parameters (use formula itself if no training formulas specified)
-        formulas = (
-            [formula] if self.training_formulas is None else self.training_formulas
-        )
-        print("Finding optimal params")
-        optimiser.find_optimal_params(formulas)
-
-        # Emulate sampling
-        final_state = circuit.evolve(formula.naive_counts)
-        ps = (final_state * final_state.conj()).real
-        m = Categorical(ps)
-        print(ps)
-
-        # Timeout flag
-        tf = False
-
-        # Sample until satisfying assignment found or timeout reached
-        runtime = 0
-        while True:
-            if timeout is not None and runtime > timeout:
-                tf = True
-                break
-            runtime += 1
-            bs = bin(m.sample())[2:].zfill(formula.num_vars)
-            if formula.is_satisfied(bs):
-                break
-            if runtime % 10 == 0:
-                print(f"Samples drawn: {runtime}")
+        ps = self.final_probabilities(formula)
+
+        # Sample in batches until satisfying assignment found or timeout reached
+        print("Sampling from final state")
+        sampler = BatchSampler(ps, self.satisfying(formula))
+        index, runtime = sampler.running_time(timeout)
+
+        # Store for later analysis (e.g. further running time trials)
+        self.sampler = sampler
 
         # Set bitstring to -1 if timeout
-        bs = "-1" if tf else bs
+        bs = "-1" if index == -1 else bin(index)[2:].zfill(formula.num_vars)
 
         return bs, runtime
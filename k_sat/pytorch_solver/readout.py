@@ -0,0 +1,133 @@
+import torch
+from torch import Tensor
+from typing import Dict, List, Union
+
+from k_sat.pytorch_solver.clause_cost import ClauseCost
+
+
+class Observables:
+    def __init__(
+        self,
+        levels: Tensor,
+        level_probs: Tensor,
+        cvar: Dict[float, Tensor],
+        top_indices: Tensor,
+        top_probs: Tensor,
+    ) -> None:
+        """Observables of final state of QAOA circuit.
+
+        Args:
+            levels (Tensor): Distinct numbers of unsatisfied clauses, ascending.
+            level_probs (Tensor): Probability mass on each level (energy distribution).
+            cvar (Dict[float, Tensor]): Conditional value at risk of energy per tail fraction alpha.
+            top_indices (Tensor): Indices of most probable bitstrings, most probable first.
+            top_probs (Tensor): Probabilities of most probable bitstrings.
+        """
+        self.levels = levels
+        self.level_probs = level_probs
+        self.cvar = cvar
+        self.top_indices = top_indices
+        self.top_probs = top_probs
+
+    @property
+    def p_succ(self) -> Tensor:
+        """Success probability (mass on bitstrings with no unsatisfied clauses).
+
+        Returns:
+            Tensor: Success probability.
+        """
+        return torch.sum(self.level_probs[self.levels == 0])
+
+    @property
+    def energy(self) -> Tensor:
+        """Expected number of unsatisfied clauses <H>.
+
+        Returns:
+            Tensor: Expected energy.
+        """
+        return torch.sum(self.levels * self.level_probs)
+
+
+class Readout:
+    def __init__(
+        self, cvar_alphas: List[float] = None, top_k: int = 0, chunk_size: int = 2**20
+    ) -> None:
+        """Computes observables of final state in a single pass over it, accumulating mass per
+        level of h. Differentiable with respect to state (except top bitstring indices).
+
+        Args:
+            cvar_alphas (List[float], optional): Tail fractions alpha in (0, 1] to compute CVaR for. Defaults to None.
+            top_k (int, optional): Number of most probable bitstrings to report. Defaults to 0.
+            chunk_size (int, optional): Amplitudes processed at once. Defaults to 2^20.
+        """
+        self.cvar_alphas = cvar_alphas if cvar_alphas is not None else []
+        self.top_k = top_k
+        self.chunk_size = chunk_size
+
+    def cvar(self, levels: Tensor, level_probs: Tensor, alpha: float) -> Tensor:
+        """Conditional value at risk: expected energy over lowest energy alpha fraction of mass.
+
+        Args:
+            levels (Tensor): Distinct energies, ascending.
+            level_probs (Tensor): Probability mass on each level.
+            alpha (float): Tail fraction.
+
+        Returns:
+            Tensor: CVaR_alpha.
+        """
+        below = torch.cumsum(level_probs, dim=0) - level_probs
+        taken = torch.clamp(torch.minimum(level_probs, alpha - below), min=0)
+        return torch.sum(taken * levels) / alpha
+
+    def __call__(self, circuit: Tensor, h: Union[Tensor, ClauseCost]) -> Observables:
+        """Observables of final state.
+
+        Args:
+            circuit (Tensor): Final state (in bitstring order).
+            h (Union[Tensor, ClauseCost]): Tensor of unsatisfied clauses per bitstring, or matrix-free cost operator (counts computed a block at a time).
+
+        Returns:
+            Observables: Observables of state.
+        """
+        if isinstance(h, ClauseCost):
+            blocks = ((start, h.counts(start, stop)) for start, stop in h.blocks())
+        else:
+            h = torch.as_tensor(h)
+            blocks = (
+                (start, h[start : start + self.chunk_size])
+                for start in range(0, len(circuit), self.chunk_size)
+            )
+
+        levels = torch.zeros(0, dtype=torch.float32)
+        level_probs = torch.zeros(0, dtype=torch.float32)
+        top_probs = torch.zeros(0, dtype=torch.float32)
+        top_indices = torch.zeros(0, dtype=torch.long)
+
+        for start, h_chunk in blocks:
+            chunk = circuit[start : start + len(h_chunk)]
+            ps = chunk.real**2 + chunk.imag**2
+
+            # Mass per level of chunk, merged into running levels
+            chunk_levels, inverse = torch.unique(h_chunk, return_inverse=True)
+            chunk_probs = torch.zeros(len(chunk_levels), dtype=torch.float32).index_add(0, inverse, ps)
+            levels, inverse = torch.unique(
+                torch.cat((levels, chunk_levels.to(torch.float32))), return_inverse=True
+            )
+            level_probs = torch.zeros(len(levels), dtype=torch.float32).index_add(
+                0, inverse, torch.cat((level_probs, chunk_probs))
+            )
+
+            if self.top_k > 0:
+                # Merge chunk's best into running best
+                k = min(self.top_k, len(ps))
+                probs, indices = torch.topk(ps, k)
+                top_probs = torch.cat((top_probs, probs))
+                top_indices = torch.cat((top_indices, indices + start))
+                k = min(self.top_k, len(top_probs))
+                top_probs, best = torch.topk(top_probs, k)
+                top_indices = top_indices[best]
+
+        cvar = {
+            alpha: self.cvar(levels, level_probs, alpha) for alpha in self.cvar_alphas
+        }
+        return Observables(levels, level_probs, cvar, top_indices, top_probs)
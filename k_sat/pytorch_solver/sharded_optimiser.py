@@ -0,0 +1,129 @@
+import tempfile
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
+from torch import Tensor
+from typing import List
+
+from formula.formula import Formula
+from k_sat.pytorch_solver.pytorch_circuit import PytorchCircuit
+from k_sat.pytorch_solver.distributed_circuit import DistributedCircuit
+from k_sat.pytorch_solver.pytorch_optimiser import PytorchOptimiser
+
+
+def _train_shard(
+    rank: int,
+    world_size: int,
+    init_file: str,
+    num_vars: int,
+    layers: int,
+    formulas: List[Formula],
+    init_gamma: Tensor,
+    init_beta: Tensor,
+    epochs: int,
+    batch_size: int,
+    results: Tensor,
+) -> None:
+    """Train shard of circuit held by one process, rank 0 writing success probability and
+    trained parameters to results.
+
+    Args:
+        rank (int): Rank of process.
+        world_size (int): Number of processes state is sharded over.
+        init_file (str): File process group is initialised through.
+        num_vars (int): Number of variables.
+        layers (int): QAOA circuit layers.
+        formulas (List[Formula]): Formulas to maximise success probability over.
+        init_gamma (Tensor): Initial cost unitary parameters.
+        init_beta (Tensor): Initial mixing unitary parameters.
+        epochs (int): Maximum epochs.
+        batch_size (int): Formulas evolved per backward pass.
+        results (Tensor): Shared tensor of success probability, cost and mixing parameters.
+    """
+    # Shards already run in parallel
+    torch.set_num_threads(max(1, mp.cpu_count() // world_size))
+    dist.init_process_group(
+        "gloo", init_method=f"file://{init_file}", rank=rank, world_size=world_size
+    )
+    try:
+        circuit = DistributedCircuit(num_vars, layers, init_gamma, init_beta)
+
+        # Only local shard of each formula's counts computed
+        counts = []
+        for formula in formulas:
+            h = circuit.local_counts(formula)
+            counts.append((h, circuit.local_sats(h)))
+
+        # Success probability and gradients reduced over processes, so every process
+        # takes same steps and stops at same epoch
+        optimiser = PytorchOptimiser(circuit, epochs=epochs, batch_size=batch_size)
+        p_succ = optimiser.train(lambda: optimiser.step(counts), epochs)
+        if rank == 0:
+            results[0] = p_succ
+            results[1 : 1 + layers] = circuit.gamma.detach()
+            results[1 + layers :] = circuit.beta.detach()
+    finally:
+        dist.destroy_process_group()
+
+
+class ShardedOptimiser:
+    def __init__(
+        self,
+        num_vars: int,
+        layers: int,
+        processes: int,
+        init_gamma: Tensor = None,
+        init_beta: Tensor = None,
+        epochs: int = 250,
+        batch_size: int = None,
+    ) -> None:
+        """Trains QAOA circuit with state vector sharded over spawned processes
+        (DistributedCircuit), so each process holds 1 / processes of the state and
+        autograd graph.
+
+        Args:
+            num_vars (int): Number of variables in satisfiability problem.
+            layers (int): QAOA circuit layers.
+            processes (int): Processes to shard state over, a power of 2.
+            init_gamma (Tensor, optional): Initial cost unitary parameters. Defaults to circuit default.
+            init_beta (Tensor, optional): Initial mixing unitary parameters. Defaults to circuit default.
+            epochs (int, optional): Maximum epochs to train for. Defaults to 250.
+            batch_size (int, optional): Formulas evolved per backward pass (gradients accumulated over batches). Defaults to all formulas.
+        """
+        self.num_vars = num_vars
+        self.layers = layers
+        self.processes = processes
+        self.init_gamma = init_gamma
+        self.init_beta = init_beta
+        self.epochs = epochs
+        self.batch_size = batch_size
+        self.circuit = None
+
+    def find_optimal_params(self, formulas: List[Formula]) -> float:
+        """Finds optimal parameters of circuit by maximising success probability over provided formulas.
+
+        Args:
+            formulas (List[Formula]): Formulas to maximise success probability over.
+
+        Returns:
+            float: Average success probability over formulas at final epoch.
+        """
+        results = torch.zeros(1 + 2 * self.layers).share_memory_()
+        with tempfile.TemporaryDirectory() as tmp:
+            mp.spawn(
+                _train_shard,
+                args=(
+                    self.processes, f"{tmp}/init", self.num_vars, self.layers, formulas,
+                    self.init_gamma, self.init_beta, self.epochs, self.batch_size, results,
+                ),
+                nprocs=self.processes,
+            )
+
+        # Trained parameters evolved in this process, e.g. for readout
+        self.circuit = PytorchCircuit(
+            self.num_vars,
+            self.layers,
+            results[1 : 1 + self.layers].clone(),
+            results[1 + self.layers :].clone(),
+        )
+        return results[0].item()
@@ -1,26 +1,90 @@
-from qiskit import QuantumCircuit, Aer
+import numpy as np
+from qiskit import QuantumCircuit, Aer, transpile
 from qiskit.utils import QuantumInstance
 from typing import List, Dict, Tuple
 from scipy.optimize import minimize
 
 from formula.formula import Formula
 from k_sat.qiskit_solver.optimiser import Optimiser
+from k_sat.qiskit_solver.evaluator import reversed_indices, runnable, unsupported_gates
 
 
 class AverageOptimiser(Optimiser):
     """Optimiser to find parameters for QAOA circuit."""
 
-    def __init__(self, quantum_instance: QuantumInstance = None) -> None:
+    def __init__(
+        self,
+        quantum_instance: QuantumInstance = None,
+        objective: str = "average",
+        cvar_alpha: float = None,
+    ) -> None:
         """Intialise QAOA optimiser.
 
         Args:
             quantum_instance (QuantumInstace, optional): Backend to run optimiser on. Defaults to Aer qasm simulator.
+            objective (str, optional): Cost minimised, "average" (expected unsatisfied clauses) or "cvar" (expected unsatisfied clauses over best cvar_alpha of outcomes). Defaults to "average".
+            cvar_alpha (float, optional): Fraction of outcomes CVaR is taken over, reported in metrics if given. Defaults to None (0.1 if CVaR objective).
 
+        Raises:
+            RuntimeError: Objective not recognised.
         """
+        if objective not in ["average", "cvar"]:
+            raise RuntimeError(f"Objective {objective} not recognised")
+        if objective == "cvar" and cvar_alpha is None:
+            cvar_alpha = 0.1
+
         if quantum_instance is None:
             quantum_instance = Aer.get_backend("aer_simulator")
 
         self.quantum_instance = quantum_instance
+        self.objective = objective
+        self.cvar_alpha = cvar_alpha
+
+        # Metrics averaged over training formulas at last objective evaluation
+        self.metrics = None
+
+    def costs(self, formula: Formula, indices: np.ndarray) -> np.ndarray:
+        """Unsatisfied clauses of bitstrings, looked up in precomputed counts if available
+        and evaluated on the given bitstrings only otherwise.
+
+        Args:
+            formula (Formula): Formula bitstrings are assignments of.
+            indices (np.ndarray): Bitstring indices (in bitstring order).
+
+        Returns:
+            np.ndarray: Unsatisfied clauses per bitstring.
+        """
+        if getattr(formula, "counts", None) is not None:
+            return np.asarray(formula.counts)[indices]
+        return formula.counts_at(indices)
+
+    def weighted_metrics(
+        self, costs: np.ndarray, weights: np.ndarray, order: np.ndarray = None
+    ) -> Dict[str, float]:
+        """Average cost of outcomes, success probability and (if cvar_alpha set) CVaR.
+
+        Args:
+            costs (np.ndarray): Unsatisfied clauses per outcome.
+            weights (np.ndarray): Probability or count of each outcome.
+            order (np.ndarray, optional): Outcomes sorted by cost, if known. Defaults to None.
+
+        Returns:
+            Dict[str, float]: Metrics "average", "success" and "cvar".
+        """
+        total = np.sum(weights)
+        metrics = {
+            "average": float(np.dot(weights, costs) / total),
+            "success": float(np.sum(weights[costs == 0]) / total),
+        }
+        if self.cvar_alpha is not None:
+            if order is None:
+                order = np.argsort(costs, kind="stable")
+            # Mass of each outcome within lowest alpha of cumulative mass
+            sorted_weights = weights[order] / total
+            before = np.cumsum(sorted_weights) - sorted_weights
+            tail = np.clip(self.cvar_alpha - before, 0, sorted_weights)
+            metrics["cvar"] = float(np.dot(tail, costs[order]) / self.cvar_alpha)
+        return metrics
 
     def assignment_weighted_average(
         self, formula: Formula, assignments: Dict[str, float]
@@ -34,13 +98,38 @@ class AverageOptimiser(Optimiser):
         Returns:
             float: Weighted average of assignment weights.
         """
-        weighted_sum = 0
-        total_count = 0
-        for (ass, count) in assignments.items():
-            weighted_sum += count * formula.assignment_weight(ass)
-            total_count += count
+        # Bitstrings are in bitstring order, so read as their index
+        indices = np.array([int(ass, 2) for ass in assignments], dtype=np.int64)
+        counts = np.array(list(assignments.values()), dtype=np.float64)
+        return self.weighted_metrics(self.costs(formula, indices), counts)["average"]
+
+    def counts_metrics(self, formula: Formula, counts: Dict[str, int]) -> Dict[str, float]:
+        """Metrics of measured counts.
+
+        Args:
+            formula (Formula): Formula measurements are for.
+            counts (Dict[str, int]): Measured bitstrings (in qiskit order) and their counts.
+
+        Returns:
+            Dict[str, float]: Metrics "average", "success" and "cvar".
+        """
+        # Qiskit ordered index of each outcome, mapped to bitstring order by permutation
+        keys = [int(s, 2) for s in counts]
+        indices = reversed_indices(formula.num_vars)[np.array(keys, dtype=np.int64)]
+        shots = np.array(list(counts.values()), dtype=np.float64)
+        return self.weighted_metrics(self.costs(formula, indices), shots)
+
+    def counts_weighted_average(self, formula: Formula, counts: Dict[str, int]) -> float:
+        """Find weighted average of unsatisfied clauses over measured counts.
 
-        return weighted_sum / total_count
+        Args:
+            formula (Formula): Formula measurements are for.
+            counts (Dict[str, int]): Measured bitstrings (in qiskit order) and their counts.
+
+        Returns:
+            float: Weighted average of unsatisfied clauses.
+        """
+        return self.counts_metrics(formula, counts)["average"]
 
     def find_optimal_params(
         self, init_params: List[float], circuits: List[Tuple[Formula, QuantumCircuit]]
@@ -55,38 +144,66 @@ class AverageOptimiser(Optimiser):
         Returns:
             List[float]: Optimal parameters.
         """
+        # Unsatisfied clauses in qiskit order (and sorted if CVaR needed), found once rather
+        # than every evaluation
+        exact = self.quantum_instance.options.method == "statevector"
+        costs = [
+            self.costs(cnf, reversed_indices(cnf.num_vars)) if exact else None
+            for (cnf, _) in circuits
+        ]
+        orders = [
+            np.argsort(cost, kind="stable") if exact and self.cvar_alpha is not None else None
+            for cost in costs
+        ]
+
+        # Transpile parameterised circuits once, parameters bound by simulator per evaluation.
+        # Circuits with gates simulator cannot bind (e.g. diagonal cost gates) are instead
+        # bound before each run (None)
+        templates, transpiled = [], []
+        for (_, circuit) in circuits:
+            circuit = circuit.copy()
+            if exact:
+                circuit.save_probabilities()
+            else:
+                circuit.measure_all()
+            templates.append(circuit)
+            if unsupported_gates(circuit, self.quantum_instance):
+                transpiled.append(None)
+            else:
+                transpiled.append(transpile(circuit, self.quantum_instance))
 
         def execute_average(param_values: List[float]) -> float:
 
-            total_succ_prob = 0
-
-            for (cnf, circuit) in circuits:
-                bound_circuit = circuit.bind_parameters(param_values)
-                # Calculate success probability exactly
-                if self.quantum_instance.options.method == "statevector":
-                    bound_circuit.save_statevector()
-                    statevector = (
-                        self.quantum_instance.run(bound_circuit)
-                        .result()
-                        .get_statevector()
+            # All training circuits in one job, experiments run in parallel
+            experiments, binds = [], []
+            for (template, t_fc) in zip(templates, transpiled):
+                values = dict(zip(template.parameters, param_values))
+                if t_fc is None:
+                    experiments.append(
+                        runnable(template.assign_parameters(values), self.quantum_instance)
                     )
-                    circ_output = statevector.probabilities_dict()
-
+                    binds.append({})
                 else:
-                    # Simulate measurements on circuit
-                    bound_circuit.measure_all()
-                    circ_output = (
-                        self.quantum_instance.run(bound_circuit, shots=1024)
-                        .result()
-                        .get_counts()
-                    )
-
-                # Reverse bitstrings due to qiskit ordering
-                rev_output = {s[::-1]: c for (s, c) in circ_output.items()}
-
-                total_succ_prob += self.assignment_weighted_average(cnf, rev_output)
+                    experiments.append(t_fc)
+                    binds.append({param: [value] for (param, value) in values.items()})
+            options = {"parameter_binds": binds, "max_parallel_experiments": 0}
+            if not exact:
+                # Simulate measurements on circuits
+                options["shots"] = 1024
+            result = self.quantum_instance.run(experiments, **options).result()
+
+            metrics = []
+            for i, ((cnf, _), cost, order) in enumerate(zip(circuits, costs, orders)):
+                if exact:
+                    # Calculate metrics exactly
+                    probs = np.asarray(result.data(i)["probabilities"])
+                    metrics.append(self.weighted_metrics(cost, probs, order))
+                else:
+                    metrics.append(self.counts_metrics(cnf, result.get_counts(i)))
 
-            return total_succ_prob / len(circuits)
+            # Store for reporting
+            self.metrics = {k: float(np.mean([m[k] for m in metrics])) for k in metrics[0]}
+            return self.metrics[self.objective]
 
         # Minimisation formulation of QAOA
         result = minimize(execute_average, init_params, method="COBYLA")
@@ -0,0 +1,102 @@
+import numpy as np
+
+import qiskit
+from qiskit import QuantumCircuit
+from qiskit.circuit import Gate, Parameter
+from qiskit.circuit.library import DiagonalGate
+
+from formula.formula import Formula
+from k_sat.qiskit_solver.encoder import Encoder
+from k_sat.qiskit_solver.evaluator import reversed_indices
+
+
+# DiagonalGate of qiskit 0.x stores its entries, unchanged, as gate params (read directly
+# by Aer's native "diagonal" instruction)
+UNCHECKED_DIAGONAL = int(qiskit.__version__.split(".")[0]) == 0
+
+
+def diagonal_gate(entries: np.ndarray) -> DiagonalGate:
+    """Diagonal gate with given entries. The public constructor validates each of the 2^n
+    entries in Python, so for qiskit versions where DiagonalGate's layout is known, entries
+    (unit modulus by construction) are set without validation instead. Either way gate
+    params are a list of 2^n Python complex numbers, so each bind of a DiagonalCost still
+    costs O(2^n) Python objects (from tolist) on top of the vectorised exponential.
+
+    Args:
+        entries (np.ndarray): Diagonal entries, each of unit modulus.
+
+    Returns:
+        DiagonalGate: Gate applying diagonal.
+    """
+    if not UNCHECKED_DIAGONAL:
+        return DiagonalGate(entries.tolist())
+
+    gate = DiagonalGate.__new__(DiagonalGate)
+    Gate.__init__(gate, "diagonal", int(len(entries)).bit_length() - 1, [])
+    gate._params = entries.tolist()
+    return gate
+
+
+class DiagonalCost(Gate):
+    """Cost unitary e^{-i gamma h} as a single diagonal gate, parameterised by gamma only."""
+
+    def __init__(self, h: np.ndarray, gamma: Parameter) -> None:
+        """Initialise cost gate.
+
+        Args:
+                h (np.ndarray): Unsatisfied clauses per basis state (in qiskit order), shared between copies of gate.
+                gamma (Parameter): Parameter to parameterise gate with.
+        """
+        self.h = h
+        super().__init__("diagonal_cost", int(len(h)).bit_length() - 1, [gamma])
+
+    def _define(self) -> None:
+        # Only defined once gamma bound, diagonal computed from h in one pass
+        gamma = float(self.params[0])
+        diagonal = diagonal_gate(np.exp(-1j * gamma * self.h))
+
+        definition = QuantumCircuit(self.num_qubits)
+        definition.append(diagonal, definition.qubits)
+        self.definition = definition
+
+
+class DiagonalEncoder(Encoder):
+    """Encoder of Boolean formula into Quantum circuit, with cost layers built from
+    precomputed unsatisfied clause counts instead of Z-Pauli terms."""
+
+    def encode_formula(self, formula: Formula, p: int = 1) -> QuantumCircuit:
+        """Encodes formula into circuit using one diagonal gate per cost layer.
+        Equal to PauliEncoder circuit (including global phase), but simulated in time
+        proportional to 2^n regardless of number of Pauli terms.
+
+        Args:
+            formula (Formula): Boolean formula to be encoded.
+            p (int, optional): Number of repeated layers in circuit. Defaults to 1.
+
+        Returns:
+            QuantumCircuit: Circuit encoding formula.
+        """
+        n = formula.num_vars
+        qc = QuantumCircuit(n)
+
+        # Unsatisfied clauses in qiskit order, computed once for all layers
+        h = np.asarray(formula.naive_counts, dtype=np.float64)[reversed_indices(n)]
+        h.setflags(write=False)
+
+        # Prepare initial state with Hadamard gates
+        for qubit in qc.qubits:
+            qc.h(qubit)
+
+        # Create alternating mixer and cost gates
+        for i in range(p):
+
+            # Cost gate
+            gamma = Parameter(f"y_{i}")
+            qc.append(DiagonalCost(h, gamma), qc.qubits)
+
+            # Mixer gates
+            beta = Parameter(f"β_{i}")
+            for qubit in qc.qubits:
+                qc.rx(-2 * beta, qubit)
+
+        return qc
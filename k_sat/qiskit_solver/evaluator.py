@@ -1,16 +1,112 @@
+import numpy as np
+from functools import lru_cache
 from qiskit import QuantumCircuit, Aer
-from typing import List, Tuple
+from qiskit.circuit import Gate
+from qiskit.utils import QuantumInstance
+from typing import List, Set, Tuple
 from qiskit import transpile, assemble
 
 from formula.formula import Formula
+from k_sat.running_time import RunningTime, sample_until_sat
+
+
+@lru_cache(maxsize=None)
+def reversed_indices(n: int) -> np.ndarray:
+    """Bit reversal permutation between qiskit ordering (qubit 0 least significant) and
+    bitstring order (x_0 most significant). Its own inverse.
+
+    Args:
+        n (int): Number of qubits.
+
+    Returns:
+        np.ndarray: Index with bits reversed, for each index.
+    """
+    indices = np.arange(2**n, dtype=np.int64)
+    reverse = np.zeros_like(indices)
+    for i in range(n):
+        reverse |= ((indices >> i) & 1) << (n - 1 - i)
+    reverse.setflags(write=False)
+    return reverse
+
+
+def unsupported_gates(circuit: QuantumCircuit, quantum_instance: QuantumInstance) -> Set[str]:
+    """Gates in circuit simulator cannot run directly (e.g. encoder-defined gates).
+
+    Args:
+        circuit (QuantumCircuit): Circuit to be run.
+        quantum_instance (QuantumInstance): Simulator circuit is run on.
+
+    Returns:
+        Set[str]: Names of unsupported gates.
+    """
+    basis = quantum_instance.configuration().basis_gates
+    return {
+        inst.operation.name
+        for inst in circuit.data
+        if isinstance(inst.operation, Gate) and inst.operation.name not in basis
+    }
+
+
+def runnable(circuit: QuantumCircuit, quantum_instance: QuantumInstance) -> QuantumCircuit:
+    """Bound circuit with unsupported gates replaced by their definitions, cheaper than
+    transpiling (or decomposing through a DAG) when circuit is only run once.
+
+    Args:
+        circuit (QuantumCircuit): Circuit with parameters bound.
+        quantum_instance (QuantumInstance): Simulator circuit is run on.
+
+    Returns:
+        QuantumCircuit: Circuit simulator can run.
+    """
+    gates = unsupported_gates(circuit, quantum_instance)
+    if not gates:
+        return circuit
+
+    expanded = circuit.copy_empty_like()
+    for inst in circuit.data:
+        if inst.operation.name in gates:
+            expanded.compose(inst.operation.definition, inst.qubits, inplace=True)
+        else:
+            expanded.append(inst.operation, inst.qubits, inst.clbits)
+    return expanded
+
+
+def simulated_probabilities(
+    circuit: QuantumCircuit, quantum_instance: QuantumInstance = None
+) -> np.ndarray:
+    """Output distribution of bound circuit, saved as a vector by the simulator.
+
+    Args:
+        circuit (QuantumCircuit): Circuit with parameters bound.
+        quantum_instance (QuantumInstance, optional): Statevector simulator. Defaults to Aer statevector simulator.
+
+    Returns:
+        np.ndarray: Probability of each basis state (in qiskit order).
+    """
+    if quantum_instance is None:
+        quantum_instance = Aer.get_backend("aer_simulator_statevector")
+
+    circuit = runnable(circuit, quantum_instance).copy()
+    circuit.save_probabilities()
+    return np.asarray(quantum_instance.run(circuit).result().data()["probabilities"])
 
 
 class Evaluator:
     """Evaluates QAOA circuit's ability to find a satisfying
     assignment for a problem instance."""
 
-    def __init__(self) -> None:
-        """Initialise evaluator."""
+    def __init__(self, initial_shots: int = 1, max_shots: int = 4096) -> None:
+        """Initialise evaluator.
+
+        Args:
+                initial_shots (int, optional): Shots in first batch when measuring running time, doubling every batch. Defaults to 1.
+                max_shots (int, optional): Most shots per batch. Defaults to 4096.
+        """
+        self.initial_shots = initial_shots
+        self.max_shots = max_shots
+
+        # Circuit, parameters and cumulative output distribution last sampled from
+        self.cached_cdf = None
 
     def success_probability(
         self, circuit: QuantumCircuit, formula: Formula, parameters: List[float] = None
@@ -29,18 +125,83 @@ class Evaluator:
         if parameters is not None:
             circuit = circuit.bind_parameters(parameters)
 
-        # Initialise statevector simulator
-        quantum_instance = Aer.get_backend("aer_simulator_statevector")
+        # Satisfying assignments at their qiskit ordered indices
+        probs = simulated_probabilities(circuit)
+        sats = reversed_indices(circuit.num_qubits)[formula.naive_sats]
+        return float(np.sum(probs[sats]))
 
-        # Calculate output
-        circuit = circuit.copy()
-        circuit.save_statevector()
-        statevector = quantum_instance.run(circuit).result().get_statevector()
-        circ_output = statevector.probabilities_dict()
+    def energy(
+        self, circuit: QuantumCircuit, formula: Formula, parameters: List[float] = None
+    ) -> float:
+        """Calculate expected number of unsatisfied clauses <H> of circuit output.
 
-        # Reverse bitstrings due to qiskit ordering
-        rev_output = {s[::-1]: c for (s, c) in circ_output.items()}
-        return sum([v * formula.is_satisfied(k) for (k, v) in rev_output.items()])
+        Args:
+                circuit (QuantumCircuit): Circuit to be evaluated.
+                formula (Formula): Formula to evaluate circuit on.
+                parameters (List[float], optional): Parameters to bind to circuit. Defaults to None (if already bound).
+
+        Returns:
+                float: Expected unsatisfied clauses.
+        """
+        return float(np.dot(self.probabilities(circuit, parameters), formula.naive_counts))
+
+    def probabilities(
+        self, circuit: QuantumCircuit, parameters: List[float] = None
+    ) -> np.ndarray:
+        """Output distribution of circuit.
+
+        Args:
+                circuit (QuantumCircuit): Circuit to be evaluated.
+                parameters (List[float], optional): Parameters to bind to circuit. Defaults to None (if already bound).
+
+        Returns:
+                np.ndarray: Probability of each bitstring (in bitstring order, x_0 first).
+        """
+        # Bind parameters if needed
+        if parameters is not None:
+            circuit = circuit.bind_parameters(parameters)
+
+        # Reverse bit order of indices due to qiskit ordering (qubit 0 least significant)
+        probs = simulated_probabilities(circuit)
+        return probs[reversed_indices(circuit.num_qubits)]
+
+    def analytic_running_time(
+        self, circuit: QuantumCircuit, formula: Formula, parameters: List[float] = None
+    ) -> RunningTime:
+        """Exact running time distribution of circuit (expectation, variance, quantiles, sampling).
+
+        Args:
+                circuit (QuantumCircuit): Circuit to be evaluated.
+                formula (Formula): Formula to evaluate circuit on.
+                parameters (List[float], optional): Parameters to bind to circuit. Defaults to None (if already bound).
+
+        Returns:
+                RunningTime: Running time distribution.
+        """
+        probs = self.probabilities(circuit, parameters)
+        return RunningTime(probs, formula.naive_sats, formula.num_vars)
+
+    def cdf(self, circuit: QuantumCircuit, parameters: List[float] = None) -> np.ndarray:
+        """Cumulative output distribution of circuit, simulated once and reused while the
+        same circuit is sampled with the same parameters.
+
+        Args:
+                circuit (QuantumCircuit): Circuit to be evaluated.
+                parameters (List[float], optional): Parameters to bind to circuit. Defaults to None (if already bound).
+
+        Returns:
+                np.ndarray: Normalised cumulative probability up to and including each bitstring (in bitstring order).
+        """
+        key = None if parameters is None else tuple(float(p) for p in parameters)
+        if self.cached_cdf is not None:
+            cached_circuit, cached_key, cdf = self.cached_cdf
+            if cached_circuit is circuit and cached_key == key:
+                return cdf
+
+        cdf = np.cumsum(self.probabilities(circuit, parameters), dtype=np.float64)
+        cdf /= cdf[-1]
+        self.cached_cdf = (circuit, key, cdf)
+        return cdf
 
     def running_time(
         self,
@@ -48,6 +209,7 @@ class Evaluator:
         formula: Formula,
         parameters: List[float] = None,
         timeout: int = None,
+        method: str = "batched",
     ) -> Tuple[str, int]:
         """Measure running time of circuit (time until satisfying bitstring sampled).
 
@@ -56,15 +218,74 @@ class Evaluator:
                 formula (Formula): Formula to evaluate circuit on.
                 parameters (List[float], optional): Parameters to bind to circuit. Defaults to None (if already bound).
                 timeout (int, optional): Timeout for algorithm if no satisfying assignment found yet. Defaults to None.
+                method (str, optional): "single" (one simulator job per shot), "batched" (jobs of geometrically growing numbers of shots) or "statevector" (shots drawn from output distribution). Defaults to "batched".
+
+        Raises:
+                RuntimeError: Method not recognised.
+                RuntimeError: No satisfying assignments and no timeout (sampling would not terminate).
 
         Returns:
                 Tuple[str, int]: Tuple of satisfying assignment and runnning time.
 
         """
-        # Bind parameters if needed
-        if parameters is not None:
-            circuit = circuit.bind_parameters(parameters)
+        if method not in ["single", "batched", "statevector"]:
+            raise RuntimeError(f"Running time method {method} not recognised")
+
+        if method == "single":
+            if parameters is not None:
+                circuit = circuit.bind_parameters(parameters)
+            return self.running_time_single(circuit, formula, timeout)
+
+        n = circuit.num_qubits
+        is_sat = np.zeros(2**n, dtype=bool)
+        is_sat[formula.naive_sats] = True
+
+        if method == "statevector":
+            # Inverse transform sampling from output distribution (in bitstring order)
+            cdf = self.cdf(circuit, parameters)
+
+            def draw(shots: int) -> np.ndarray:
+                indices = np.searchsorted(cdf, np.random.random(shots), side="right")
+                return np.minimum(indices, 2**n - 1)
+
+        else:
+            # Initialise simulator, transpiling once for all batches
+            if parameters is not None:
+                circuit = circuit.bind_parameters(parameters)
+            quantum_instance = Aer.get_backend("aer_simulator")
+            circuit = circuit.copy()
+            circuit.measure_all()
+            t_fc = transpile(circuit, quantum_instance)
+            reverse = reversed_indices(n)
+
+            def draw(shots: int) -> np.ndarray:
+                memory = quantum_instance.run(t_fc, shots=shots, memory=True).result().get_memory()
+                # Qiskit ordered outcomes to bitstring order by permutation
+                return reverse[np.array([int(m, 2) for m in memory], dtype=np.int64)]
 
+        index, runtime = sample_until_sat(
+            draw,
+            lambda indices: is_sat[indices],
+            bool(is_sat.any()),
+            timeout,
+            self.initial_shots,
+            self.max_shots,
+        )
+        return ("-1" if index < 0 else bin(index)[2:].zfill(n)), runtime
+
+    def running_time_single(
+        self, circuit: QuantumCircuit, formula: Formula, timeout: int = None
+    ) -> Tuple[str, int]:
+        """Measure running time of bound circuit, one simulator job per shot.
+
+        Args:
+                circuit (QuantumCircuit): Circuit to be evaluated, with parameters bound.
+                formula (Formula): Formula to evaluate circuit on.
+                timeout (int, optional): Timeout for algorithm if no satisfying assignment found yet. Defaults to None.
+
+        Returns:
+                Tuple[str, int]: Tuple of satisfying assignment and runnning time.
+        """
         # Initialise simulator
         quantum_instance = Aer.get_backend("aer_simulator")
 
@@ -3,6 +3,7 @@ import numpy as np
 from qiskit import QuantumCircuit
 from qiskit.circuit import Parameter
 from itertools import combinations
+from typing import Dict, Tuple
 
 from formula.formula import Formula
 from formula.cnf.disjunctive_clause import DisjunctiveClause
@@ -12,8 +13,61 @@ from k_sat.qiskit_solver.encoder import Encoder
 class PauliEncoder(Encoder):
     """Encoder of Boolean formula into Quantum circuit."""
 
-    def __init__(self) -> None:
-        """Initialise Pauli encoder"""
+    def __init__(self, merge: bool = True) -> None:
+        """Initialise Pauli encoder
+
+        Args:
+                merge (bool, optional): Combine Z-Pauli terms over the same qubits across clauses (dropping those that cancel) before emitting gates, rather than encoding each clause separately. Defaults to True.
+        """
+        self.merge = merge
+
+    def hamiltonian(self, formula: Formula) -> Dict[Tuple[int, ...], float]:
+        """Cost Hamiltonian as sparse sum of Z-Pauli terms.
+
+        Args:
+                formula (Formula): Boolean formula to be encoded.
+
+        Returns:
+                Dict[Tuple[int, ...], float]: Coefficient of RZ angle (in units of gamma) for each set of qubits, in ascending order, and of global phase for empty set (constant term).
+        """
+        terms = {}
+        for clause in formula.clauses:
+            if clause.always_sat:
+                continue
+            terms[()] = terms.get((), 0.0) + 1 / (2**clause.num_vars)
+            for i in range(0, clause.num_vars):
+                ft = i + 1
+                # Negative angle for odd fourier term
+                angle = ((-1) ** (ft % 2)) / (2 ** (clause.num_vars - 1))
+                for comb in combinations(clause.variables, ft):
+                    # Combined parity of terms
+                    parity = np.prod([1 if x.is_negation else -1 for x in comb])
+                    qubits = tuple(sorted(x.id for x in comb))
+                    terms[qubits] = terms.get(qubits, 0.0) + angle * parity
+
+        # Remove terms cancelled between clauses
+        return {qubits: c for (qubits, c) in terms.items() if abs(c) > 1e-12}
+
+    def encode_term(
+        self, qubits: Tuple[int, ...], angle: float, circuit: QuantumCircuit
+    ) -> QuantumCircuit:
+        """Append evolution under Z-Pauli term to provided quantum circuit.
+
+        Args:
+                qubits (Tuple[int, ...]): Qubits term acts on.
+                angle (float): RZ angle (may be parameterised).
+                circuit (QuantumCircuit): Circuit to append gates to.
+
+        Returns:
+                QuantumCircuit: Circuit with appended gates encoding term.
+        """
+        # Parity of qubits onto last with CNOT ladder, rotated, then uncomputed
+        for j in range(0, len(qubits) - 1):
+            circuit.cx(qubits[j], qubits[j + 1])
+        circuit.rz(angle, qubits[-1])
+        for j in range(len(qubits) - 1, 0, -1):
+            circuit.cx(qubits[j - 1], qubits[j])
+        return circuit
 
     def encode_clause(
         self, clause: DisjunctiveClause, gamma: Parameter, circuit: QuantumCircuit
@@ -76,6 +130,7 @@ class PauliEncoder(Encoder):
         """
         n = formula.num_vars
         qc = QuantumCircuit(n)
+        terms = self.hamiltonian(formula) if self.merge else None
 
         # Prepare initial state with Hadamard gates
         for qubit in qc.qubits:
@@ -86,8 +141,16 @@ class PauliEncoder(Encoder):
 
             # Cost gates
             gamma = Parameter(f"y_{i}")
-            for clause in formula.clauses:
-                qc = self.encode_clause(clause, gamma, qc)
+            if self.merge:
+                # One evolution block per distinct term, constant term as global phase
+                for (qubits, c) in terms.items():
+                    if qubits:
+                        qc = self.encode_term(qubits, c * gamma, qc)
+                    else:
+                        qc.global_phase -= c * gamma
+            else:
+                for clause in formula.clauses:
+                    qc = self.encode_clause(clause, gamma, qc)
 
             # Mixer gates
             beta = Parameter(f"β_{i}")
@@ -1,6 +1,8 @@
-from qiskit import Aer
+import json
+import numpy as np
+from qiskit import Aer, QuantumCircuit
 from qiskit.utils import QuantumInstance
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 from qiskit import Aer
 from qiskit.visualization import plot_histogram
 from matplotlib.figure import Figure
@@ -11,7 +13,8 @@ from k_sat.qiskit_solver.encoder import Encoder
 from k_sat.qiskit_solver.optimiser import Optimiser
 from k_sat.qiskit_solver.pauli_encoder import PauliEncoder
 from k_sat.qiskit_solver.average_optimiser import AverageOptimiser
-from k_sat.qiskit_solver.evaluator import Evaluator
+from k_sat.qiskit_solver.evaluator import Evaluator, runnable
+from k_sat.parameter_store import ParameterStore
 
 
 class QiskitSolver(Solver):
@@ -25,6 +28,9 @@ class QiskitSolver(Solver):
         init_params: List[float] = None,
         encoder: Encoder = None,
         optimiser: Optimiser = None,
+        analytic: bool = False,
+        parameter_library: ParameterStore = None,
+        retrain: bool = True,
     ) -> None:
         """Intialise Quantum Solver for k-SAT.
 
@@ -35,6 +41,9 @@ class QiskitSolver(Solver):
             encoder (Encoder, optional): Encoder to encode formula into circuit. Defaults to PauliEncoder.
             init_params (List[float], optional): Initial value of parameters for ansatzes. Defaults to a list of 1s.
             optimiser (Optimiser, optional): Optimiser to find optimal circuit parameters. Defaults to AverageOptimiser.
+            analytic (bool, optional): Draw running times from exact (geometric) running time distribution instead of simulating shots. Defaults to False.
+            parameter_library (ParameterStore, optional): Library to warm start training from and store trained parameters in. Defaults to None.
+            retrain (bool, optional): Train parameters even if found in library (warm started from them). Defaults to True.
 
         Raises:
             RuntimeError: Invalid number of initial parameters
@@ -69,6 +78,156 @@ class QiskitSolver(Solver):
             optimiser = AverageOptimiser(quantum_instance)
         self.optimiser = optimiser
 
+        self.analytic = analytic
+        self.parameter_library = parameter_library
+        self.retrain = retrain
+
+        # Encoded training formulas and parameters trained on them (cost and mixing, by
+        # number of variables), kept while training formulas are fixed
+        self.training_circuits = None
+        self.trained: Dict[int, Tuple[List[float], List[float]]] = {}
+
+    @property
+    def training_formulas(self) -> List[CNF]:
+        """Formulas parameters are trained on (None to train on each formula solved)."""
+        return self._training_formulas
+
+    @training_formulas.setter
+    def training_formulas(self, formulas: List[CNF]) -> None:
+        # Copied so parameters trained on them stay valid until formulas are reassigned
+        self._training_formulas = None if formulas is None else list(formulas)
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Discard encoded training formulas and parameters trained on them, done whenever
+        training formulas are reassigned."""
+        self.training_circuits = None
+        self.trained = {}
+
+    def save_params(self, path: str) -> None:
+        """Persist parameters trained on training formulas.
+
+        Args:
+            path (str): JSON file to write parameters to.
+        """
+        params = {str(n): {"gamma": g, "beta": b} for n, (g, b) in self.trained.items()}
+        with open(path, "w") as f:
+            json.dump({"layers": self.layers, "params": params}, f)
+
+    def load_params(self, path: str) -> None:
+        """Load parameters trained on training formulas, used instead of training.
+
+        Args:
+            path (str): JSON file written by save_params.
+
+        Raises:
+            RuntimeError: Parameters for different number of layers.
+        """
+        with open(path) as f:
+            saved = json.load(f)
+        if saved["layers"] != self.layers:
+            raise RuntimeError(f"Saved parameters are for {saved['layers']} layers")
+        for n, params in saved["params"].items():
+            self.trained[int(n)] = (params["gamma"], params["beta"])
+
+    def split_params(
+        self, circuit: QuantumCircuit, params: List[float]
+    ) -> Tuple[List[float], List[float]]:
+        """Split parameters (in circuit's parameter order) into cost and mixing parameters.
+
+        Args:
+            circuit (QuantumCircuit): Encoded circuit parameters are for.
+            params (List[float]): Parameter values in circuit's parameter order.
+
+        Returns:
+            Tuple[List[float], List[float]]: Cost and mixing unitary parameters, by layer.
+        """
+        gamma = [0.0] * self.layers
+        beta = [0.0] * self.layers
+        for (param, value) in zip(circuit.parameters, params):
+            # Parameters named y_i or β_i by encoder
+            name, layer = param.name.split("_")
+            (gamma if name == "y" else beta)[int(layer)] = float(value)
+        return gamma, beta
+
+    def join_params(
+        self, circuit: QuantumCircuit, gamma: List[float], beta: List[float]
+    ) -> List[float]:
+        """Join cost and mixing parameters into circuit's parameter order.
+
+        Args:
+            circuit (QuantumCircuit): Encoded circuit parameters are for.
+            gamma (List[float]): Cost unitary parameters, by layer.
+            beta (List[float]): Mixing unitary parameters, by layer.
+
+        Returns:
+            List[float]: Parameter values in circuit's parameter order.
+        """
+        params = []
+        for param in circuit.parameters:
+            name, layer = param.name.split("_")
+            params.append((gamma if name == "y" else beta)[int(layer)])
+        return params
+
+    def train(
+        self,
+        formula: CNF,
+        circuit: QuantumCircuit,
+        training_circuits: List[Tuple[CNF, QuantumCircuit]],
+    ) -> List[float]:
+        """Find optimal parameters for formula by training on training formulas, warm started
+        from (or taken from) parameter library.
+
+        Args:
+            formula (CNF): Formula parameters are for.
+            circuit (QuantumCircuit): Encoded formula.
+            training_circuits (List[Tuple[CNF, QuantumCircuit]]): Training formulas with their encoded circuits.
+
+        Returns:
+            List[float]: Optimal parameters in circuit's parameter order.
+        """
+        # Parameters for problem family of training formulas from library
+        init_params = self.init_params
+        params = None
+        if self.parameter_library is not None:
+            family = self.parameter_library.family([f for (f, _) in training_circuits])
+            params = self.parameter_library.lookup(family, self.layers, "qiskit")
+        if params is not None:
+            init_params = self.join_params(circuit, *params)
+
+        if params is None or self.retrain:
+            # Train
+            print("Finding optimal parameters for training circuits")
+            optimal_params = self.optimiser.find_optimal_params(
+                init_params, training_circuits
+            )
+
+            if self.parameter_library is not None:
+                evaluator = Evaluator()
+                p_succ = np.mean(
+                    [
+                        evaluator.success_probability(c, f, optimal_params)
+                        for (f, c) in training_circuits
+                    ]
+                )
+                provenance = {
+                    "solver": "QiskitSolver",
+                    "training_formulas": len(training_circuits),
+                    "warm_start": params is not None,
+                }
+                self.parameter_library.store(
+                    family,
+                    "qiskit",
+                    *self.split_params(circuit, optimal_params),
+                    p_succ,
+                    provenance,
+                )
+        else:
+            print("Using library parameters")
+            optimal_params = init_params
+
+        return optimal_params
+
     def sat(self, formula: CNF, timeout: int = None) -> Tuple[str, int]:
         """Finds statisfying assignment of formula.
 
@@ -79,30 +238,38 @@ class QiskitSolver(Solver):
         Returns:
             Tuple[str, int]: Tuple of satisfying assignment and runtime to find it. String set to "-1" formula unsatisfiable/solver timed out.
         """
-        # If no training formulas specified, tailor training to formula itself
-        training_formulas = (
-            self.training_formulas if self.training_formulas is not None else [formula]
-        )
-
-        # Train
-        print("Encoding training formulas into quantum circuits")
-        training_circuits = [
-            (formula, self.encoder.encode_formula(formula, self.layers))
-            for formula in training_formulas
-        ]
+        circuit = self.encoder.encode_formula(formula, self.layers)
 
-        print("Finding optimal parameters for training circuits")
-        optimal_params = self.optimiser.find_optimal_params(
-            self.init_params, training_circuits
-        )
+        if self.training_formulas is None:
+            # Tailor training to formula itself
+            optimal_params = self.train(formula, circuit, [(formula, circuit)])
+        else:
+            if formula.num_vars not in self.trained:
+                if self.training_circuits is None:
+                    print("Encoding training formulas into quantum circuits")
+                    self.training_circuits = [
+                        (f, self.encoder.encode_formula(f, self.layers))
+                        for f in self.training_formulas
+                    ]
+                params = self.train(formula, circuit, self.training_circuits)
+                self.trained[formula.num_vars] = self.split_params(circuit, params)
+            else:
+                print("Using trained parameters")
+            optimal_params = self.join_params(circuit, *self.trained[formula.num_vars])
 
         # Evaluate
         print("Finding/evaluating satisfying assignment")
-        circuit = self.encoder.encode_formula(formula, self.layers)
 
         # Store for later analysis
         self.evaluator = Evaluator()
         self.optimal_params = optimal_params
+
+        if self.analytic:
+            self.running_time = self.evaluator.analytic_running_time(
+                circuit, formula, optimal_params
+            )
+            return self.running_time.sat(timeout)
+
         return self.evaluator.running_time(circuit, formula, optimal_params, timeout)
 
     def visualise_result(
@@ -135,6 +302,7 @@ class QiskitSolver(Solver):
         circuit = self.encoder.encode_formula(formula).bind_parameters(
             self.optimal_params
         )
+        circuit = runnable(circuit, quantum_instance)
         circuit.measure_all()
 
         # Measure and reverse bitstrings for qiskit ordering
@@ -0,0 +1,164 @@
+import numpy as np
+from typing import Callable, Iterable, Tuple
+
+
+def sample_until_sat(
+    draw: Callable[[int], np.ndarray],
+    is_sat: Callable[[np.ndarray], np.ndarray],
+    satisfiable: bool,
+    timeout: int = None,
+    shots: int = 4096,
+    max_shots: int = None,
+) -> Tuple[int, int]:
+    """Draw shots in batches until satisfying assignment found or timeout reached. As when
+    drawing single shots, at most timeout + 1 shots are drawn, and the running time is the
+    position of the first satisfying shot.
+
+    Args:
+        draw (Callable[[int], np.ndarray]): Draws given number of bitstring indices.
+        is_sat (Callable[[np.ndarray], np.ndarray]): Whether each bitstring index is satisfying.
+        satisfiable (bool): Whether any satisfying assignment exists.
+        timeout (int, optional): Timeout if no satisfying assignment found yet. Defaults to None.
+        shots (int, optional): Shots in first batch. Defaults to 4096.
+        max_shots (int, optional): Most shots per batch, batches doubling in size up to it. Defaults to shots (fixed batch size).
+
+    Raises:
+        RuntimeError: No satisfying assignments and no timeout (sampling would not terminate).
+
+    Returns:
+        Tuple[int, int]: Satisfying assignment index (-1 if timed out) and running time (timeout + 1 if timed out).
+    """
+    if timeout is None and not satisfiable:
+        raise RuntimeError("No satisfying assignments, sampling would not terminate")
+    if max_shots is None:
+        max_shots = shots
+
+    limit = None if timeout is None else timeout + 1
+    drawn = 0
+    while limit is None or drawn < limit:
+        batch = shots if limit is None else min(shots, limit - drawn)
+        indices = draw(batch)
+        hits = np.flatnonzero(np.asarray(is_sat(indices)))
+        if len(hits) > 0:
+            return int(indices[int(hits[0])]), drawn + int(hits[0]) + 1
+        drawn += batch
+        shots = min(2 * shots, max_shots)
+
+    return -1, limit
+
+
+class RunningTime:
+    def __init__(
+        self, probabilities: np.ndarray, sats: Iterable[int], n: int
+    ) -> None:
+        """Exact running time distribution of sampling from a state until a satisfying
+        assignment is found. Shots are independent, so running time is geometric with
+        success probability p_succ.
+
+        Args:
+            probabilities (np.ndarray): Probability of each bitstring (in bitstring order).
+            sats (Iterable[int]): Indices of satisfying assignments.
+            n (int): Number of variables in formula.
+        """
+        self.n = n
+        self.sats = np.asarray(sats, dtype=np.int64)
+        sat_probs = np.asarray(probabilities, dtype=np.float64)[self.sats]
+        self.p_succ = float(np.sum(sat_probs)) / float(np.sum(probabilities))
+
+        # Conditional distribution over satisfying assignments
+        self.sat_probs = sat_probs / np.sum(sat_probs) if self.p_succ > 0 else sat_probs
+
+    @property
+    def expectation(self) -> float:
+        """Expected running time.
+
+        Returns:
+            float: Expected number of shots until satisfying assignment found.
+        """
+        return 1 / self.p_succ if self.p_succ > 0 else np.inf
+
+    @property
+    def variance(self) -> float:
+        """Variance of running time.
+
+        Returns:
+            float: Variance of number of shots until satisfying assignment found.
+        """
+        return (1 - self.p_succ) / self.p_succ**2 if self.p_succ > 0 else np.inf
+
+    def cdf(self, runtime: int) -> float:
+        """Probability satisfying assignment found within runtime shots.
+
+        Args:
+            runtime (int): Number of shots.
+
+        Returns:
+            float: P(T <= runtime).
+        """
+        return 1 - (1 - self.p_succ) ** runtime
+
+    def quantile(self, q: float) -> float:
+        """Smallest running time within which satisfying assignment found with probability q.
+
+        Args:
+            q (float): Quantile, in [0, 1).
+
+        Returns:
+            float: Smallest k such that P(T <= k) >= q, infinite if no satisfying assignment can be sampled.
+        """
+        if self.p_succ <= 0:
+            return np.inf
+        if self.p_succ >= 1 or q <= 0:
+            return 1
+        return max(1, int(np.ceil(np.log1p(-q) / np.log1p(-self.p_succ))))
+
+    def sample(self, size: int = 1, timeout: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Draw running times from geometric distribution.
+
+        Args:
+            size (int, optional): Number of running times to draw. Defaults to 1.
+            timeout (int, optional): Timeout if no satisfying assignment found yet. Defaults to None.
+
+        Raises:
+            RuntimeError: No satisfying assignments and no timeout (sampling would not terminate).
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Running times and whether each trial timed out. As for the sampling loop at most timeout + 1 shots are drawn, so timed out trials and trials succeeding on their last shot both have running time timeout + 1.
+        """
+        if self.p_succ <= 0:
+            if timeout is None:
+                raise RuntimeError("No satisfying assignments, sampling would not terminate")
+            return np.full(size, timeout + 1, dtype=np.int64), np.ones(size, dtype=bool)
+
+        runtimes = np.random.geometric(self.p_succ, size)
+        if timeout is None:
+            return runtimes, np.zeros(size, dtype=bool)
+        timed_out = runtimes > timeout + 1
+        return np.minimum(runtimes, timeout + 1), timed_out
+
+    def sample_assignment(self, size: int = 1) -> np.ndarray:
+        """Draw satisfying assignments from output distribution conditioned on success.
+
+        Args:
+            size (int, optional): Number of assignments to draw. Defaults to 1.
+
+        Returns:
+            np.ndarray: Indices of satisfying assignments.
+        """
+        return np.random.choice(self.sats, size=size, p=self.sat_probs)
+
+    def sat(self, timeout: int = None) -> Tuple[str, int]:
+        """Emulate solving by sampling, without drawing individual shots.
+
+        Args:
+            timeout (int, optional): Timeout if no satisfying assignment found yet. Defaults to None.
+
+        Returns:
+            Tuple[str, int]: Tuple of satisfying assignment and running time. String set to "-1" if timed out.
+        """
+        runtimes, timed_out = self.sample(1, timeout)
+        if timed_out[0]:
+            return "-1", int(runtimes[0])
+
+        index = int(self.sample_assignment(1)[0])
+        return bin(index)[2:].zfill(self.n), int(runtimes[0])
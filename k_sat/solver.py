@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Tuple
+from typing import List, Tuple
 from formula.cnf.cnf import CNF
 
 
@@ -20,3 +20,16 @@ class Solver(ABC):
             Tuple[str, int]: Tuple of satisfying assignment and runtime to find it. String set to "-1" formula unsatisfiable/solver timed out.
         """
         pass
+
+    def sat_many(self, formulas: List[CNF], timeout: int = None) -> List[Tuple[str, int]]:
+        """Finds satisfying assignments of several formulas, reusing parameters trained on
+        fixed training formulas between them.
+
+        Args:
+            formulas (List[CNF]): Formulas to find satisfying assignments for.
+            timeout (int, optional): Timeout for algorithm per formula if no satisfying assignment found yet. Defaults to None (keep going until solution found).
+
+        Returns:
+            List[Tuple[str, int]]: Satisfying assignment and runtime per formula, as returned by sat.
+        """
+        return [self.sat(formula, timeout) for formula in formulas]
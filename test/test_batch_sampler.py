@@ -0,0 +1,62 @@
+import unittest
+import torch
+
+from k_sat.pytorch_solver.batch_sampler import BatchSampler
+
+
+class TestBatchSampler(unittest.TestCase):
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.ps = torch.tensor([0.1, 0.3, 0.0, 0.2, 0.4])
+        self.sats = [3]
+
+    def naive_running_times(self, draws, trials, timeout):
+        # Reference implementation of sampling loop in PytorchSolver
+        draws = iter(draws)
+        results = []
+        for _ in range(trials):
+            runtime = 0
+            while True:
+                if timeout is not None and runtime > timeout:
+                    results.append((-1, runtime))
+                    break
+                runtime += 1
+                d = next(draws)
+                if d in self.sats:
+                    results.append((d, runtime))
+                    break
+        return results
+
+    def test_distribution(self):
+        sampler = BatchSampler(self.ps, self.sats)
+        draws = sampler.sample(200000)
+        freqs = torch.bincount(draws, minlength=5) / 200000
+        self.assertTrue(torch.allclose(freqs, self.ps, atol=0.01))
+        self.assertEqual(freqs[2].item(), 0.0)
+
+    def test_running_times_match_loop(self):
+        stream = torch.randint(0, 5, (1000,))
+        for batch_size in [1, 3, 7, 1000]:
+            for timeout in [None, 0, 2, 5]:
+                sampler = BatchSampler(self.ps, self.sats, batch_size=batch_size)
+                batches = iter(stream.split(batch_size))
+                sampler.sample = lambda shots: next(batches)
+
+                indices, runtimes = sampler.running_times(20, timeout)
+                expected = self.naive_running_times(stream.tolist(), 20, timeout)
+                self.assertEqual(list(zip(indices.tolist(), runtimes.tolist())), expected)
+
+    def test_running_time(self):
+        sampler = BatchSampler(self.ps, self.sats)
+        _, runtimes = sampler.running_times(20000)
+        self.assertAlmostEqual(runtimes.double().mean().item(), 5.0, delta=0.2)
+
+        index, runtime = sampler.running_time()
+        self.assertEqual(index, 3)
+        self.assertGreaterEqual(runtime, 1)
+
+        # No satisfying assignments
+        with self.assertRaises(RuntimeError):
+            BatchSampler(self.ps, []).running_time()
+        self.assertEqual(BatchSampler(self.ps, []).running_time(3), (-1, 4))
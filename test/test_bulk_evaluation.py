@@ -0,0 +1,92 @@
+import os
+import json
+import tempfile
+import unittest
+import h5py
+import numpy as np
+import torch
+
+from benchmark.bulk_evaluation import BulkEvaluator, evolve_instances
+from benchmark.cnf.generator.ksat_generator import KSATGenerator
+from benchmark.cnf.random_cnf import RandomCNF
+from k_sat.pytorch_solver.pytorch_circuit import PytorchCircuit
+
+
+class TempGenerator(KSATGenerator):
+    def __init__(self, root: str) -> None:
+        self.root = root
+
+    def directory(self, n: int, k: int) -> str:
+        return f"{self.root}/ksat/k_{k}/n_{n}"
+
+
+class TestBulkEvaluation(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.generator = TempGenerator(self.tmp.name)
+        self.formulas = {}
+        for n in [5, 6]:
+            os.makedirs(self.generator.directory(n, 3))
+            self.formulas[n] = RandomCNF(type='ksat').from_poisson(n, 3, instances=4)
+            for i, f in enumerate(self.formulas[n]):
+                f.to_file(self.generator.filename(n, 3, i))
+                # Counts stored for some instances only
+                if i % 2 == 0:
+                    with h5py.File(self.generator.filename(n, 3, i, "hdf5"), "w") as file:
+                        file.create_dataset("counts", data=f.counts_range(0, 2**n))
+        self.gamma, self.beta = [-0.6, -0.3], [0.4, 0.7]
+        self.results = f"{self.tmp.name}/results.jsonl"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_matches_circuit(self):
+        f = self.formulas[6]
+        h = torch.stack([torch.from_numpy(g.naive_counts) for g in f])
+        states = evolve_instances(h, torch.tensor(self.gamma), torch.tensor(self.beta))
+        circuit = PytorchCircuit(6, 2, torch.tensor(self.gamma), torch.tensor(self.beta))
+        with torch.no_grad():
+            for g, state in zip(f, states):
+                self.assertTrue(torch.allclose(state, circuit.evolve(g.naive_counts), atol=1e-6))
+
+    def test_resume(self):
+        # Batches of 2 instances (counts and 7 states each at n = 6), so runs interrupted
+        # after a batch resume mid-family
+        evaluator = BulkEvaluator(
+            self.gamma, self.beta, self.generator, 3, self.results,
+            processes=0, memory_budget=2 * (4 + 7 * 8) * 2**6,
+        )
+        self.assertEqual(evaluator.batch_size(6), 2)
+        self.assertEqual(evaluator.run([6], [0, 1, 2]), 3)
+        # Partially written line from interrupted run ignored
+        with open(self.results, "a") as f:
+            f.write('{"n": 6, "k"')
+        self.assertEqual(evaluator.run([5, 6], [0, 1, 2, 3]), 5)
+        self.assertEqual(evaluator.run([5, 6], [0, 1, 2, 3]), 0)
+
+        rows = [json.loads(line) for line in open(self.results) if line.endswith("}\n")]
+        self.assertEqual(len(rows), 8)
+        self.assertTrue(all(row["gamma"] == self.gamma and row["beta"] == self.beta for row in rows))
+        for row in rows:
+            f = self.formulas[row["n"]][row["index"]]
+            circuit = PytorchCircuit(row["n"], 2, torch.tensor(self.gamma), torch.tensor(self.beta))
+            with torch.no_grad():
+                ps = torch.abs(circuit.evolve(f.naive_counts)) ** 2
+            self.assertAlmostEqual(row["p_succ"], ps[f.naive_sats].sum().item(), places=5)
+            self.assertAlmostEqual(row["energy"], (ps * torch.from_numpy(f.naive_counts)).sum().item(), places=4)
+            self.assertAlmostEqual(row["expected_runtime"], 1 / row["p_succ"])
+
+    def test_pool(self):
+        evaluator = BulkEvaluator(self.gamma, self.beta, self.generator, 3, self.results, processes=2, max_batch=2)
+        self.assertEqual(evaluator.run([5], [0, 1, 2, 3]), 4)
+        self.assertEqual(len(evaluator.done()), 4)
+
+    def test_different_params(self):
+        # Results for other parameters in same file not taken as done
+        BulkEvaluator(self.gamma, self.beta, self.generator, 3, self.results, processes=0).run([5], [0, 1])
+        evaluator = BulkEvaluator([-0.2, -0.1], self.beta, self.generator, 3, self.results, processes=0)
+        self.assertEqual(len(evaluator.done()), 0)
+        self.assertEqual(evaluator.run([5], [0, 1]), 2)
+        self.assertEqual(len(evaluator.done()), 2)
@@ -0,0 +1,72 @@
+import unittest
+import numpy as np
+import torch
+
+from benchmark.cnf.random_cnf import RandomCNF
+from formula.cnf.wcnf import WCNF
+from k_sat.pytorch_solver.clause_cost import ClauseCost
+from k_sat.pytorch_solver.pytorch_circuit import PytorchCircuit
+from k_sat.pytorch_solver.pytorch_solver import PytorchSolver
+from k_sat.pytorch_solver.readout import Readout
+
+
+class TestClauseCost(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+        self.f, self.g = RandomCNF(type='ksat').from_poisson(8, 3, instances=2)
+
+    def test_counts(self):
+        cost = ClauseCost(self.f, block_size=64)
+        h = torch.cat([cost.counts(start, stop) for start, stop in cost.blocks()])
+        self.assertTrue(torch.equal(h, torch.from_numpy(self.f.naive_counts)))
+        self.assertTrue(torch.equal(cost.sats(), torch.from_numpy(self.f.naive_sats)))
+
+    def test_nae_counts(self):
+        # NAE clauses also unsatisfied when all literals true
+        f = RandomCNF(type='knaesat').from_poisson(6, 3)[0]
+        cost = ClauseCost(f, block_size=16)
+        h = torch.cat([cost.counts(start, stop) for start, stop in cost.blocks()])
+        self.assertTrue(torch.equal(h, torch.from_numpy(f.naive_counts)))
+        sats = cost.sats()
+        self.assertTrue(torch.equal(sats, torch.from_numpy(f.naive_sats)))
+        self.assertTrue(all(f.is_satisfied(bin(i)[2:].zfill(6)) for i in sats.tolist()))
+
+    def test_weighted_counts(self):
+        f = WCNF(self.f.clauses, [0.5 + i for i in range(len(self.f.clauses))])
+        cost = ClauseCost(f, block_size=64)
+        h = torch.cat([cost.counts(start, stop) for start, stop in cost.blocks()])
+        self.assertTrue(torch.equal(h, torch.from_numpy(f.naive_counts)))
+
+    def test_matches_dense(self):
+        gamma, beta = torch.tensor([-0.4, -0.7]), torch.tensor([0.6, 0.3])
+        dense = PytorchCircuit(8, 2, gamma.clone(), beta.clone())
+        free = PytorchCircuit(8, 2, gamma.clone(), beta.clone())
+        hS = torch.from_numpy(self.f.naive_sats)
+
+        p_dense = dense(torch.from_numpy(self.f.naive_counts), hS)
+        p_free = free(ClauseCost(self.f, block_size=64), hS)
+        self.assertAlmostEqual(p_free.item(), p_dense.item(), places=6)
+
+        p_dense.backward()
+        p_free.backward()
+        self.assertTrue(torch.allclose(free.gamma.grad, dense.gamma.grad, atol=1e-6))
+        self.assertTrue(torch.allclose(free.beta.grad, dense.beta.grad, atol=1e-6))
+
+    def test_solver(self):
+        # Formula being solved never has its counts computed
+        solver = PytorchSolver(training_formulas=[self.g], matrix_free=True)
+        bs, _ = solver.sat(self.f)
+        self.assertTrue(self.f.is_satisfied(bs))
+        self.assertIsNone(self.f.counts)
+
+    def test_single_shot(self):
+        # Trained on formula being solved, and read out, without computing its counts
+        solver = PytorchSolver(matrix_free=True, readout=Readout(cvar_alphas=[0.5]))
+        bs, _ = solver.sat(self.f)
+        self.assertTrue(self.f.is_satisfied(bs))
+        self.assertIsNone(self.f.counts)
+
+        observables = solver.observables
+        self.assertAlmostEqual(observables.level_probs.sum().item(), 1.0, places=5)
+        self.assertTrue(torch.equal(observables.levels, torch.unique(torch.from_numpy(self.f.naive_counts))))
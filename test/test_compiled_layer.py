@@ -0,0 +1,38 @@
+import unittest
+import torch
+
+from k_sat.pytorch_solver.compiled_layer import fused_layer
+from k_sat.pytorch_solver.pytorch_circuit import PytorchCircuit
+
+
+class TestCompiledLayer(unittest.TestCase):
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.n = 5
+        self.h = torch.randint(0, 4, (2**self.n,)).float()
+        self.hS = torch.nonzero(self.h == 0).flatten()
+        self.gamma = torch.tensor([-0.4, -0.2])
+        self.beta = torch.tensor([0.3, 0.6])
+
+    def test_fused_layer(self):
+        circuit = PytorchCircuit(self.n, 2, self.gamma, self.beta)
+        state = circuit.initial
+        state = circuit.mix(circuit.cost(state, self.gamma[0], self.h), self.beta[0])
+        re, im = fused_layer(
+            circuit.initial.real, circuit.initial.imag, self.h, self.gamma[0], self.beta[0], self.n
+        )
+        self.assertTrue(torch.allclose(torch.complex(re, im), state, atol=1e-6))
+
+    def test_compiled_circuit(self):
+        eager = PytorchCircuit(self.n, 2, self.gamma.clone(), self.beta.clone())
+        compiled = PytorchCircuit(self.n, 2, self.gamma.clone(), self.beta.clone(), compiled=True)
+
+        p_eager = eager(self.h, self.hS)
+        p_compiled = compiled(self.h, self.hS)
+        self.assertAlmostEqual(p_eager.item(), p_compiled.item(), places=5)
+
+        p_eager.backward()
+        p_compiled.backward()
+        self.assertTrue(torch.allclose(eager.gamma.grad, compiled.gamma.grad, atol=1e-5))
+        self.assertTrue(torch.allclose(eager.beta.grad, compiled.beta.grad, atol=1e-5))
@@ -0,0 +1,79 @@
+import unittest
+from unittest import mock
+import numpy as np
+from qiskit import Aer
+from qiskit.circuit.library import DiagonalGate
+from qiskit.quantum_info import Operator
+
+from benchmark.cnf.random_cnf import RandomCNF
+from k_sat.qiskit_solver.average_optimiser import AverageOptimiser
+from k_sat.qiskit_solver import diagonal_encoder
+from k_sat.qiskit_solver.diagonal_encoder import DiagonalEncoder, diagonal_gate
+from k_sat.qiskit_solver.evaluator import Evaluator
+from k_sat.qiskit_solver.pauli_encoder import PauliEncoder
+from k_sat.qiskit_solver.qiskit_solver import QiskitSolver
+
+
+class TestDiagonalEncoder(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+        self.formula = RandomCNF(type='ksat').from_poisson(5, 3)[0]
+        self.params = [-0.4, -0.7, 0.3, 0.5]
+
+    def test_matches_pauli(self):
+        pauli = PauliEncoder().encode_formula(self.formula, 2)
+        diagonal = DiagonalEncoder().encode_formula(self.formula, 2)
+
+        self.assertEqual([p.name for p in pauli.parameters], [p.name for p in diagonal.parameters])
+        self.assertEqual(diagonal.count_ops()["diagonal_cost"], 2)
+        self.assertTrue(
+            np.allclose(
+                Operator(diagonal.bind_parameters(self.params)).data,
+                Operator(pauli.bind_parameters(self.params)).data,
+                atol=1e-6,
+            )
+        )
+
+        evaluator = Evaluator()
+        self.assertTrue(
+            np.allclose(
+                evaluator.probabilities(diagonal, self.params),
+                evaluator.probabilities(pauli, self.params),
+            )
+        )
+
+    def test_shared_counts(self):
+        # Counts held once, shared by layers and bound copies
+        circuit = DiagonalEncoder().encode_formula(self.formula, 2)
+        bound = circuit.bind_parameters(self.params)
+        costs = [g.operation for g in circuit.data + bound.data if g.operation.name == "diagonal_cost"]
+        self.assertTrue(all(c.h is costs[0].h for c in costs))
+
+    def test_diagonal_gate(self):
+        # Unvalidated gate identical to public constructor, which is used for unknown versions
+        entries = np.exp(-1j * 0.3 * np.arange(8))
+        expected = DiagonalGate(entries.tolist())
+        for unchecked in [True, False]:
+            with mock.patch.object(diagonal_encoder, "UNCHECKED_DIAGONAL", unchecked):
+                gate = diagonal_gate(entries)
+            self.assertEqual((gate.name, gate.num_qubits), ("diagonal", 3))
+            self.assertTrue(np.allclose(gate.params, expected.params))
+            self.assertTrue(np.allclose(Operator(gate).data, Operator(expected).data))
+
+    def test_optimiser(self):
+        # Same objective as Pauli circuits, so same optimum
+        formulas = RandomCNF(type='ksat').from_poisson(5, 3, instances=2)
+        backend = Aer.get_backend("aer_simulator_statevector")
+        params = [
+            AverageOptimiser(backend).find_optimal_params(
+                [-0.01, 0.01], [(f, encoder.encode_formula(f)) for f in formulas]
+            )
+            for encoder in [PauliEncoder(), DiagonalEncoder()]
+        ]
+        self.assertTrue(np.allclose(params[0], params[1], atol=1e-4))
+
+    def test_solver(self):
+        solver = QiskitSolver(encoder=DiagonalEncoder())
+        bs, _ = solver.sat(self.formula)
+        self.assertTrue(self.formula.is_satisfied(bs))
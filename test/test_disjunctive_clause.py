@@ -1,4 +1,5 @@
 import unittest
+import numpy as np
 from formula.variable import Variable
 from formula.cnf.disjunctive_clause import DisjunctiveClause
 
@@ -87,4 +88,15 @@ class TestDisjunctiveClause(unittest.TestCase):
         self.assertEqual(clause.parity(), -1)
         self.assertEqual(clause.parity([self.nv0]), 1)
         self.assertEqual(clause.parity([self.v1]), -1)
-        self.assertEqual(clause.parity([self.nv0, self.v1]), -1)
\ No newline at end of file
+        self.assertEqual(clause.parity([self.nv0, self.v1]), -1)
+
+    def test_unsatisfied_indices(self) -> None:
+        # Index bit n - 1 - i corresponds to x_i
+        indices = np.arange(4)
+        clause = DisjunctiveClause([self.v0, self.nv1])
+        expected = [not clause.is_satisfied(bin(i)[2:].zfill(2)) for i in indices]
+        self.assertEqual(clause.unsatisfied_indices(indices, 2).tolist(), expected)
+
+        # Clause always satisfied by LEM
+        clause = DisjunctiveClause([self.v0, self.nv0])
+        self.assertFalse(clause.unsatisfied_indices(indices, 2).any())
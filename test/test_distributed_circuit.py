@@ -0,0 +1,70 @@
+import tempfile
+import unittest
+import numpy as np
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
+
+from benchmark.cnf.random_cnf import RandomCNF
+from k_sat.pytorch_solver.pytorch_circuit import PytorchCircuit
+from k_sat.pytorch_solver.distributed_circuit import DistributedCircuit
+from k_sat.pytorch_solver.pytorch_optimiser import PytorchOptimiser
+from k_sat.pytorch_solver.sharded_optimiser import ShardedOptimiser
+
+
+def run_shard(rank, world_size, init_file, formula, results):
+    dist.init_process_group(
+        "gloo", init_method=f"file://{init_file}", rank=rank, world_size=world_size
+    )
+    init_gamma = torch.tensor([-0.3, 0.5])
+    init_beta = torch.tensor([0.2, -0.4])
+    circuit = DistributedCircuit(formula.num_vars, 2, init_gamma, init_beta)
+    h = circuit.local_counts(formula)
+    p_succ = circuit(h, circuit.local_sats(h))
+    p_succ.backward()
+    if rank == 0:
+        results[0] = p_succ.item()
+        results[1:3] = circuit.gamma.grad
+        results[3:5] = circuit.beta.grad
+    dist.destroy_process_group()
+
+
+class TestDistributedCircuit(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+        self.formula = RandomCNF(type='ksat').from_poisson(6, 3)[0]
+
+    def test_matches_single_process(self):
+        n = self.formula.num_vars
+        h = self.formula.counts_range(0, 2**n)
+        hS = np.where(h == 0.0)[0]
+        circuit = PytorchCircuit(
+            n, 2, torch.tensor([-0.3, 0.5]), torch.tensor([0.2, -0.4])
+        )
+        p_succ = circuit(torch.from_numpy(h), torch.from_numpy(hS))
+        p_succ.backward()
+
+        for world_size in [2, 4]:
+            results = torch.zeros(5).share_memory_()
+            with tempfile.NamedTemporaryFile() as f:
+                init_file = f.name
+            mp.spawn(
+                run_shard,
+                args=(world_size, init_file, self.formula, results),
+                nprocs=world_size,
+            )
+            self.assertAlmostEqual(results[0].item(), p_succ.item(), places=5)
+            self.assertTrue(torch.allclose(results[1:3], circuit.gamma.grad, atol=1e-5))
+            self.assertTrue(torch.allclose(results[3:5], circuit.beta.grad, atol=1e-5))
+
+    def test_sharded_optimiser(self):
+        # Same steps as training whole state in one process
+        self.formula.counts = self.formula.counts_range(0, 2**self.formula.num_vars)
+        circuit = PytorchCircuit(6, 2)
+        p_succ = PytorchOptimiser(circuit, epochs=10).find_optimal_params([self.formula])
+
+        optimiser = ShardedOptimiser(6, 2, processes=2, epochs=10)
+        self.assertAlmostEqual(optimiser.find_optimal_params([self.formula]), p_succ, places=5)
+        self.assertTrue(torch.allclose(optimiser.circuit.gamma, circuit.gamma.detach(), atol=1e-5))
+        self.assertTrue(torch.allclose(optimiser.circuit.beta, circuit.beta.detach(), atol=1e-5))
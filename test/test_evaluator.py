@@ -0,0 +1,136 @@
+import unittest
+import numpy as np
+from qiskit import Aer
+
+from benchmark.cnf.random_cnf import RandomCNF
+from formula.cnf.cnf import CNF
+from formula.cnf.disjunctive_clause import DisjunctiveClause
+from formula.variable import Variable
+from k_sat.qiskit_solver.average_optimiser import AverageOptimiser
+from k_sat.qiskit_solver.evaluator import Evaluator, reversed_indices
+from k_sat.qiskit_solver.pauli_encoder import PauliEncoder
+
+
+class TestEvaluator(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+        self.formula = RandomCNF(type='ksat').from_poisson(6, 3)[0]
+        self.circuit = PauliEncoder().encode_formula(self.formula, 2).bind_parameters(
+            [-0.4, -0.7, 0.3, 0.5]
+        )
+
+        # Reference distribution from statevector, keyed by reversed bitstrings
+        circuit = self.circuit.copy()
+        circuit.save_statevector()
+        backend = Aer.get_backend("aer_simulator_statevector")
+        output = backend.run(circuit).result().get_statevector().probabilities_dict()
+        self.output = {s[::-1]: p for (s, p) in output.items()}
+
+    def test_reversed_indices(self):
+        rev = reversed_indices(6)
+        self.assertEqual(rev[1], 32)
+        self.assertEqual(rev[0b110100], 0b001011)
+        self.assertTrue(np.array_equal(rev[rev], np.arange(64)))
+
+    def test_matches_strings(self):
+        evaluator = Evaluator()
+        p_succ = sum(p * self.formula.is_satisfied(s) for (s, p) in self.output.items())
+        energy = sum(p * self.formula.assignment_weight(s) for (s, p) in self.output.items())
+
+        self.assertAlmostEqual(evaluator.success_probability(self.circuit, self.formula), p_succ, places=6)
+        self.assertAlmostEqual(evaluator.energy(self.circuit, self.formula), energy, places=5)
+        probs = evaluator.probabilities(self.circuit)
+        for (s, p) in self.output.items():
+            self.assertAlmostEqual(probs[int(s, 2)], p, places=6)
+
+    def test_weighted_averages(self):
+        optimiser = AverageOptimiser()
+        energy = sum(p * self.formula.assignment_weight(s) for (s, p) in self.output.items())
+        self.assertAlmostEqual(optimiser.assignment_weighted_average(self.formula, self.output), energy, places=5)
+
+        # Measured counts in qiskit order
+        counts = {"000011": 3, "101000": 1}
+        expected = (3 * self.formula.assignment_weight("110000") + self.formula.assignment_weight("000101")) / 4
+        self.assertAlmostEqual(optimiser.counts_weighted_average(self.formula, counts), expected)
+
+    def test_running_time(self):
+        evaluator = Evaluator(initial_shots=2, max_shots=8)
+        for method in ["single", "batched", "statevector"]:
+            bs, runtime = evaluator.running_time(self.circuit, self.formula, method=method)
+            self.assertTrue(self.formula.is_satisfied(bs))
+            self.assertGreaterEqual(runtime, 1)
+
+        # Expected running time 1 / p_succ
+        p_succ = evaluator.success_probability(self.circuit, self.formula)
+        runtimes = [evaluator.running_time(self.circuit, self.formula, method="statevector")[1] for _ in range(300)]
+        self.assertAlmostEqual(np.mean(runtimes), 1 / p_succ, delta=0.25 / p_succ)
+        runtimes = [evaluator.running_time(self.circuit, self.formula, method="batched")[1] for _ in range(30)]
+        self.assertAlmostEqual(np.mean(runtimes), 1 / p_succ, delta=0.7 / p_succ)
+
+    def test_cached_cdf(self):
+        # Output distribution simulated once per circuit and parameters
+        circuit = PauliEncoder().encode_formula(self.formula, 1)
+        evaluator = Evaluator()
+        cdf = evaluator.cdf(circuit, [-0.4, 0.3])
+        for _ in range(3):
+            evaluator.running_time(circuit, self.formula, [-0.4, 0.3], timeout=5, method="statevector")
+            self.assertIs(evaluator.cdf(circuit, [-0.4, 0.3]), cdf)
+        self.assertAlmostEqual(cdf[-1], 1.0)
+        self.assertTrue(np.allclose(np.diff(cdf, prepend=0), evaluator.probabilities(circuit, [-0.4, 0.3])))
+
+        other = evaluator.cdf(circuit, [-0.2, 0.3])
+        self.assertIsNot(other, cdf)
+        self.assertFalse(np.allclose(other, cdf))
+
+    def test_timeout(self):
+        # Every assignment of x_0, x_1 unsatisfies a clause
+        formula = CNF(
+            [
+                DisjunctiveClause([Variable(0, a), Variable(1, b)])
+                for a in [False, True]
+                for b in [False, True]
+            ]
+        )
+        circuit = PauliEncoder().encode_formula(formula, 1).bind_parameters([-0.4, 0.3])
+        evaluator = Evaluator(max_shots=4)
+        for method in ["single", "batched", "statevector"]:
+            self.assertEqual(evaluator.running_time(circuit, formula, timeout=9, method=method), ("-1", 10))
+        with self.assertRaises(RuntimeError):
+            evaluator.running_time(circuit, formula, method="batched")
+
+    def test_optimiser(self):
+        formulas = RandomCNF(type='ksat').from_poisson(5, 3, instances=3)
+        circuits = [(f, PauliEncoder().encode_formula(f, 1)) for f in formulas]
+        evaluator = Evaluator()
+        init_params = [-0.01, 0.01]
+
+        def average_energy(params):
+            return np.mean([evaluator.energy(c, f, params) for (f, c) in circuits])
+
+        for backend in ["aer_simulator_statevector", "aer_simulator"]:
+            params = AverageOptimiser(Aer.get_backend(backend)).find_optimal_params(init_params, circuits)
+            self.assertLess(average_energy(list(params)), average_energy(init_params))
+
+    def test_metrics(self):
+        optimiser = AverageOptimiser(cvar_alpha=0.25)
+        costs = np.array([3.0, 0.0, 2.0, 1.0])
+        weights = np.array([4.0, 1.0, 3.0, 2.0])
+        metrics = optimiser.weighted_metrics(costs, weights)
+        self.assertAlmostEqual(metrics["average"], 2.0)
+        self.assertAlmostEqual(metrics["success"], 0.1)
+        self.assertAlmostEqual(metrics["cvar"], (0.1 * 0 + 0.15 * 1) / 0.25)
+
+        # Costs looked up from counts if computed, evaluated on outcomes otherwise
+        formula = RandomCNF(type='ksat').from_poisson(6, 3)[0]
+        indices = np.array([5, 17, 63])
+        evaluated = optimiser.costs(formula, indices)
+        self.assertIsNone(formula.counts)
+        formula.naive_counts
+        self.assertTrue(np.array_equal(optimiser.costs(formula, indices), evaluated))
+
+        circuits = [(self.formula, PauliEncoder().encode_formula(self.formula, 1))]
+        optimiser = AverageOptimiser(Aer.get_backend("aer_simulator_statevector"), objective="cvar")
+        optimiser.find_optimal_params([-0.01, 0.01], circuits)
+        self.assertLessEqual(optimiser.metrics["cvar"], optimiser.metrics["average"])
+        self.assertEqual(set(optimiser.metrics), {"average", "success", "cvar"})
@@ -0,0 +1,100 @@
+import tempfile
+import unittest
+import numpy as np
+
+from benchmark.cnf.random_cnf import RandomCNF
+from k_sat.execution_planner import ExecutionPlanner
+from k_sat.numpy_solver.numpy_solver import NumpySolver
+from k_sat.pytorch_solver.pytorch_solver import PytorchSolver
+
+
+class TestExecutionPlanner(unittest.TestCase):
+
+    def test_strategy_selection(self):
+        planner = ExecutionPlanner(memory_budget=2**30)
+        self.assertEqual(planner.plan(16, 2).strategy, "in_memory")
+
+        # Autograd graph of n = 24 exceeds 1 GiB, no alternative for gradients on one process
+        plan = planner.plan(24, 2)
+        self.assertFalse(plan.fits)
+
+        # Sharded over enough processes fits
+        plan = ExecutionPlanner(memory_budget=2**30, processes=32).plan(24, 2)
+        self.assertEqual(plan.strategy, "sharded")
+        self.assertTrue(plan.fits)
+
+        # Inference falls back to memory-mapped state
+        self.assertEqual(planner.plan(24, 2, backend="numpy", gradients=False).strategy, "chunked")
+        self.assertEqual(planner.plan(28, 2, backend="numpy", gradients=False).strategy, "memmap")
+
+    def test_batch_size(self):
+        planner = ExecutionPlanner(memory_budget=2**30)
+        full = planner.estimate("in_memory", 16, 2, batch_size=1)
+        self.assertTrue(full.fits)
+
+        # Batch shrinks to fit
+        plan = planner.plan(18, 2, batch_size=64, formulas=64)
+        self.assertLess(plan.batch_size, 64)
+        self.assertTrue(plan.fits)
+        self.assertFalse(planner.estimate("in_memory", 18, 2, batch_size=plan.batch_size * 2, formulas=64).fits)
+
+    def test_report(self):
+        report = ExecutionPlanner(memory_budget=2**30, processes=4).report(20, 3)
+        self.assertIn("in_memory", report)
+        self.assertIn("sharded", report)
+        self.assertNotIn("memmap", report)
+
+    def test_solvers(self):
+        np.random.seed(0)
+        f = RandomCNF(type='ksat').from_poisson(8, 3)[0]
+
+        with self.assertRaises(RuntimeError):
+            PytorchSolver(memory_budget=2**10).sat(f)
+
+        # Tiny budget forces memory-mapped state
+        with tempfile.TemporaryDirectory() as tmp:
+            solver = NumpySolver([-0.5], [0.3], memory_budget=7500, directory=tmp)
+            self.assertEqual(solver.strategy(f), "memmap")
+            bs, _ = solver.sat(f)
+            self.assertTrue(f.is_satisfied(bs))
+
+    def test_training_fallbacks(self):
+        np.random.seed(0)
+        formulas = RandomCNF(type='ksat').from_poisson(8, 3, instances=4)
+        # Bytes of counts and of one formula's autograd graph at n = 8, p = 1
+        counts, graph = 4 * 2**8, (2 * 8 + 3) * 8 * 2**8
+
+        # Gradients accumulated over batches of two formulas
+        solver = PytorchSolver(training_formulas=formulas, memory_budget=4 * counts + 2 * graph)
+        bs, _ = solver.sat(formulas[0])
+        self.assertTrue(formulas[0].is_satisfied(bs))
+        self.assertEqual(solver.plan.batch_size, 2)
+
+        # Fewer restarts trained in parallel
+        f = RandomCNF(type='ksat').from_poisson(8, 3)[0]
+        solver = PytorchSolver(restarts=4, memory_budget=2 * (counts + graph))
+        self.assertEqual(solver.plan_training(f, [f], False, 4), (1, 2, False))
+
+        # Formula being solved trained and read out matrix-free
+        solver = PytorchSolver(memory_budget=graph + counts // 2)
+        bs, _ = solver.sat(f)
+        self.assertTrue(f.is_satisfied(bs))
+        self.assertTrue(solver.budget_matrix_free)
+        self.assertIsNone(f.counts)
+
+    def test_sharded_training(self):
+        np.random.seed(0)
+        f = RandomCNF(type='ksat').from_poisson(8, 3)[0]
+        # Autograd graph of n = 8, p = 1 only fits split over two processes
+        budget = 3 * 8 * 2**8 + 8 * 2**8 * (2 * 8 + 3) // 2
+        plan = ExecutionPlanner(memory_budget=budget, processes=2).plan(f, 1)
+        self.assertEqual(plan.strategy, "sharded")
+        self.assertFalse(ExecutionPlanner(memory_budget=budget).plan(f, 1).fits)
+
+        solver = PytorchSolver(memory_budget=budget, processes=2)
+        bs, _ = solver.sat(f)
+        self.assertTrue(f.is_satisfied(bs))
+        self.assertEqual(solver.plan.strategy, "sharded")
+
+        with self.assertRaises(RuntimeError):
+            PytorchSolver(processes=3)
@@ -0,0 +1,83 @@
+import unittest
+from unittest import mock
+import numpy as np
+import torch
+
+from benchmark.cnf.random_cnf import RandomCNF
+from k_sat.pytorch_solver.grover_circuit import GroverCircuit
+from k_sat.pytorch_solver.pytorch_optimiser import PytorchOptimiser
+from k_sat.pytorch_solver.pytorch_solver import PytorchSolver
+
+
+class TestGroverCircuit(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+        self.f = RandomCNF(type='ksat').from_poisson(7, 3)[0]
+        self.f.counts = self.f.counts_range(0, 2**7)
+        self.h = torch.from_numpy(self.f.naive_counts)
+        self.hS = torch.from_numpy(self.f.naive_sats)
+
+    def full_state(self, gamma, beta):
+        # Dense simulation with explicit Grover mixer
+        N = 2**7
+        s = torch.full((N,), 1 / np.sqrt(N), dtype=torch.cdouble)
+        state = s.clone()
+        for g, b in zip(gamma, beta):
+            state = state * torch.exp(1j * g * self.h.double())
+            state = state + (np.exp(1j * b) - 1) * torch.dot(s.conj(), state) * s
+        return state
+
+    def test_matches_dense(self):
+        gamma, beta = [-0.7, -0.4, -0.2], [0.9, 1.3, 0.5]
+        circuit = GroverCircuit(7, 3, torch.tensor(gamma), torch.tensor(beta))
+        expected = self.full_state(gamma, beta)
+
+        state = circuit.evolve(self.h)
+        self.assertTrue(torch.allclose(state, expected.to(torch.cfloat), atol=1e-6))
+        p_succ = circuit(self.h, self.hS)
+        self.assertAlmostEqual(p_succ.item(), torch.sum(torch.abs(expected[self.hS]) ** 2).item(), places=6)
+
+        # Histogram alone suffices
+        levels, degeneracies, _ = circuit.histogram(self.h)
+        self.assertAlmostEqual(circuit.level_probabilities(levels, degeneracies).sum().item(), 1.0, places=10)
+
+    def test_gradients(self):
+        circuit = GroverCircuit(7, 2, torch.tensor([-0.3, -0.6]), torch.tensor([0.4, 0.8]))
+        circuit(self.h, self.hS).backward()
+
+        eps = 1e-3
+        for i in range(2):
+            shifted = []
+            for sign in [1, -1]:
+                gamma = torch.tensor([-0.3, -0.6], dtype=torch.float64)
+                gamma[i] += sign * eps
+                state = self.full_state(gamma.tolist(), [0.4, 0.8])
+                shifted.append(torch.sum(torch.abs(state[self.hS]) ** 2).item())
+            self.assertAlmostEqual(circuit.gamma.grad[i].item(), (shifted[0] - shifted[1]) / (2 * eps), places=3)
+
+    def test_large_n(self):
+        # Histogram of 2^40 bitstrings: one satisfying, rest on one level
+        circuit = GroverCircuit(40, 1, torch.tensor([np.pi]), torch.tensor([np.pi]))
+        levels = torch.tensor([0.0, 1.0], dtype=torch.float64)
+        degeneracies = torch.tensor([1.0, 2.0**40 - 1], dtype=torch.float64)
+        self.assertAlmostEqual(circuit.level_succ_prob(levels, degeneracies).item(), 9 / 2**40, delta=1e-15)
+
+    def test_solver(self):
+        solver = PytorchSolver(mixer="grover")
+        bs, _ = solver.sat(self.f)
+        self.assertTrue(self.f.is_satisfied(bs))
+
+    def test_histogram_once(self):
+        # Histogram computed once per formula, not every epoch
+        circuit = GroverCircuit(7, 2)
+        with mock.patch.object(circuit, "histogram", wraps=circuit.histogram) as histogram:
+            p_succ = PytorchOptimiser(circuit, epochs=5).find_optimal_params([self.f])
+        self.assertEqual(histogram.call_count, 1)
+        self.assertAlmostEqual(p_succ, circuit(self.h, self.hS).item(), places=2)
+
+    def test_unsupported_training(self):
+        with self.assertRaises(RuntimeError):
+            PytorchSolver(mixer="grover", restarts=4)
+        with self.assertRaises(RuntimeError):
+            PytorchSolver(mixer="grover", schedule="interp")
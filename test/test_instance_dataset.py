@@ -0,0 +1,75 @@
+import functools
+import os
+import tempfile
+import unittest
+import h5py
+import numpy as np
+import torch
+
+from benchmark.cnf.generator.ksat_generator import KSATGenerator
+from benchmark.cnf.random_cnf import RandomCNF
+from k_sat.pytorch_solver.instance_dataset import InstanceDataset, instance_loader
+from k_sat.pytorch_solver.pytorch_circuit import PytorchCircuit
+from k_sat.pytorch_solver.pytorch_optimiser import PytorchOptimiser
+
+
+class TempGenerator(KSATGenerator):
+    def __init__(self, root: str) -> None:
+        self.root = root
+
+    def directory(self, n: int, k: int) -> str:
+        return f"{self.root}/ksat/k_{k}/n_{n}"
+
+
+class TestInstanceDataset(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+        torch.manual_seed(0)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.generator = TempGenerator(self.tmp.name)
+        os.makedirs(self.generator.directory(6, 3))
+
+        # Write satisfiable instances and their unsat counts
+        self.formulas = RandomCNF(type='ksat').from_poisson(6, 3, instances=5)
+        for i, f in enumerate(self.formulas):
+            f.to_file(self.generator.filename(6, 3, i))
+            with h5py.File(self.generator.filename(6, 3, i, "hdf5"), "w") as file:
+                file.create_dataset("counts", data=f.counts_range(0, 2**6))
+        self.load = functools.partial(self.generator.from_file, 6, 3, True)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_dataset(self):
+        dataset = InstanceDataset(self.load, list(range(5)))
+        self.assertEqual(len(dataset), 5)
+        h, hS = dataset[2]
+        f = self.formulas[2]
+        self.assertTrue(np.array_equal(h.numpy(), f.counts_range(0, 2**6)))
+        self.assertEqual(sorted(hS.tolist()), [i for i in range(2**6) if f.counts_at([i])[0] == 0])
+
+    def test_loader(self):
+        dataset = InstanceDataset(self.load, list(range(5)))
+        loader = instance_loader(dataset, batch_size=2)
+        batches = list(loader)
+        self.assertEqual([len(b) for b in batches], [2, 2, 1])
+        seen = sorted(h.sum().item() for b in batches for (h, _) in b)
+        self.assertEqual(seen, sorted(dataset[i][0].sum().item() for i in range(5)))
+
+    def test_stream_training(self):
+        dataset = InstanceDataset(self.load, list(range(5)))
+        loader = instance_loader(dataset, batch_size=2)
+        circuit = PytorchCircuit(6, 1)
+        optimiser = PytorchOptimiser(circuit, torch.optim.Adam(circuit.parameters(), lr=0.05, maximize=True))
+
+        with torch.no_grad():
+            before = torch.mean(torch.stack([circuit(h, hS) for (h, hS) in dataset])).item()
+        optimiser.find_optimal_params_stream(loader, epochs=5)
+        with torch.no_grad():
+            after = torch.mean(torch.stack([circuit(h, hS) for (h, hS) in dataset])).item()
+
+        self.assertGreater(after, before)
+        # epochs + 1 passes over loader, as for find_optimal_params, of 3 mini-batches each
+        self.assertEqual(optimiser.summary["steps"], 6)
+        self.assertEqual(optimiser.summary["evaluations"], 18)
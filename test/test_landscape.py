@@ -0,0 +1,55 @@
+import unittest
+import numpy as np
+import torch
+
+from benchmark.cnf.random_cnf import RandomCNF
+from k_sat.pytorch_solver.landscape import Landscape
+from k_sat.pytorch_solver.pytorch_circuit import PytorchCircuit
+
+
+class TestLandscape(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+        f = RandomCNF(type='ksat').from_poisson(8, 3)[0]
+        self.h = torch.from_numpy(f.counts_range(0, 2**8))
+        self.hS = torch.nonzero(self.h == 0).flatten()
+
+    def test_evaluate(self):
+        gamma = torch.tensor([[-0.5, -0.2], [-0.1, -0.8], [0.3, 0.4]])
+        beta = torch.tensor([[0.2, 0.4], [0.6, 0.1], [-0.3, 0.2]])
+
+        # Chunk size smaller than batch
+        landscape = Landscape(self.h, self.hS, max_bytes=2 * 32 * 2**8)
+        self.assertEqual(landscape.chunk_size, 2)
+        p_succ, energy = landscape.evaluate(gamma, beta)
+
+        for g in range(3):
+            circuit = PytorchCircuit(8, 2, gamma[g], beta[g])
+            with torch.no_grad():
+                state = circuit.evolve(self.h)
+                ps = (state * state.conj()).real
+            self.assertAlmostEqual(p_succ[g].item(), ps[self.hS].sum().item(), places=5)
+            self.assertAlmostEqual(energy[g].item(), (ps @ self.h).item(), places=4)
+
+    def test_grid(self):
+        landscape = Landscape(self.h, self.hS)
+        gammas = torch.linspace(-1, 1, 5)
+        betas = torch.linspace(0, 1, 4)
+        p_succ, energy = landscape.grid(gammas, betas)
+        self.assertEqual(p_succ.shape, (5, 4))
+
+        expected, _ = landscape.evaluate(gammas[3].reshape(1, 1), betas[2].reshape(1, 1))
+        self.assertAlmostEqual(p_succ[3, 2].item(), expected.item(), places=6)
+
+        # No evolution at gamma = beta = 0, uniform distribution
+        p_succ, energy = landscape.grid(torch.zeros(1), torch.zeros(1))
+        self.assertAlmostEqual(p_succ.item(), len(self.hS) / 2**8, places=6)
+        self.assertAlmostEqual(energy.item(), self.h.mean().item(), places=4)
+
+    def test_succ_grid(self):
+        landscape = Landscape(self.h, self.hS, max_bytes=2**16)
+        gammas = torch.linspace(-2, 1, 7)
+        betas = torch.linspace(-0.5, 1.5, 5)
+        expected, _ = landscape.grid(gammas, betas)
+        self.assertTrue(torch.allclose(landscape.succ_grid(gammas, betas), expected, atol=1e-5))
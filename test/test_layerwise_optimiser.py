@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import torch
+
+from benchmark.cnf.random_cnf import RandomCNF
+from k_sat.pytorch_solver.fourier_circuit import FourierCircuit
+from k_sat.pytorch_solver.layerwise_optimiser import LayerwiseOptimiser, interp
+
+
+class TestLayerwiseOptimiser(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+        self.formula = RandomCNF(type='ksat').from_poisson(6, 3)[0]
+        self.formula.counts = self.formula.counts_range(0, 2**self.formula.num_vars)
+
+    def test_interp(self):
+        gamma, beta = interp(torch.tensor([0.5]), torch.tensor([-0.2]))
+        self.assertTrue(torch.allclose(gamma, torch.tensor([0.5, 0.5])))
+        self.assertTrue(torch.allclose(beta, torch.tensor([-0.2, -0.2])))
+
+        # Endpoints kept, interior points interpolated
+        gamma, _ = interp(torch.tensor([0.2, 0.6]), torch.tensor([0.0, 0.0]))
+        self.assertTrue(torch.allclose(gamma, torch.tensor([0.2, 0.4, 0.6])))
+
+    def test_fourier_angles(self):
+        circuit = FourierCircuit(3, 2, torch.tensor([1.0, 0.0]), torch.tensor([0.0, 1.0]))
+        gamma, beta = circuit.angles()
+        self.assertTrue(torch.allclose(gamma, torch.sin(torch.tensor([0.25, 0.75]) * np.pi / 2)))
+        self.assertTrue(torch.allclose(beta, torch.cos(torch.tensor([0.75, 2.25]) * np.pi / 2)))
+        self.assertEqual(
+            {name for (name, _) in circuit.named_parameters()}, {"u", "v"}
+        )
+
+    def test_layerwise(self):
+        for strategy in ["interp", "fourier"]:
+            optimiser = LayerwiseOptimiser(
+                self.formula.num_vars, 3, strategy, epochs=20, fourier_terms=2
+            )
+            p_succ = optimiser.find_optimal_params([self.formula])
+            self.assertEqual(optimiser.circuit.layers, 3)
+            gamma, beta = optimiser.circuit.angles()
+            self.assertEqual(len(gamma), 3)
+            self.assertEqual(len(beta), 3)
+            self.assertGreater(p_succ, 0)
+
+        self.assertEqual(len(optimiser.circuit.u), 2)
+
+    def test_greedy(self):
+        optimiser = LayerwiseOptimiser(6, 3, strategy="greedy", epochs=20)
+        p_succ = optimiser.find_optimal_params([self.formula])
+        circuit = optimiser.circuit
+        self.assertEqual(circuit.layers, 3)
+
+        # Trained layers compose to full circuit (p_succ reported before final step)
+        h = torch.from_numpy(self.formula.naive_counts)
+        hS = torch.from_numpy(self.formula.naive_sats)
+        with torch.no_grad():
+            self.assertAlmostEqual(circuit(h, hS).item(), p_succ, places=2)
+
+    def test_greedy_memmap_fine_tune(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cached = LayerwiseOptimiser(6, 2, strategy="greedy", epochs=10, cache_dir=tmp)
+            in_memory = LayerwiseOptimiser(6, 2, strategy="greedy", epochs=10)
+            self.assertAlmostEqual(
+                cached.find_optimal_params([self.formula]),
+                in_memory.find_optimal_params([self.formula]),
+                places=6,
+            )
+            # Cached states removed after training
+            self.assertEqual(os.listdir(tmp), [])
+
+        tuned = LayerwiseOptimiser(6, 2, strategy="greedy", epochs=10, fine_tune=10)
+        self.assertGreater(tuned.find_optimal_params([self.formula]), in_memory.find_optimal_params([self.formula]))
+
+    def test_compiled(self):
+        # Circuits at every depth compiled, reaching same optimum as eager circuits
+        for strategy in ["interp", "fourier", "greedy"]:
+            eager = LayerwiseOptimiser(6, 2, strategy, epochs=5)
+            compiled = LayerwiseOptimiser(6, 2, strategy, epochs=5, compiled=True)
+            p_eager = eager.find_optimal_params([self.formula])
+            p_compiled = compiled.find_optimal_params([self.formula])
+            self.assertTrue(compiled.circuit.compiled)
+            self.assertAlmostEqual(p_eager, p_compiled, places=4)
@@ -0,0 +1,47 @@
+import unittest
+import numpy as np
+import torch
+
+from benchmark.cnf.random_cnf import RandomCNF
+from k_sat.pytorch_solver.multi_start_optimiser import MultiStartOptimiser
+
+
+class TestMultiStartOptimiser(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+        self.formulas = RandomCNF(type='ksat').from_poisson(6, 3, instances=2)
+        for f in self.formulas:
+            f.counts = f.counts_range(0, 2**6)
+
+    def test_successive_halving(self):
+        optimiser = MultiStartOptimiser(6, 2, restarts=4, processes=0, epochs=30, rounds=3, keep=0.5, seed=0)
+        p_succ = optimiser.find_optimal_params(self.formulas)
+
+        rounds = sorted(r["rounds"] for r in optimiser.results)
+        self.assertEqual(rounds, [1, 1, 2, 3])
+        self.assertEqual(p_succ, optimiser.summary["max"])
+        self.assertEqual(p_succ, max(r["p_succ"] for r in optimiser.results if r["rounds"] == 3))
+
+        # Best circuit has best parameters
+        best = optimiser.results[optimiser.summary["best_restart"]]
+        self.assertTrue(torch.allclose(optimiser.circuit.gamma, torch.tensor(best["gamma"])))
+
+    def test_serial_threads(self):
+        # Training in this process leaves caller's thread count alone
+        threads = torch.get_num_threads()
+        torch.set_num_threads(2)
+        try:
+            MultiStartOptimiser(6, 1, restarts=2, processes=0, epochs=2, rounds=1, seed=0).find_optimal_params(self.formulas)
+            self.assertEqual(torch.get_num_threads(), 2)
+        finally:
+            torch.set_num_threads(threads)
+
+    def test_process_pool(self):
+        serial = MultiStartOptimiser(6, 1, restarts=2, processes=0, epochs=10, rounds=2, init="ramp", seed=1)
+        parallel = MultiStartOptimiser(6, 1, restarts=2, processes=2, epochs=10, rounds=2, init="ramp", seed=1)
+        self.assertAlmostEqual(
+            serial.find_optimal_params(self.formulas),
+            parallel.find_optimal_params(self.formulas),
+            places=5,
+        )
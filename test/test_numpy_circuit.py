@@ -0,0 +1,49 @@
+import subprocess
+import sys
+import unittest
+import numpy as np
+import torch
+
+from benchmark.cnf.random_cnf import RandomCNF
+from k_sat.numpy_solver.numpy_circuit import NumpyCircuit
+from k_sat.numpy_solver.numpy_solver import NumpySolver
+from k_sat.pytorch_solver.pytorch_circuit import PytorchCircuit
+
+
+class TestNumpyCircuit(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+        self.f = RandomCNF(type='ksat').from_poisson(8, 3)[0]
+        self.f.counts = self.f.counts_range(0, 2**8)
+        self.gamma = [-0.5, -0.3]
+        self.beta = [0.2, 0.4]
+
+    def test_matches_pytorch(self):
+        h, hS = self.f.naive_counts, self.f.naive_sats
+        expected = PytorchCircuit(8, 2, torch.tensor(self.gamma), torch.tensor(self.beta))
+        with torch.no_grad():
+            state = expected.evolve(torch.from_numpy(h)).numpy()
+
+        # Single block and blocks split over threads (both along outer and inner axes)
+        for block_size in [2**16, 2**4]:
+            circuit = NumpyCircuit(8, 2, self.gamma, self.beta, threads=4, block_size=block_size)
+            self.assertTrue(np.allclose(circuit.evolve(h), state, atol=1e-6))
+            self.assertAlmostEqual(circuit(h, hS), float(np.sum(np.abs(state[hS]) ** 2)), places=5)
+            self.assertAlmostEqual(circuit.energy(circuit.evolve(h), h), float(np.dot(np.abs(state) ** 2, h)), places=4)
+
+    def test_solver(self):
+        solver = NumpySolver(self.gamma, self.beta)
+        bs, runtime = solver.sat(self.f)
+        self.assertTrue(self.f.is_satisfied(bs))
+        self.assertGreaterEqual(runtime, 1)
+        self.assertAlmostEqual(solver.final_probabilities(self.f).sum(), 1.0, places=5)
+
+        solver = NumpySolver(self.gamma, self.beta, analytic=True)
+        bs, _ = solver.sat(self.f)
+        self.assertTrue(self.f.is_satisfied(bs))
+
+    def test_no_torch(self):
+        code = "import sys; import k_sat.numpy_solver.numpy_solver; print('torch' in sys.modules)"
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        self.assertEqual(out.stdout.strip(), "False")
@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+
+from benchmark.cnf.random_cnf import RandomCNF
+from k_sat.numpy_solver.numpy_circuit import NumpyCircuit
+from k_sat.numpy_solver.out_of_core_circuit import OutOfCoreCircuit
+
+
+class TestOutOfCoreCircuit(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+        self.f = RandomCNF(type='ksat').from_poisson(9, 3)[0]
+        self.h = self.f.counts_range(0, 2**9)
+        self.gamma = [-0.5, -0.3]
+        self.beta = [0.2, 0.4]
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_matches_in_memory(self):
+        expected = NumpyCircuit(9, 2, self.gamma, self.beta)
+        state = expected.evolve(self.h)
+
+        # 3 low qubits per block, 6 high qubits mixed 4 then 2 at a time
+        circuit = OutOfCoreCircuit(9, 2, self.gamma, self.beta, self.tmp.name, block_qubits=3, group_qubits=4)
+        h = circuit.counts(self.f)
+        self.assertTrue(np.array_equal(np.asarray(h), self.h))
+
+        final = circuit.evolve(h)
+        self.assertTrue(np.allclose(np.asarray(final), state, atol=1e-6))
+        self.assertEqual(circuit.passes, 2 * 3)
+
+        sats = circuit.sats(h)
+        self.assertTrue(np.array_equal(sats, np.flatnonzero(self.h == 0)))
+        self.assertAlmostEqual(circuit.succ_prob(final, sats), expected(self.h, sats), places=5)
+
+    def test_single_block(self):
+        expected = NumpyCircuit(9, 2, self.gamma, self.beta)
+        circuit = OutOfCoreCircuit(9, 2, self.gamma, self.beta, self.tmp.name)
+        self.assertAlmostEqual(circuit(self.f), expected(self.h, np.flatnonzero(self.h == 0)), places=5)
+        self.assertEqual(circuit.passes, 2)
+
+    def test_temporary_directory(self):
+        # Files in temporary directory removed on close, given directory kept
+        circuit = OutOfCoreCircuit(9, 1, self.gamma[:1], self.beta[:1])
+        circuit(self.f)
+        self.assertTrue(os.path.exists(f"{circuit.directory}/state.dat"))
+        circuit.close()
+        self.assertFalse(os.path.exists(circuit.directory))
+
+        kept = OutOfCoreCircuit(9, 1, self.gamma[:1], self.beta[:1], self.tmp.name)
+        kept(self.f)
+        kept.close()
+        self.assertTrue(os.path.exists(f"{self.tmp.name}/state.dat"))
+
+    def test_sample(self):
+        # Shots drawn from cumulative distribution written in one pass
+        circuit = OutOfCoreCircuit(9, 2, self.gamma, self.beta, self.tmp.name, block_qubits=3)
+        state = circuit.evolve(circuit.counts(self.f))
+        passes = circuit.passes
+        cdf = circuit.cdf(state)
+        ps = np.abs(np.asarray(state)) ** 2
+        self.assertTrue(np.allclose(np.asarray(cdf), np.cumsum(ps)))
+
+        shots = np.concatenate([circuit.sample(cdf, 10000) for _ in range(5)])
+        self.assertEqual(circuit.passes, passes + 1)
+        freqs = np.bincount(shots, minlength=2**9) / len(shots)
+        self.assertLess(np.abs(freqs - ps / ps.sum()).sum(), 0.1)
@@ -0,0 +1,104 @@
+import tempfile
+import unittest
+import numpy as np
+
+from benchmark.cnf.generator.ksat_generator import KSATGenerator
+from benchmark.cnf.parameter_library import ParameterLibrary
+from benchmark.cnf.random_cnf import RandomCNF
+from k_sat.parameter_store import ParameterStore
+from k_sat.pytorch_solver.pytorch_solver import PytorchSolver
+
+
+class TempGenerator(KSATGenerator):
+    def __init__(self, root: str) -> None:
+        self.root = root
+
+    def directory(self, n: int, k: int) -> str:
+        return f"{self.root}/ksat/k_{k}/n_{n}"
+
+
+class MemoryStore(ParameterStore):
+    def __init__(self) -> None:
+        self.stored = []
+
+    def lookup(self, formula, p, solver):
+        return None
+
+    def store(self, formula, solver, gamma, beta, p_succ, provenance=None):
+        self.stored.append((solver, gamma, beta))
+
+
+class TestParameterLibrary(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.library = ParameterLibrary(generator=TempGenerator(self.tmp.name))
+        self.problem_gen = RandomCNF(type='ksat')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_store_best(self):
+        f = self.problem_gen.from_poisson(6, 3, satisfiable=False)[0]
+        self.assertIsNone(self.library.lookup(f, 1, "pytorch"))
+
+        self.library.store(f, "pytorch", [-0.1], [0.2], 0.3, {"source": "test"})
+        self.library.store(f, "pytorch", [-0.4], [0.5], 0.6)
+        self.library.store(f, "qiskit", [1.0], [1.0], 0.9)
+
+        best = self.library.best(6, 3, 1, "pytorch")
+        self.assertEqual(best["gamma"], [-0.4])
+        self.assertEqual(best["p_succ"], 0.6)
+        self.assertIsNone(self.library.best(6, 3, 2, "pytorch"))
+        self.assertEqual(self.library.lookup(f, 1, "pytorch"), ([-0.4], [0.5]))
+
+    def test_nearest(self):
+        fs = {n: self.problem_gen.from_poisson(n, 3, satisfiable=False)[0] for n in [6, 10]}
+        self.library.store(fs[6], "pytorch", [-0.2, -0.4], [0.2, 0.0], 0.1)
+        self.library.store(fs[10], "pytorch", [-0.6, -0.8], [0.4, 0.4], 0.1)
+        self.assertEqual(self.library.available(3, 2, "pytorch"), [6, 10])
+
+        # Interpolate between stored sizes
+        gamma, beta = self.library.nearest(7, 3, 2, "pytorch")
+        self.assertTrue(np.allclose(gamma, [-0.3, -0.5]))
+        self.assertTrue(np.allclose(beta, [0.25, 0.1]))
+
+        # Nearest stored size out of range
+        self.assertTrue(np.allclose(self.library.nearest(4, 3, 2, "pytorch")[0], [-0.2, -0.4]))
+        self.assertTrue(np.allclose(self.library.nearest(12, 3, 2, "pytorch")[0], [-0.6, -0.8]))
+
+    def test_solver_skips_training(self):
+        f = self.problem_gen.from_poisson(5, 3)[0]
+        f.counts = f.counts_range(0, 2**f.num_vars)
+        self.library.store(f, "pytorch", [-0.5], [0.3], 0.5)
+
+        solver = PytorchSolver(parameter_library=self.library, retrain=False)
+        ps = solver.final_probabilities(f)
+        self.assertAlmostEqual(ps.sum().item(), 1.0, places=5)
+        self.assertEqual(len(self.library.read(5, 3)["pytorch"]["1"]), 1)
+
+        # Warm start stores trained parameters
+        solver = PytorchSolver(parameter_library=self.library)
+        solver.final_probabilities(f)
+        self.assertEqual(len(self.library.read(5, 3)["pytorch"]["1"]), 2)
+
+    def test_custom_store(self):
+        # Solvers only depend on ParameterStore interface
+        f = self.problem_gen.from_poisson(5, 3)[0]
+        f.counts = f.counts_range(0, 2**f.num_vars)
+        store = MemoryStore()
+        PytorchSolver(parameter_library=store).final_probabilities(f)
+        self.assertEqual(len(store.stored), 1)
+        self.assertEqual(store.stored[0][0], "pytorch")
+
+    def test_training_family(self):
+        # Parameters trained on training formulas stored under their family
+        training = self.problem_gen.from_poisson(5, 3, instances=2, calc_naive=True)
+        f = self.problem_gen.from_poisson(5, 4, calc_naive=True)[0]
+        PytorchSolver(training_formulas=training, parameter_library=self.library).sat(f)
+        self.assertEqual(len(self.library.read(5, 3)["pytorch"]["1"]), 1)
+        self.assertEqual(self.library.read(5, 4), {})
+
+        with self.assertRaises(RuntimeError):
+            PytorchSolver(training_formulas=training + [f], parameter_library=self.library).sat(f)
@@ -0,0 +1,49 @@
+import unittest
+import numpy as np
+from qiskit.quantum_info import Operator
+
+from benchmark.cnf.random_cnf import RandomCNF
+from formula.cnf.cnf import CNF
+from formula.cnf.disjunctive_clause import DisjunctiveClause
+from formula.variable import Variable
+from k_sat.qiskit_solver.evaluator import reversed_indices
+from k_sat.qiskit_solver.pauli_encoder import PauliEncoder
+
+
+class TestPauliEncoder(unittest.TestCase):
+
+    def test_cancelled_terms(self):
+        # (x_0 v x_1)(x_0 v ~x_1) = x_0, terms on x_1 cancel
+        formula = CNF(
+            [
+                DisjunctiveClause([Variable(0, False), Variable(1, False)]),
+                DisjunctiveClause([Variable(0, False), Variable(1, True)]),
+            ]
+        )
+        self.assertEqual(PauliEncoder().hamiltonian(formula), {(): 0.5, (0,): 1.0})
+        ops = PauliEncoder().encode_formula(formula).count_ops()
+        self.assertEqual(ops.get("rz", 0), 1)
+        self.assertNotIn("cx", ops)
+
+    def test_matches_per_clause(self):
+        np.random.seed(0)
+        formula = RandomCNF(type='ksat').from_poisson(5, 4)[0]
+        params = [-0.4, -0.7, 0.3, 0.5]
+        per_clause = PauliEncoder(merge=False).encode_formula(formula, 2)
+        merged = PauliEncoder().encode_formula(formula, 2)
+
+        self.assertEqual([p.name for p in per_clause.parameters], [p.name for p in merged.parameters])
+        self.assertLess(merged.count_ops()["cx"], per_clause.count_ops()["cx"])
+        self.assertTrue(
+            Operator(merged.bind_parameters(params)).equiv(Operator(per_clause.bind_parameters(params)))
+        )
+
+    def test_cost_unitary(self):
+        # Cost layer is exp(-i gamma h) exactly, global phase included
+        np.random.seed(1)
+        formula = RandomCNF(type='ksat').from_poisson(4, 3)[0]
+        circuit = PauliEncoder().encode_formula(formula)
+        circuit.data = [g for g in circuit.data if g.operation.name not in ["h", "rx"]]
+        unitary = Operator(circuit.bind_parameters([-0.37])).data
+        h = formula.naive_counts[reversed_indices(4)]
+        self.assertTrue(np.allclose(unitary, np.diag(np.exp(0.37j * h)), atol=1e-6))
@@ -0,0 +1,70 @@
+import unittest
+import numpy as np
+import torch
+
+from benchmark.cnf.random_cnf import RandomCNF
+from k_sat.pytorch_solver.pytorch_circuit import PytorchCircuit
+from k_sat.pytorch_solver.pytorch_optimiser import PytorchOptimiser
+
+
+class TestPytorchOptimiser(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+        self.formula = RandomCNF(type='ksat').from_poisson(6, 3)[0]
+        self.formula.counts = self.formula.counts_range(0, 2**self.formula.num_vars)
+
+    def test_fixed_epochs(self):
+        optimiser = PytorchOptimiser(PytorchCircuit(6, 1), epochs=20)
+        p_succ = optimiser.find_optimal_params([self.formula])
+        self.assertEqual(optimiser.summary["steps"], 21)
+        self.assertEqual(optimiser.summary["p_succ"], p_succ)
+        self.assertFalse(optimiser.summary["converged"])
+
+    def test_early_stopping(self):
+        optimiser = PytorchOptimiser(PytorchCircuit(6, 1), epochs=1000, tol=1e-6)
+        optimiser.find_optimal_params([self.formula])
+        self.assertTrue(optimiser.summary["converged"])
+        self.assertLess(optimiser.summary["steps"], 1001)
+
+    def test_lbfgs(self):
+        adam = PytorchOptimiser(PytorchCircuit(6, 1), epochs=1000, tol=1e-7)
+        p_adam = adam.find_optimal_params([self.formula])
+
+        circuit = PytorchCircuit(6, 1)
+        lbfgs = torch.optim.LBFGS(circuit.parameters(), line_search_fn="strong_wolfe")
+        optimiser = PytorchOptimiser(circuit, lbfgs, epochs=50, tol=1e-7, patience=2)
+        p_lbfgs = optimiser.find_optimal_params([self.formula])
+
+        # Reaches same optimum with far fewer circuit evaluations
+        self.assertTrue(optimiser.summary["converged"])
+        self.assertGreaterEqual(p_lbfgs, p_adam - 1e-4)
+        self.assertLess(optimiser.summary["evaluations"], adam.summary["evaluations"])
+
+    def test_scheduler(self):
+        scheduler = lambda opt: torch.optim.lr_scheduler.ExponentialLR(opt, 0.5)
+        optimiser = PytorchOptimiser(PytorchCircuit(6, 1), epochs=5, scheduler=scheduler)
+        optimiser.find_optimal_params([self.formula])
+        self.assertAlmostEqual(optimiser.optimiser.param_groups[0]["lr"], 0.01 * 0.5**6)
+
+    def test_plateau_scheduler(self):
+        # Learning rate kept while p_succ improves, reduced once it stops improving
+        scheduler = lambda opt: torch.optim.lr_scheduler.ReduceLROnPlateau(opt, factor=0.5, patience=0)
+        optimiser = PytorchOptimiser(PytorchCircuit(6, 1), scheduler=scheduler)
+        for p_succ in [0.1, 0.2, 0.3]:
+            optimiser.step_scheduler(p_succ)
+        self.assertAlmostEqual(optimiser.optimiser.param_groups[0]["lr"], 0.01)
+        optimiser.step_scheduler(0.25)
+        self.assertAlmostEqual(optimiser.optimiser.param_groups[0]["lr"], 0.005)
+
+    def test_gradient_accumulation(self):
+        # Accumulating over batches takes same steps as whole batch
+        formulas = RandomCNF(type='ksat').from_poisson(6, 3, instances=3)
+        params = []
+        for batch_size in [None, 2]:
+            circuit = PytorchCircuit(6, 2)
+            optimiser = PytorchOptimiser(circuit, epochs=5, batch_size=batch_size)
+            p_succ = optimiser.find_optimal_params(formulas)
+            params.append((p_succ, torch.cat(circuit.angles()).detach()))
+        self.assertAlmostEqual(params[0][0], params[1][0], places=6)
+        self.assertTrue(torch.allclose(params[0][1], params[1][1], atol=1e-6))
@@ -0,0 +1,48 @@
+import unittest
+import numpy as np
+import torch
+
+from benchmark.cnf.random_cnf import RandomCNF
+from k_sat.pytorch_solver.pytorch_circuit import PytorchCircuit
+from k_sat.pytorch_solver.readout import Readout
+
+
+class TestReadout(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+        f = RandomCNF(type='ksat').from_poisson(8, 3)[0]
+        self.h = torch.from_numpy(f.counts_range(0, 2**8))
+        self.hS = torch.nonzero(self.h == 0).flatten()
+        self.circuit = PytorchCircuit(8, 2, torch.tensor([-0.6, -0.3]), torch.tensor([0.2, 0.5]))
+
+    def test_observables(self):
+        state = self.circuit.evolve(self.h)
+        ps = (state * state.conj()).real.detach()
+
+        # Chunks smaller than state
+        observables = Readout(cvar_alphas=[0.1, 1.0], top_k=5, chunk_size=50)(state, self.h)
+
+        self.assertAlmostEqual(observables.p_succ.item(), ps[self.hS].sum().item(), places=6)
+        self.assertAlmostEqual(observables.energy.item(), (ps @ self.h).item(), places=5)
+        self.assertAlmostEqual(observables.level_probs.sum().item(), 1.0, places=5)
+        for level, prob in zip(observables.levels, observables.level_probs):
+            self.assertAlmostEqual(prob.item(), ps[self.h == level].sum().item(), places=6)
+
+        # CVaR over whole distribution is expectation, over tail is at most expectation
+        self.assertAlmostEqual(observables.cvar[1.0].item(), observables.energy.item(), places=5)
+        self.assertLessEqual(observables.cvar[0.1].item(), observables.energy.item())
+
+        probs, indices = torch.topk(ps, 5)
+        self.assertTrue(torch.allclose(observables.top_probs, probs))
+        self.assertEqual(set(observables.top_indices.tolist()), set(indices.tolist()))
+
+    def test_differentiable(self):
+        observables = Readout(cvar_alphas=[0.2])(self.circuit.evolve(self.h), self.h)
+        observables.p_succ.backward(retain_graph=True)
+        expected = torch.autograd.grad(self.circuit(self.h, self.hS), self.circuit.gamma)[0]
+        self.assertTrue(torch.allclose(self.circuit.gamma.grad, expected, atol=1e-6))
+
+        self.circuit.zero_grad()
+        observables.cvar[0.2].backward()
+        self.assertIsNotNone(self.circuit.beta.grad)
@@ -0,0 +1,80 @@
+import unittest
+import numpy as np
+
+from benchmark.cnf.random_cnf import RandomCNF
+from k_sat.running_time import RunningTime, sample_until_sat
+from k_sat.qiskit_solver.pauli_encoder import PauliEncoder
+from k_sat.qiskit_solver.evaluator import Evaluator
+
+
+class TestRunningTime(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+        self.probs = np.array([0.1, 0.3, 0.0, 0.2, 0.4])
+        self.rt = RunningTime(self.probs, [1, 3], 3)
+
+    def test_moments(self):
+        self.assertAlmostEqual(self.rt.p_succ, 0.5)
+        self.assertAlmostEqual(self.rt.expectation, 2.0)
+        self.assertAlmostEqual(self.rt.variance, 2.0)
+        self.assertEqual(self.rt.quantile(0.5), 1)
+        self.assertEqual(self.rt.quantile(0.9), 4)
+        self.assertAlmostEqual(self.rt.cdf(2), 0.75)
+
+        samples, timed_out = self.rt.sample(100000)
+        self.assertAlmostEqual(samples.mean(), 2.0, delta=0.05)
+        self.assertAlmostEqual(samples.var(), 2.0, delta=0.1)
+        self.assertFalse(timed_out.any())
+
+        # Success on last shot before timeout distinguished from timing out
+        samples, timed_out = self.rt.sample(100000, timeout=1)
+        self.assertTrue(np.all(samples <= 2))
+        self.assertAlmostEqual(np.mean(samples == 2), 0.5, delta=0.01)
+        self.assertAlmostEqual(np.mean(timed_out), 0.25, delta=0.01)
+        self.assertTrue(np.all(samples[timed_out] == 2))
+        self.assertEqual(RunningTime(self.probs, [], 3).quantile(0.5), np.inf)
+
+    def test_sampling(self):
+        # Assignments drawn from distribution conditioned on success
+        assignments = self.rt.sample_assignment(100000)
+        self.assertAlmostEqual(np.mean(assignments == 3), 0.4, delta=0.01)
+
+        # Timed out iff more than timeout + 1 shots needed
+        results = [self.rt.sat(timeout=0) for _ in range(10000)]
+        self.assertTrue(all(r == 1 for (_, r) in results))
+        self.assertAlmostEqual(np.mean([bs == "-1" for (bs, _) in results]), 0.5, delta=0.02)
+        self.assertTrue(all(bs in ["-1", "001", "011"] for (bs, _) in results))
+
+        self.assertEqual(RunningTime(self.probs, [2], 3).sat(timeout=4), ("-1", 5))
+
+    def test_evaluator(self):
+        formula = RandomCNF(type='ksat').from_poisson(5, 3)[0]
+        formula.counts = formula.counts_range(0, 2**formula.num_vars)
+        circuit = PauliEncoder().encode_formula(formula, 1)
+        evaluator = Evaluator()
+        rt = evaluator.analytic_running_time(circuit, formula, [-0.4, 0.3])
+        p_succ = evaluator.success_probability(circuit, formula, [-0.4, 0.3])
+        self.assertAlmostEqual(rt.p_succ, p_succ, places=6)
+
+    def test_sample_until_sat(self):
+        # Batches of 1, 2, 4, 4, ... shots, satisfying draw at shot 6 (second of 4th batch)
+        stream = iter([0, 0, 0, 0, 0, 0, 1, 3, 3, 0, 0, 0])
+        batches = []
+
+        def draw(shots):
+            batches.append(shots)
+            return np.array([next(stream) for _ in range(shots)])
+
+        is_sat = lambda indices: indices == 3
+        self.assertEqual(sample_until_sat(draw, is_sat, True, None, 1, 4), (3, 8))
+        self.assertEqual(batches, [1, 2, 4, 4])
+
+        # Last batch cut to timeout + 1 shots, success on last shot distinct from timeout
+        stream = iter([0, 0, 0, 3])
+        self.assertEqual(sample_until_sat(draw, is_sat, True, 3, 2), (3, 4))
+        stream = iter([0, 0, 0, 0, 3])
+        self.assertEqual(sample_until_sat(draw, is_sat, True, 3, 2), (-1, 4))
+
+        with self.assertRaises(RuntimeError):
+            sample_until_sat(draw, is_sat, False)
@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+
+from benchmark.cnf.random_cnf import RandomCNF
+from k_sat.pytorch_solver.pytorch_solver import PytorchSolver
+from k_sat.qiskit_solver.qiskit_solver import QiskitSolver
+
+
+class TestTrainedParams(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+        self.formulas = RandomCNF(type='ksat').from_poisson(4, 3, instances=4, calc_naive=True)
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def no_training(self, *args):
+        raise AssertionError("Trained again")
+
+    def check_reuse(self, solver):
+        bs, _ = solver.sat(self.formulas[0])
+        self.assertTrue(self.formulas[0].is_satisfied(bs))
+        self.assertIn(4, solver.trained)
+
+        # Further formulas only evolved and sampled
+        train = solver.train
+        solver.train = self.no_training
+        for f, (bs, _) in zip(self.formulas[2:], solver.sat_many(self.formulas[2:])):
+            self.assertTrue(f.is_satisfied(bs))
+
+        # Persisted parameters reused by new solver
+        path = os.path.join(self.tmp.name, "params.json")
+        solver.save_params(path)
+        loaded = type(solver)(training_formulas=self.formulas[:2])
+        loaded.load_params(path)
+        loaded.train = self.no_training
+        bs, _ = loaded.sat(self.formulas[3])
+        self.assertTrue(self.formulas[3].is_satisfied(bs))
+
+        # Invalidated when training formulas change
+        solver.train = train
+        solver.invalidate()
+        self.assertEqual(len(solver.trained), 0)
+        solver.sat(self.formulas[3])
+        self.assertIn(4, solver.trained)
+
+        # Reassigning training formulas invalidates, mutating the list passed does not
+        training = self.formulas[1:3]
+        solver.training_formulas = training
+        self.assertEqual(len(solver.trained), 0)
+        solver.sat(self.formulas[3])
+        training.append(self.formulas[3])
+        self.assertEqual(len(solver.training_formulas), 2)
+        self.assertIn(4, solver.trained)
+
+    def test_pytorch(self):
+        self.check_reuse(PytorchSolver(training_formulas=self.formulas[:2]))
+
+    def test_qiskit(self):
+        self.check_reuse(QiskitSolver(training_formulas=self.formulas[:2]))